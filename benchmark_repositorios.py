@@ -0,0 +1,86 @@
+# benchmark_repositorios.py
+"""
+Compara a vazão dos repositórios com engines por repositório (comportamento
+antigo: um create_engine + create_all por repositório, sem PRAGMAs) e com a
+engine compartilhada do DatabaseManager (perfil WAL / synchronous=NORMAL).
+
+Uso: python benchmark_repositorios.py [--operacoes N] [--instancias N]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+# Adiciona o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.database_manager import DatabaseManager, PERFIL_SQLITE_PADRAO
+from repositories.aula_repository import AulaRepository
+from repositories.usuario_repository import UsuarioRepository
+from repositories.notificacao_repository import NotificacaoRepository
+
+# Sem nenhum PRAGMA: equivale ao create_engine antigo
+PERFIL_SEM_AJUSTES = {nome: None for nome in PERFIL_SQLITE_PADRAO}
+
+
+def _criar_repositorios(db_path, modo):
+    """Cria os três repositórios como as telas/migração fazem"""
+    if modo == "legado":
+        # Cada repositório com a sua própria engine e create_all
+        def novo_manager():
+            return DatabaseManager(db_path, perfil=PERFIL_SEM_AJUSTES, compartilhado=False)
+        return (
+            UsuarioRepository(db_manager=novo_manager()),
+            AulaRepository(db_manager=novo_manager()),
+            NotificacaoRepository(db_manager=novo_manager()),
+        )
+    return (
+        UsuarioRepository(db_path),
+        AulaRepository(db_path),
+        NotificacaoRepository(db_path),
+    )
+
+
+def _medir(descricao, operacoes, funcao):
+    inicio = time.perf_counter()
+    for i in range(operacoes):
+        funcao(i)
+    duracao = time.perf_counter() - inicio
+    print(f"   {descricao:<32} {operacoes / duracao:10.1f} ops/s ({duracao:.3f}s)")
+    return duracao
+
+
+def executar_benchmark(modo, operacoes, instancias):
+    print(f"\n📊 Modo: {modo}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, "benchmark.db")
+
+        _medir("criação de repositórios (x3)", instancias,
+               lambda i: _criar_repositorios(db_path, modo))
+
+        usuario_repo, aula_repo, notificacao_repo = _criar_repositorios(db_path, modo)
+        usuario_repo.criar_usuario("Professor Benchmark", "bench@ufc.br", "123456", "professor")
+
+        _medir("adicionar_notificacao", operacoes,
+               lambda i: notificacao_repo.adicionar_notificacao("noticias", f"Notícia {i}", "Mensagem"))
+        _medir("criar_aula", operacoes,
+               lambda i: aula_repo.criar_aula(f"Aula {i}", "Geologia", "", [], [], "Professor Benchmark"))
+        _medir("adicionar_comentario", operacoes,
+               lambda i: aula_repo.adicionar_comentario(1, "Aluno", f"Comentário {i}"))
+        _medir("obter_notificacoes_nao_lidas", operacoes,
+               lambda i: notificacao_repo.obter_notificacoes_nao_lidas("noticias"))
+
+        # Libera as conexões antes de apagar o diretório temporário
+        for repo in (usuario_repo, aula_repo, notificacao_repo):
+            repo.db_manager.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos repositórios SQLite")
+    parser.add_argument("--operacoes", type=int, default=200)
+    parser.add_argument("--instancias", type=int, default=20)
+    args = parser.parse_args()
+
+    executar_benchmark("legado", args.operacoes, args.instancias)
+    executar_benchmark("compartilhado", args.operacoes, args.instancias)
@@ -0,0 +1,168 @@
+# benchmark_verificacoes.py
+"""
+Mede uma rodada completa de verificação das FONTES contra o servidor de
+fixtures local (servidor_fixtures.py), sem depender dos sites da UFC.
+
+Para cada cenário (rede normal, latência, host fora do ar, página grande,
+erros 5xx) são feitas três rodadas: fria (sem validadores), sem mudanças
+(requisições condicionais) e com uma publicação nova. Cada rodada informa
+o tempo até o último resultado, o CPU do app (sem o do servidor), as
+requisições, as respostas 304 e os bytes recebidos, para o
+AtualizacoesManager e para o verificar_atualizacao_site da tela Recentes.
+
+Uso: python benchmark_verificacoes.py [--fixtures ARQUIVO] [--cenarios nome,...]
+"""
+import sys
+import os
+import time
+import logging
+import argparse
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+# Adiciona o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_fixtures import ServidorFixtures, fixtures_sinteticas, carregar_fixtures
+from services.agendador_atualizacoes import FONTES
+from utils.atualizacoes_manager import AtualizacoesManager
+from utils.motor_verificacao import MotorVerificacao
+import screens.recentes as recentes
+
+HOST_PRINCIPAL = "geologia.ufc.br"
+
+
+def _fora_do_ar(servidor):
+    for url in servidor.fixtures:
+        if urlsplit(url).hostname == HOST_PRINCIPAL:
+            servidor.configurar(url, fora_do_ar=True)
+
+
+def _pagina_grande(servidor):
+    for url, fixture in servidor.fixtures.items():
+        if fixture["tipo"] == "pagina":
+            servidor.configurar(url, preenchimento=6 * 1024 * 1024)
+            return
+
+
+CENARIOS = {
+    "normal": lambda servidor: None,
+    "latencia": lambda servidor: servidor.configurar(latencia=0.2),
+    "host_fora_do_ar": _fora_do_ar,
+    "pagina_grande": _pagina_grande,
+    "erros_5xx": lambda servidor: servidor.configurar(erro=503, erros=1),
+}
+
+
+def _url_verificada(fonte):
+    return fonte.get("api", fonte["url"])
+
+
+def _medir(servidor, funcao):
+    """Executa a rodada e devolve as medidas do lado do app"""
+    servidor.zerar_estatisticas()
+    inicio = time.perf_counter()
+    cpu = time.process_time()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    estatisticas = servidor.estatisticas()
+    return {
+        "tempo": duracao,
+        # O servidor roda no mesmo processo: o CPU dele é descontado
+        "cpu": time.process_time() - cpu - estatisticas["cpu_servidor"],
+        "requisicoes": estatisticas["requisicoes"],
+        "respostas_304": estatisticas["respostas_304"],
+        "bytes": estatisticas["bytes_enviados"],
+    }
+
+
+def _rodada_manager(manager, servidor, fontes):
+    """Verifica todas as fontes em paralelo e espera o último resultado"""
+    restantes = [len(fontes)]
+    terminou = threading.Event()
+    lock = threading.Lock()
+
+    def ao_verificar(quantidade):
+        with lock:
+            restantes[0] -= 1
+            if restantes[0] == 0:
+                terminou.set()
+
+    for fonte in fontes:
+        manager.forcar_verificacao(fonte["recurso"], servidor.url_local(_url_verificada(fonte)), ao_verificar)
+    if not terminou.wait(120):
+        print(f"   ⚠️ {restantes[0]} verificações sem resultado")
+
+
+def _rodada_recentes(servidor, fontes):
+    """Como a tela Recentes: uma fonte depois da outra"""
+    for fonte in fontes:
+        recentes.verificar_atualizacao_site(servidor.url_local(_url_verificada(fonte)), "time.entry-date")
+
+
+def _publicar(servidor):
+    """Uma notícia nova na API e um artigo novo na primeira página HTML"""
+    for url, fixture in servidor.fixtures.items():
+        if fixture["tipo"] == "wordpress":
+            servidor.publicar(url, "Notícia publicada durante o benchmark")
+            break
+    for url, fixture in servidor.fixtures.items():
+        if fixture["tipo"] == "pagina":
+            servidor.publicar(url, "Artigo publicado durante o benchmark")
+            break
+
+
+def executar_cenario(nome, fixtures, fontes=FONTES, exibir=True):
+    """Três rodadas do cenário; devolve {pipeline: [medidas por rodada]}"""
+    servidor = ServidorFixtures(fixtures).iniciar()
+    CENARIOS[nome](servidor)
+    resultados = {"manager": [], "recentes": []}
+    arquivo_validadores = recentes.ARQUIVO_VALIDADORES
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = AtualizacoesManager(data_dir=diretorio,
+                                      motor=MotorVerificacao(agendar=lambda funcao, *args: funcao(*args)))
+        # Toda rodada verifica de novo, sem esperar o intervalo da fonte
+        manager.tempo_minimo_entre_verificacoes = 0
+        manager.tempo_maximo_entre_verificacoes = 0
+        # Sem avisos do sistema (plyer) durante as medições
+        manager.notificacoes_manager._mostrar_notificacao_local = lambda titulo, mensagem: None
+        recentes.ARQUIVO_VALIDADORES = os.path.join(diretorio, "validadores_recentes.json")
+
+        try:
+            for rodada in ("fria", "sem mudanças", "uma publicação"):
+                if rodada == "uma publicação":
+                    _publicar(servidor)
+                resultados["manager"].append(_medir(servidor, lambda: _rodada_manager(manager, servidor, fontes)))
+                resultados["recentes"].append(_medir(servidor, lambda: _rodada_recentes(servidor, fontes)))
+                if exibir:
+                    for pipeline in ("manager", "recentes"):
+                        m = resultados[pipeline][-1]
+                        print(f"   {rodada:<15} {pipeline:<9} {m['tempo'] * 1000:9.1f} ms {m['cpu'] * 1000:8.1f} ms CPU "
+                              f"{m['requisicoes']:4d} req {m['respostas_304']:3d} x 304 {m['bytes'] / 1024:10.1f} KiB")
+        finally:
+            manager.motor.encerrar(aguardar=True)
+            # Resumos e gravação adiada pendentes saem antes de o diretório ser apagado
+            manager.notificacoes_manager.encerrar()
+            recentes.ARQUIVO_VALIDADORES = arquivo_validadores
+
+    servidor.encerrar()
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do verificador de atualizações")
+    parser.add_argument("--fixtures", help="JSON de fixtures gravadas (padrão: sintéticas)")
+    parser.add_argument("--cenarios", default=",".join(CENARIOS), help="cenários separados por vírgula")
+    args = parser.parse_args()
+
+    # O módulo da tela Recentes liga o log em DEBUG para tudo
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('degeo_app').setLevel(logging.CRITICAL)
+
+    fixtures = carregar_fixtures(args.fixtures) if args.fixtures else fixtures_sinteticas()
+    print(f"📊 {len(FONTES)} fontes, {len(fixtures)} fixtures")
+    for nome in args.cenarios.split(","):
+        print(f"\n🔎 Cenário: {nome}")
+        executar_cenario(nome, fixtures)
@@ -27,6 +27,8 @@ from screens.professor_nova_senha import ProfessorNovaSenhaScreen
 from screens.professor_criar_aula import ProfessorCriarAulaScreen
 from screens.professor_visualizar_aula import ProfessorVisualizarAulasScreen
 
+from services.agendador_atualizacoes import obter_agendador
+
 
 class DegeoApp(App):
     def build(self):
@@ -51,20 +53,22 @@ class DegeoApp(App):
 
         Window.size = (360, 640) 
         
-        # ✅ ADICIONAR: Inicialização de serviços em background
-        self._inicializar_servicos_background() 
+        # ✅ Serviço único de verificação de sites e notificações (as telas só se inscrevem)
+        self.agendador = obter_agendador()
+        self.agendador.iniciar()
         
         return sm
 
-    # ✅ CORREÇÃO: Este método DEVE estar DENTRO da classe DegeoApp
-    def _inicializar_servicos_background(self):
-        """Inicializa serviços que rodam em background"""
-        try:
-            from utils.notificacoes_manager import NotificacoesManager
-            notificacoes_manager = NotificacoesManager()
-            notificacoes_manager.inicializar_servicos()
-        except Exception as e:
-            print(f"Erro ao inicializar serviços background: {e}")
+    def on_pause(self):
+        # No Android o app pausado pode ser encerrado sem on_stop
+        self.agendador.notificacoes_manager.descarregar()
+        return True
+
+    def on_stop(self):
+        self.agendador.parar()
+        # Notificações ficam em memória e são gravadas com atraso: grava o que
+        # faltar (e dá um tempo para a fila de push)
+        self.agendador.notificacoes_manager.encerrar()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,169 @@
+# migracao_arquivos.py
+"""
+Move os anexos do layout antigo (data/arquivos/<aula_id>/<nome>) para o
+blob store endereçado por conteúdo (data/blobs/<ab>/<sha256><ext>).
+
+Reescreve os caminhos nas aulas do JSON (aulas.json + journal) e na tabela
+arquivos_aula do banco, e só então apaga as cópias antigas que foram
+migradas. Arquivos em data/arquivos que nenhuma aula referencia são apenas
+listados. Pode ser executado mais de uma vez: caminhos já migrados são
+ignorados.
+
+Uso: python migracao_arquivos.py [--data-dir data] [--simular]
+"""
+import os
+import sys
+import argparse
+import logging
+
+# Configuração de logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger('migracao')
+
+# Adiciona o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.aulas_manager import AulasManager
+from utils.blob_store import BlobStore, calcular_sha256
+from repositories.aula_repository import AulaRepository
+from models.database_models import ArquivoAula
+
+
+class MigracaoArquivos:
+    def __init__(self, data_dir=None, db_path=None, simular=False):
+        self.data_dir = os.path.abspath(data_dir or os.path.join(os.path.dirname(__file__), "data"))
+        self.db_path = db_path
+        self.simular = simular
+        self.aulas_manager = AulasManager(data_dir=self.data_dir)
+        self.blobs = self.aulas_manager.blobs
+        # Caminhos antigos já copiados para o blob store (removidos no final)
+        self.migrados = set()
+        # Estatísticas para o resumo
+        self.bytes_antes = 0
+        self.digests_vistos = {}
+
+    def _migrar_caminho(self, caminho_relativo):
+        """Retorna o novo caminho (blob) para um anexo antigo, ou None se não houver o que migrar"""
+        if not caminho_relativo or BlobStore.digest_de(caminho_relativo):
+            return None
+
+        # Aulas gravadas no Windows guardam o caminho com "\\"
+        origem = os.path.join(self.data_dir, *caminho_relativo.replace("\\", "/").split("/"))
+        if not os.path.isfile(origem):
+            logger.warning(f"⚠️ Anexo não encontrado no disco: {caminho_relativo}")
+            return None
+
+        digest = calcular_sha256(origem)
+        if os.path.abspath(origem) not in self.migrados:
+            tamanho = os.path.getsize(origem)
+            self.bytes_antes += tamanho
+            self.digests_vistos[digest] = tamanho
+            self.migrados.add(os.path.abspath(origem))
+
+        if self.simular:
+            return "/".join(("blobs", digest[:2], digest))
+        self.blobs.adicionar(origem, digest=digest)
+        return self.blobs.caminho_relativo(digest)
+
+    def migrar_aulas_json(self):
+        """Reescreve os anexos das aulas do catálogo JSON"""
+        alteradas = 0
+        for aula in self.aulas_manager.obter_aulas():
+            mudou = False
+            arquivos = []
+            for arquivo in aula.get("arquivos", []):
+                novo_caminho = self._migrar_caminho(arquivo.get("caminho"))
+                if novo_caminho:
+                    arquivo["caminho"] = novo_caminho
+                    mudou = True
+                # Edições antigas repetiam o mesmo anexo várias vezes na aula
+                if arquivo in arquivos:
+                    if novo_caminho and not self.simular:
+                        self.blobs.liberar(BlobStore.digest_de(novo_caminho))
+                    mudou = True
+                    continue
+                arquivos.append(arquivo)
+            aula["arquivos"] = arquivos
+
+            if mudou:
+                alteradas += 1
+                if not self.simular:
+                    self.aulas_manager.catalogo.gravar(aula)
+                logger.info(f"✅ Anexos migrados: aula {aula['id']} ({aula.get('titulo', '')})")
+
+        logger.info(f"📊 Aulas do JSON com anexos migrados: {alteradas}")
+        return alteradas
+
+    def migrar_banco(self):
+        """Reescreve os caminhos da tabela arquivos_aula"""
+        repo = AulaRepository(self.db_path)
+        repo.data_dir = self.data_dir
+        session = repo.db_manager.get_session()
+        alterados = 0
+        try:
+            for arquivo in session.query(ArquivoAula).all():
+                novo_caminho = self._migrar_caminho(arquivo.caminho)
+                if novo_caminho:
+                    arquivo.caminho = novo_caminho
+                    alterados += 1
+            if not self.simular:
+                session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"❌ Erro ao migrar anexos do banco: {e}")
+            raise
+        finally:
+            session.close()
+
+        logger.info(f"📊 Anexos do banco migrados: {alterados}")
+        return alterados
+
+    def remover_arquivos_antigos(self):
+        """Apaga as cópias antigas migradas e as pastas que ficarem vazias"""
+        arquivos_dir = os.path.join(self.data_dir, "arquivos")
+        removidos = 0
+        orfaos = []
+
+        for raiz, _, nomes in os.walk(arquivos_dir, topdown=False):
+            for nome in nomes:
+                caminho = os.path.abspath(os.path.join(raiz, nome))
+                if caminho not in self.migrados:
+                    orfaos.append(os.path.relpath(caminho, self.data_dir))
+                    continue
+                if not self.simular:
+                    os.remove(caminho)
+                removidos += 1
+            if raiz != arquivos_dir and not self.simular and not os.listdir(raiz):
+                os.rmdir(raiz)
+
+        for orfao in orfaos:
+            logger.info(f"📝 Não referenciado por nenhuma aula (mantido): {orfao}")
+        logger.info(f"📊 Cópias antigas removidas: {removidos}")
+        return removidos
+
+    def executar(self):
+        print("🚀 MIGRANDO ANEXOS PARA O BLOB STORE..." + (" (simulação)" if self.simular else ""))
+        print("=" * 50)
+
+        total_json = self.migrar_aulas_json()
+        total_banco = self.migrar_banco()
+        removidos = self.remover_arquivos_antigos()
+
+        bytes_depois = sum(self.digests_vistos.values())
+        print("=" * 50)
+        print("🎉 MIGRAÇÃO DE ANEXOS CONCLUÍDA!")
+        print(f"   📚 Aulas (JSON) alteradas: {total_json}")
+        print(f"   💾 Anexos (banco) alterados: {total_banco}")
+        print(f"   🗑️ Cópias antigas removidas: {removidos}")
+        print(f"   📦 {len(self.migrados)} arquivos -> {len(self.digests_vistos)} blobs "
+              f"({self.bytes_antes} -> {bytes_depois} bytes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra data/arquivos para o blob store")
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--db", default=None, help="Caminho do banco (padrão: data/degeo_app.db)")
+    parser.add_argument("--simular", action="store_true", help="Só mostra o que seria feito")
+    args = parser.parse_args()
+
+    MigracaoArquivos(data_dir=args.data_dir, db_path=args.db, simular=args.simular).executar()
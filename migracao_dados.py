@@ -132,11 +132,9 @@ class MigracaoDados:
                 logger.warning("Arquivo aulas.json não encontrado")
                 return 0
             
-            with open(aulas_file, 'r', encoding='utf-8') as f:
-                dados_aulas = json.load(f)
-            
-            # Extrai a lista de aulas
-            aulas = dados_aulas.get('aulas', []) if isinstance(dados_aulas, dict) else dados_aulas
+            # Lê snapshot + journal (aulas.json sozinho pode não ter as últimas alterações)
+            from utils.aulas_manager import AulasManager
+            aulas = AulasManager(data_dir=self.data_dir).obter_aulas()
             
             # Mapeamento de nomes de professores (do JSON para o banco)
             mapeamento_professores = {
@@ -1,35 +1,105 @@
 import os
 import logging
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from .database_models import Base
 
 logger = logging.getLogger('degeo_app')
 
+# Perfil de conexão aplicado (via PRAGMA) a cada nova conexão SQLite.
+# Um valor None desativa o PRAGMA correspondente.
+PERFIL_SQLITE_PADRAO = {
+    "journal_mode": "WAL",        # Leitores não bloqueiam o escritor
+    "synchronous": "NORMAL",      # Seguro com WAL e evita fsync a cada commit
+    "cache_size": -16000,         # Negativo = KiB (16 MB de cache de páginas)
+    "mmap_size": 64 * 1024 * 1024,
+    "busy_timeout": 5000,         # ms esperando um lock antes de falhar
+}
+
+# Índice FTS5 de aulas criado por versões anteriores: a busca é feita no
+# catálogo de aulas (utils/catalogo_aulas.py), então triggers, visão e tabela
+# são removidos para as escritas não pagarem por um índice sem uso
+_OBJETOS_BUSCA_ANTIGOS = [
+    ("TRIGGER", "aulas_busca_ai"), ("TRIGGER", "aulas_busca_au"), ("TRIGGER", "aulas_busca_ad"),
+    ("TRIGGER", "comentarios_busca_ai"), ("TRIGGER", "comentarios_busca_au"),
+    ("TRIGGER", "comentarios_busca_ad"), ("VIEW", "aulas_busca_origem"), ("TABLE", "aulas_busca"),
+]
+
+# Engine e sessionmaker compartilhados por caminho do banco
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _criar_engine(db_path, perfil):
+    engine = create_engine(f'sqlite:///{db_path}')
+
+    pragmas = [(nome, valor) for nome, valor in perfil.items() if valor is not None]
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def _aplicar_perfil(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for nome, valor in pragmas:
+                cursor.execute(f"PRAGMA {nome}={valor}")
+            cursor.close()
+
+    return engine
+
+
 class DatabaseManager:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, perfil=None, compartilhado=True):
         if db_path is None:
             # Caminho: projeto/data/degeo_app.db
             project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             db_path = os.path.join(project_root, "data", "degeo_app.db")
-        
-        self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}')
-        self.Session = sessionmaker(bind=self.engine)
-        self.create_tables()
-    
+
+        self.db_path = os.path.abspath(db_path)
+        # Ajustes por chamada sobrescrevem o perfil padrão (ex.: {"cache_size": -64000})
+        self.perfil = dict(PERFIL_SQLITE_PADRAO, **(perfil or {}))
+
+        if not compartilhado:
+            # Engine exclusiva (usada em benchmarks/testes)
+            self.engine = _criar_engine(self.db_path, self.perfil)
+            self.Session = sessionmaker(bind=self.engine)
+            self.create_tables()
+            return
+
+        with _engines_lock:
+            if self.db_path not in _engines:
+                self.engine = _criar_engine(self.db_path, self.perfil)
+                self.Session = sessionmaker(bind=self.engine)
+                # O schema só é verificado na primeira vez para cada banco
+                self.create_tables()
+                _engines[self.db_path] = (self.engine, self.Session)
+            else:
+                if perfil:
+                    logger.warning(f"Engine de {self.db_path} já criada; perfil informado ignorado")
+                self.engine, self.Session = _engines[self.db_path]
+
     def create_tables(self):
         """Cria todas as tabelas do banco de dados"""
         try:
             # Garante que o diretório existe
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-            
+
             Base.metadata.create_all(self.engine)
+            # create_all não cria índices novos em tabelas que já existem;
+            # CREATE INDEX IF NOT EXISTS atualiza bancos antigos sem recriá-los
+            for tabela in Base.metadata.sorted_tables:
+                for indice in tabela.indexes:
+                    indice.create(self.engine, checkfirst=True)
             logger.info(f"Tabelas criadas em: {self.db_path}")
         except Exception as e:
             logger.error(f"Erro ao criar tabelas: {e}")
             raise
-    
+        
+        try:
+            with self.engine.begin() as conn:
+                for tipo, nome in _OBJETOS_BUSCA_ANTIGOS:
+                    conn.exec_driver_sql(f"DROP {tipo} IF EXISTS {nome}")
+        except Exception as e:
+            logger.warning(f"Não foi possível remover o índice de busca antigo: {e}")
+
     def get_session(self):
         """Retorna uma nova sessão do banco de dados"""
-        return self.Session()
\ No newline at end of file
+        return self.Session()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -20,6 +20,11 @@ class Usuario(Base):
     
     # Relacionamentos
     aulas = relationship("Aula", back_populates="professor")
+    
+    __table_args__ = (
+        Index('ix_usuarios_nome_tipo', 'nome', 'tipo'),    # criar_aula / aulas por professor
+        Index('ix_usuarios_tipo_ativo', 'tipo', 'ativo'),  # obter_professores
+    )
 
 class Aula(Base):
     __tablename__ = 'aulas'
@@ -36,6 +41,11 @@ class Aula(Base):
     arquivos = relationship("ArquivoAula", back_populates="aula")
     links = relationship("LinkAula", back_populates="aula")
     comentarios = relationship("ComentarioAula", back_populates="aula")
+    
+    __table_args__ = (
+        Index('ix_aulas_professor_data', 'professor_id', 'data_criacao'),
+        Index('ix_aulas_data_criacao', 'data_criacao'),  # listagem geral/paginada
+    )
 
 class ArquivoAula(Base):
     __tablename__ = 'arquivos_aula'
@@ -46,6 +56,8 @@ class ArquivoAula(Base):
     caminho = Column(String(500), nullable=False)
     
     aula = relationship("Aula", back_populates="arquivos")
+    
+    __table_args__ = (Index('ix_arquivos_aula_aula_id', 'aula_id'),)
 
 class LinkAula(Base):
     __tablename__ = 'links_aula'
@@ -56,6 +68,8 @@ class LinkAula(Base):
     url = Column(String(500), nullable=False)
     
     aula = relationship("Aula", back_populates="links")
+    
+    __table_args__ = (Index('ix_links_aula_aula_id', 'aula_id'),)
 
 class ComentarioAula(Base):
     __tablename__ = 'comentarios_aula'
@@ -67,6 +81,8 @@ class ComentarioAula(Base):
     data = Column(DateTime, default=datetime.datetime.utcnow)
     
     aula = relationship("Aula", back_populates="comentarios")
+    
+    __table_args__ = (Index('ix_comentarios_aula_aula_id', 'aula_id'),)
 
 class Notificacao(Base):
     __tablename__ = 'notificacoes'
@@ -78,6 +94,8 @@ class Notificacao(Base):
     dados = Column(Text)  # JSON como string
     data = Column(DateTime, default=datetime.datetime.utcnow)
     lida = Column(Boolean, default=False)
+    
+    __table_args__ = (Index('ix_notificacoes_lida_recurso_data', 'lida', 'recurso', 'data'),)
 
 class AtualizacaoSite(Base):
     __tablename__ = 'atualizacoes_site'
@@ -88,6 +106,8 @@ class AtualizacaoSite(Base):
     ultima_atualizacao = Column(DateTime)
     ultima_lida = Column(DateTime)
     quantidade_nao_lida = Column(Integer, default=0)
+    
+    __table_args__ = (Index('ix_atualizacoes_site_chave', 'chave'),)
 
 class FCMToken(Base):
     __tablename__ = 'fcm_tokens'
@@ -105,4 +125,6 @@ class CodigoRecuperacao(Base):
     email = Column(String(100), nullable=False)
     codigo = Column(String(6), nullable=False)
     tempo_expiracao = Column(DateTime, nullable=False)
-    utilizado = Column(Boolean, default=False)
\ No newline at end of file
+    utilizado = Column(Boolean, default=False)
+    
+    __table_args__ = (Index('ix_codigos_recuperacao_email', 'email', 'utilizado'),)
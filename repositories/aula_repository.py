@@ -1,22 +1,33 @@
 import os
 import logging
+from sqlalchemy import select, or_, and_
 from models.database_manager import DatabaseManager
-from models.database_models import Aula, ArquivoAula, LinkAula, ComentarioAula
+from models.database_models import Aula, ArquivoAula, LinkAula, ComentarioAula, Usuario
+from utils.blob_store import obter_blob_store, calcular_sha256
 from datetime import datetime
 
 logger = logging.getLogger('degeo_app')
 
+# Quantidade padrão de aulas por página nas consultas paginadas
+TAMANHO_PAGINA_PADRAO = 20
+
 class AulaRepository:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_path=None, db_manager=None):
+        # Por padrão usa a engine compartilhada do banco (uma por caminho)
+        self.db_manager = db_manager or DatabaseManager(db_path)
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
     
+    @property
+    def blobs(self):
+        """Blob store (anexos deduplicados por SHA-256) do diretório de dados"""
+        return obter_blob_store(self.data_dir)
+    
     def criar_aula(self, titulo, disciplina, observacoes, arquivos, links, professor_nome):
         """Cria uma nova aula no banco de dados"""
         session = self.db_manager.get_session()
+        blobs_adicionados = []
         try:
             # Primeiro, busca o professor pelo nome
-            from models.database_models import Usuario
             professor = session.query(Usuario).filter(
                 Usuario.nome == professor_nome,
                 Usuario.tipo == 'professor'
@@ -37,21 +48,16 @@ class AulaRepository:
             session.add(nova_aula)
             session.flush()  # Para obter o ID da aula
             
-            # Processa arquivos
+            # Processa arquivos (conteúdo repetido não é copiado de novo)
             for arquivo_path in arquivos:
                 if os.path.exists(arquivo_path):
-                    nome_arquivo = os.path.basename(arquivo_path)
-                    aula_dir = os.path.join(self.data_dir, "arquivos", str(nova_aula.id))
-                    os.makedirs(aula_dir, exist_ok=True)
-                    
-                    destino = os.path.join(aula_dir, nome_arquivo)
-                    import shutil
-                    shutil.copy2(arquivo_path, destino)
+                    digest = self.blobs.adicionar(arquivo_path)
+                    blobs_adicionados.append(digest)
                     
                     arquivo_aula = ArquivoAula(
                         aula_id=nova_aula.id,
-                        nome=nome_arquivo,
-                        caminho=os.path.join("arquivos", str(nova_aula.id), nome_arquivo)
+                        nome=os.path.basename(arquivo_path),
+                        caminho=self.blobs.caminho_relativo(digest)
                     )
                     session.add(arquivo_aula)
             
@@ -70,6 +76,9 @@ class AulaRepository:
             
         except Exception as e:
             session.rollback()
+            # A aula não foi gravada: devolve as referências tomadas
+            for digest in blobs_adicionados:
+                self.blobs.liberar(digest)
             logger.error(f"Erro ao criar aula: {e}")
             return False, f"Erro ao criar aula: {str(e)}"
         finally:
@@ -79,13 +88,7 @@ class AulaRepository:
         """Obtém todas as aulas de um professor específico"""
         session = self.db_manager.get_session()
         try:
-            from models.database_models import Usuario
-            
-            aulas = session.query(Aula).join(Usuario).filter(
-                Usuario.nome == professor_nome
-            ).order_by(Aula.data_criacao.desc()).all()
-            
-            return self._aulas_para_dict(aulas)
+            return self._consultar_aulas(session, Usuario.nome == professor_nome)
             
         except Exception as e:
             logger.error(f"Erro ao obter aulas do professor: {e}")
@@ -97,8 +100,7 @@ class AulaRepository:
         """Obtém todas as aulas (para alunos)"""
         session = self.db_manager.get_session()
         try:
-            aulas = session.query(Aula).order_by(Aula.data_criacao.desc()).all()
-            return self._aulas_para_dict(aulas)
+            return self._consultar_aulas(session)
             
         except Exception as e:
             logger.error(f"Erro ao obter todas as aulas: {e}")
@@ -106,9 +108,56 @@ class AulaRepository:
         finally:
             session.close()
     
+    def obter_aula(self, aula_id):
+        """Obtém uma aula (com arquivos, links e comentários) pelo ID"""
+        session = self.db_manager.get_session()
+        try:
+            aulas = self._consultar_aulas(session, Aula.id == aula_id)
+            return aulas[0] if aulas else None
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter aula {aula_id}: {e}")
+            return None
+        finally:
+            session.close()
+    
+    def obter_aulas_paginadas(self, professor_nome=None, cursor=None, tamanho_pagina=TAMANHO_PAGINA_PADRAO):
+        """Obtém uma página de aulas (mais recente primeiro) com paginação por cursor
+        
+        O cursor é o par (data_criacao, id) da última aula da página anterior;
+        a próxima página começa logo depois dele, sem OFFSET. Retorna a tupla
+        (aulas, proximo_cursor); proximo_cursor é None na última página.
+        """
+        session = self.db_manager.get_session()
+        try:
+            condicoes = []
+            if professor_nome is not None:
+                condicoes.append(Usuario.nome == professor_nome)
+            if cursor:
+                data_cursor, id_cursor = cursor
+                if isinstance(data_cursor, str):
+                    data_cursor = datetime.fromisoformat(data_cursor)
+                condicoes.append(or_(
+                    Aula.data_criacao < data_cursor,
+                    and_(Aula.data_criacao == data_cursor, Aula.id < id_cursor)
+                ))
+            
+            aulas = self._consultar_aulas(session, *condicoes, limite=tamanho_pagina)
+            proximo_cursor = None
+            if len(aulas) == tamanho_pagina:
+                proximo_cursor = (aulas[-1]["data_criacao"], aulas[-1]["id"])
+            return aulas, proximo_cursor
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter página de aulas: {e}")
+            return [], None
+        finally:
+            session.close()
+    
     def atualizar_aula(self, aula_id, titulo, disciplina, observacoes, arquivos, links, professor_nome):
         """Atualiza uma aula existente"""
         session = self.db_manager.get_session()
+        blobs_adicionados = []
         try:
             aula = session.query(Aula).filter(Aula.id == aula_id).first()
             
@@ -120,21 +169,21 @@ class AulaRepository:
             aula.disciplina = disciplina.strip()
             aula.observacoes = observacoes.strip()
             
-            # Processa novos arquivos
+            # Processa novos arquivos (ignora conteúdo que a aula já tem)
+            digests_da_aula = {self.blobs.digest_de(a.caminho) for a in aula.arquivos}
             for arquivo_path in arquivos:
                 if os.path.exists(arquivo_path):
-                    nome_arquivo = os.path.basename(arquivo_path)
-                    aula_dir = os.path.join(self.data_dir, "arquivos", str(aula_id))
-                    os.makedirs(aula_dir, exist_ok=True)
-                    
-                    destino = os.path.join(aula_dir, nome_arquivo)
-                    import shutil
-                    shutil.copy2(arquivo_path, destino)
+                    digest = calcular_sha256(arquivo_path)
+                    if digest in digests_da_aula:
+                        continue
+                    self.blobs.adicionar(arquivo_path, digest=digest)
+                    blobs_adicionados.append(digest)
+                    digests_da_aula.add(digest)
                     
                     arquivo_aula = ArquivoAula(
                         aula_id=aula_id,
-                        nome=nome_arquivo,
-                        caminho=os.path.join("arquivos", str(aula_id), nome_arquivo)
+                        nome=os.path.basename(arquivo_path),
+                        caminho=self.blobs.caminho_relativo(digest)
                     )
                     session.add(arquivo_aula)
             
@@ -155,6 +204,8 @@ class AulaRepository:
             
         except Exception as e:
             session.rollback()
+            for digest in blobs_adicionados:
+                self.blobs.liberar(digest)
             logger.error(f"Erro ao atualizar aula: {e}")
             return False, f"Erro ao atualizar aula: {str(e)}"
         finally:
@@ -169,7 +220,9 @@ class AulaRepository:
             if not aula:
                 return False, "Aula não encontrada"
             
-            # Exclui arquivos físicos
+            digests = [self.blobs.digest_de(arquivo.caminho) for arquivo in aula.arquivos]
+            
+            # Exclui arquivos físicos (layout antigo, anterior ao blob store)
             aula_dir = os.path.join(self.data_dir, "arquivos", str(aula_id))
             if os.path.exists(aula_dir):
                 import shutil
@@ -179,6 +232,10 @@ class AulaRepository:
             session.delete(aula)
             session.commit()
             
+            # Libera os anexos; blobs sem outras referências são apagados
+            for digest in digests:
+                self.blobs.liberar(digest)
+            
             logger.info(f"Aula excluída: ID {aula_id}")
             return True, "Aula excluída com sucesso"
             
@@ -213,27 +270,64 @@ class AulaRepository:
         finally:
             session.close()
     
-    def _aulas_para_dict(self, aulas):
-        """Converte objetos Aula para dicionários (compatibilidade)"""
-        resultado = []
-        for aula in aulas:
-            aula_dict = {
-                "id": aula.id,
-                "titulo": aula.titulo,
-                "disciplina": aula.disciplina,
-                "observacoes": aula.observacoes,
-                "professor": aula.professor.nome if aula.professor else "",
-                "data_criacao": aula.data_criacao.isoformat(),
-                "arquivos": [{"nome": a.nome, "caminho": a.caminho} for a in aula.arquivos],
-                "links": [{"titulo": l.titulo, "url": l.url} for l in aula.links],
-                "comentarios": [
-                    {
-                        "nome_aluno": c.nome_aluno,
-                        "comentario": c.comentario,
-                        "data": c.data.isoformat()
-                    } for c in aula.comentarios
-                ]
-            }
-            resultado.append(aula_dict)
+    def _consultar_aulas(self, session, *condicoes, limite=None):
+        """Carrega aulas + professor, arquivos, links e comentários em 4 consultas fixas
+        
+        Em vez de acessar os relacionamentos lazy de cada aula (N+1), faz uma
+        projeção das aulas (com o nome do professor via JOIN) e uma consulta
+        por tabela filha, filtrada pela mesma subconsulta de IDs. O número de
+        consultas não depende da quantidade de aulas.
+        """
+        consulta = (
+            select(
+                Aula.id, Aula.titulo, Aula.disciplina, Aula.observacoes,
+                Aula.data_criacao, Usuario.nome.label("professor")
+            )
+            .outerjoin(Usuario, Aula.professor_id == Usuario.id)
+            .where(*condicoes)
+            .order_by(Aula.data_criacao.desc(), Aula.id.desc())
+        )
+        if limite is not None:
+            consulta = consulta.limit(limite)
+        linhas = session.execute(consulta).all()
+        if not linhas:
+            return []
+        
+        ids_aulas = select(consulta.with_only_columns(Aula.id).subquery().c.id)
+        
+        arquivos, links, comentarios = {}, {}, {}
+        for aula_id, nome, caminho in session.execute(
+            select(ArquivoAula.aula_id, ArquivoAula.nome, ArquivoAula.caminho)
+            .where(ArquivoAula.aula_id.in_(ids_aulas)).order_by(ArquivoAula.id)
+        ):
+            arquivos.setdefault(aula_id, []).append({"nome": nome, "caminho": caminho})
+        
+        for aula_id, titulo, url in session.execute(
+            select(LinkAula.aula_id, LinkAula.titulo, LinkAula.url)
+            .where(LinkAula.aula_id.in_(ids_aulas)).order_by(LinkAula.id)
+        ):
+            links.setdefault(aula_id, []).append({"titulo": titulo, "url": url})
+        
+        for aula_id, nome_aluno, comentario, data in session.execute(
+            select(ComentarioAula.aula_id, ComentarioAula.nome_aluno, ComentarioAula.comentario, ComentarioAula.data)
+            .where(ComentarioAula.aula_id.in_(ids_aulas)).order_by(ComentarioAula.id)
+        ):
+            comentarios.setdefault(aula_id, []).append({
+                "nome_aluno": nome_aluno,
+                "comentario": comentario,
+                "data": data.isoformat()
+            })
         
-        return resultado
\ No newline at end of file
+        return [
+            {
+                "id": linha.id,
+                "titulo": linha.titulo,
+                "disciplina": linha.disciplina,
+                "observacoes": linha.observacoes,
+                "professor": linha.professor or "",
+                "data_criacao": linha.data_criacao.isoformat(),
+                "arquivos": arquivos.get(linha.id, []),
+                "links": links.get(linha.id, []),
+                "comentarios": comentarios.get(linha.id, [])
+            } for linha in linhas
+        ]
@@ -1,4 +1,5 @@
 import logging
+from sqlalchemy import update, or_
 from models.database_manager import DatabaseManager
 from models.database_models import Notificacao, AtualizacaoSite, FCMToken
 from datetime import datetime
@@ -6,8 +7,9 @@ from datetime import datetime
 logger = logging.getLogger('degeo_app')
 
 class NotificacaoRepository:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_path=None, db_manager=None):
+        # Por padrão usa a engine compartilhada do banco (uma por caminho)
+        self.db_manager = db_manager or DatabaseManager(db_path)
     
     def adicionar_notificacao(self, recurso, titulo, mensagem, dados=None):
         """Adiciona uma nova notificação"""
@@ -65,27 +67,50 @@ class NotificacaoRepository:
             session.close()
     
     def marcar_como_lida(self, notificacao_id=None, recurso=None):
-        """Marca notificações como lidas"""
+        """Marca notificações como lidas com um único UPDATE
+        
+        Retorna (True, quantidade de notificações alteradas).
+        """
+        condicoes = []
+        if notificacao_id:
+            condicoes.append(Notificacao.id == notificacao_id)
+        elif recurso:
+            condicoes.append(Notificacao.recurso == recurso)
+        return self._marcar_lidas(condicoes)
+    
+    def marcar_varias_como_lidas(self, ids=None, recursos=None):
+        """Marca como lidas várias notificações (por id e/ou recurso) numa só transação"""
+        ids = list(ids or [])
+        recursos = list(recursos or [])
+        if not ids and not recursos:
+            return True, 0
+        
+        condicoes = []
+        if ids:
+            condicoes.append(Notificacao.id.in_(ids))
+        if recursos:
+            condicoes.append(Notificacao.recurso.in_(recursos))
+        return self._marcar_lidas([or_(*condicoes)])
+    
+    def _marcar_lidas(self, condicoes):
+        """UPDATE notificacoes SET lida = 1 WHERE lida = 0 AND <condições>"""
         session = self.db_manager.get_session()
         try:
-            query = session.query(Notificacao).filter(Notificacao.lida == False)
-            
-            if notificacao_id:
-                query = query.filter(Notificacao.id == notificacao_id)
-            elif recurso:
-                query = query.filter(Notificacao.recurso == recurso)
-            
-            notificacoes = query.all()
-            for notificacao in notificacoes:
-                notificacao.lida = True
-            
+            resultado = session.execute(
+                update(Notificacao)
+                .where(Notificacao.lida == False, *condicoes)
+                .values(lida=True)
+                .execution_options(synchronize_session=False)
+            )
             session.commit()
-            logger.info(f"Notificações marcadas como lidas: {len(notificacoes)}")
-            return True, f"{len(notificacoes)} notificações marcadas como lidas"
+            
+            quantidade = resultado.rowcount
+            logger.info(f"Notificações marcadas como lidas: {quantidade}")
+            return True, quantidade
             
         except Exception as e:
             session.rollback()
             logger.error(f"Erro ao marcar notificações como lidas: {e}")
             return False, f"Erro ao marcar notificações como lidas: {str(e)}"
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
@@ -6,8 +6,9 @@ from models.database_models import Usuario
 logger = logging.getLogger('degeo_app')
 
 class UsuarioRepository:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_path=None, db_manager=None):
+        # Por padrão usa a engine compartilhada do banco (uma por caminho)
+        self.db_manager = db_manager or DatabaseManager(db_path)
     
     def criar_usuario(self, nome, email, senha, tipo, genero=None, disciplina=None):
         """Cria um novo usuário no banco de dados"""
@@ -11,7 +11,7 @@ import os
 import time
 import threading
 from utils.aulas_manager import AulasManager
-from utils.atualizacoes_manager import AtualizacoesManager
+from services.agendador_atualizacoes import obter_agendador, FONTES
 import logging
 
 # Configurar logging
@@ -22,96 +22,25 @@ class AlunoHomeScreen(Screen):
         super(AlunoHomeScreen, self).__init__(**kwargs)
         self.name = "aluno_home"
         self.aulas_manager = AulasManager(data_dir=os.path.join(os.path.dirname(__file__), "..", "data"))
-        self.atualizacoes_manager = AtualizacoesManager(data_dir=os.path.join(os.path.dirname(__file__), "..", "data"))
+        # Verificações e notificações ficam no agendador do app
+        self.agendador = obter_agendador()
         
         # Mapeamento de botões para URLs e recursos
-        self.botoes_info = {
-            "noticias": {
-                "nome": "Notícias", 
-                "url": "https://geologia.ufc.br/pt/category/noticias/",
-                "descricao": "Verifique as últimas notícias do departamento",
-                "recurso": "noticias"
-            },
-            "calendario_academico": {
-                "nome": "Calendário Acadêmico", 
-                "url": "https://www.ufc.br/calendario-universitario/2025",
-                "descricao": "Consulte o calendário universitário",
-                "recurso": "calendario"
-            },
-            "revista": {
-                "nome": "Revista", 
-                "url": "https://www.periodicos.ufc.br/index.php/geologia",
-                "descricao": "Acesse a revista do departamento",
-                "recurso": "revista"
-            },
-            "graduacao": {
-                "nome": "Graduação", 
-                "url": "https://geologia.ufc.br/pt/graduacao/",
-                "descricao": "Informações sobre o curso de graduação",
-                "recurso": "graduacao"
-            },
-            "sobre_a_geologia": {
-                "nome": "Sobre a Geologia", 
-                "url": "https://geologia.ufc.br/pt/sobre-a-geologia/",
-                "descricao": "Conheça mais sobre a geologia",
-                "recurso": "sobre_geologia"
-            },
-            "sobre_o_departamento": {
-                "nome": "Sobre o Departamento", 
-                "url": "https://geologia.ufc.br/pt/sobre/",
-                "descricao": "Saiba mais sobre nosso departamento",
-                "recurso": "sobre_departamento"
-            },
-            "coordenacao": {
-                "nome": "Coordenação", 
-                "url": "https://geologia.ufc.br/pt/estrutura-organizacional-da-coordenacao-de-graduacao/",
-                "descricao": "Contato com a coordenação de graduação",
-                "recurso": "coordenacao"
-            },
-            "acessibilidade": {
-                "nome": "Acessibilidade", 
-                "url": "https://geologia.ufc.br/pt/acessibilidade/",
-                "descricao": "Recursos de acessibilidade",
-                "recurso": "acessibilidade"
-            },
-            "normas_ufc": {
-                "nome": "Normas UFC", 
-                "url": "https://geologia.ufc.br/pt/estatuto-regimento-e-normas-da-ufc/",
-                "descricao": "Consulte as normas da UFC",
-                "recurso": "normas_ufc"
-            }
-        }
+        self.botoes_info = {fonte["recurso"]: fonte for fonte in FONTES}
         
         # Dicionário para armazenar os botões e seus indicadores
         self.botoes = {}
         self.indicadores = {}
-        
-        # Cache para evitar verificações excessivas
-        self.ultima_verificacao = 0
-        self.intervalo_minimo_verificacao = 300  # 5 minutos
-        self._inicializar_servicos_notificacao()
-
-    def _inicializar_servicos_notificacao(self):
-        """Inicializa os serviços de notificação"""
-        try:
-            # Inicializar gerenciador de notificações
-            self.atualizacoes_manager.notificacoes_manager.inicializar_servicos()
-            logger.info("Serviços de notificação inicializados")
-        except Exception as e:
-            logger.error(f"Erro ao inicializar serviços de notificação: {e}")    
-
 
     def on_enter(self, *args):
         """Método chamado quando a tela é exibida"""
         logger.debug("Construindo interface do aluno")
         Clock.schedule_once(self.construir_interface, 0)
-        # Iniciar verificação periódica de atualizações
-        Clock.schedule_interval(self.verificar_atualizacoes, self.intervalo_minimo_verificacao)
 
     def on_leave(self, *args):
         """Método chamado quando a tela é deixada"""
-        # Cancelar verificações periódicas
-        Clock.unschedule(self.verificar_atualizacoes)
+        # Parar de receber as contagens do agendador
+        self.agendador.cancelar_inscricao(self._atualizar_indicador)
 
     def construir_interface(self, dt=None):
         """Constrói a interface da tela inicial do aluno"""
@@ -267,24 +196,13 @@ class AlunoHomeScreen(Screen):
         self.verificar_atualizacoes()
 
     def verificar_atualizacoes(self, dt=None):
-        """Verifica atualizações para todos os recursos"""
+        """Recebe as contagens do agendador e pede uma nova rodada de verificações"""
         logger.debug("Verificando atualizações")
-        
-        for chave, info in self.botoes_info.items():
-            recurso = info["recurso"]
-            url = info["url"]
-            
-            # Verificar se há atualizações
-            def criar_callback(chave_recurso):
-                def callback(quantidade):
-                    self._atualizar_indicador(chave_recurso, quantidade)
-                return callback
-            
-            self.atualizacoes_manager.verificar_atualizacao(
-                recurso, 
-                url, 
-                criar_callback(chave)
-            )
+        # A inscrição já entrega as contagens conhecidas; a rodada só busca o
+        # que passou do intervalo mínimo
+        self.agendador.inscrever(self._atualizar_indicador)
+        self.agendador.verificar_todas()
+        logger.debug(f"Verificações de sites: {self.agendador.diagnostico()}")
 
     def _atualizar_indicador(self, chave, quantidade):
         """Atualiza o indicador de notificação para um recurso específico"""
@@ -304,26 +222,21 @@ class AlunoHomeScreen(Screen):
 
     def abrir_site(self, chave):
         """Abre o site correspondente e marca como lido"""
-        if chave in self.botoes_info:
-            info = self.botoes_info[chave]
-            logger.info(f"Abrindo {info['nome']}")
-            
-             # ✅ MODIFICADO: Marcar notificações como lidas
-        if self.atualizacoes_manager.marcar_como_lido(info["recurso"]):
-            # Também marcar no gerenciador de notificações
-            self.atualizacoes_manager.notificacoes_manager.marcar_como_lida(info["recurso"])
-            
-            # Atualizar indicador
-            if chave in self.indicadores:
-                self.indicadores[chave].opacity = 0
-            
-            # Abrir site de forma assíncrona para evitar travamentos
-            threading.Thread(
-                target=lambda: webbrowser.open(info["url"], autoraise=True),
-                daemon=True
-            ).start()
-        else:
+        if chave not in self.botoes_info:
             logger.warning(f"Chave não encontrada: {chave}")
+            return
+        
+        info = self.botoes_info[chave]
+        logger.info(f"Abrindo {info['nome']}")
+        
+        # ✅ MODIFICADO: Marcar notificações como lidas (zera o badge em todas as telas inscritas)
+        self.agendador.marcar_como_lido(info["recurso"])
+        
+        # Abrir site de forma assíncrona para evitar travamentos
+        threading.Thread(
+            target=lambda: webbrowser.open(info["url"], autoraise=True),
+            daemon=True
+        ).start()
 
     def voltar_para_login(self, instance):
         """Volta para a tela de login"""
@@ -24,6 +24,10 @@ class AlunoAulasScreen(Screen):
         self.filtrar_por_professor = None
         self.filtrar_por_disciplina = None
         self.titulo_personalizado = None # Para exibir um título específico
+        # Paginação: cursor da próxima página e trava para não pedir a mesma página duas vezes
+        self.scroll = None
+        self.proximo_cursor = None
+        self.carregando_pagina = False
         logger.debug("AlunoAulasScreen inicializada.")
         
     
@@ -64,6 +68,9 @@ class AlunoAulasScreen(Screen):
 
         # ✅ CORREÇÃO: ScrollView para a lista de aulas
         scroll = ScrollView()
+        self.scroll = scroll
+        # Carrega a próxima página quando o aluno chega perto do fim da lista
+        scroll.bind(scroll_y=self._ao_rolar)
         self.aulas_layout = BoxLayout(
             orientation='vertical',
             size_hint_y=None,
@@ -116,15 +123,11 @@ class AlunoAulasScreen(Screen):
 
         try:
             logger.debug(f"Carregando aulas para o professor: '{self.filtrar_por_professor}'")
-            todas_aulas = self.aulas_manager.obter_aulas()
-            logger.debug(f"Total de aulas carregadas: {len(todas_aulas)}")
-
-            # ✅ CORREÇÃO: Aplicar filtro APENAS por professor
-            # A lógica agora é: MOSTRAR TODAS AS AULAS que pertencem AO PROFESSOR selecionado
-            aulas_filtradas = [a for a in todas_aulas if a.get("professor", "") == self.filtrar_por_professor]
-            logger.debug(f"Aulas após filtro de professor '{self.filtrar_por_professor}': {len(aulas_filtradas)}")
-
-            aulas = aulas_filtradas
+            # ✅ Apenas a primeira página (mais recente primeiro); as demais vêm com a rolagem
+            aulas, self.proximo_cursor = self.aulas_manager.obter_aulas_paginadas(
+                professor=self.filtrar_por_professor
+            )
+            logger.debug(f"Primeira página do professor '{self.filtrar_por_professor}': {len(aulas)} aulas")
 
             if not aulas:
                 self.aulas_layout.add_widget(Label(
@@ -135,54 +138,8 @@ class AlunoAulasScreen(Screen):
                 ))
                 return
 
-            # Ordenar as aulas pela data de criação (mais recente primeiro)
-            # Supondo que 'data_criacao' seja uma string ISO 8601
-            try:
-                aulas.sort(key=lambda a: a.get("data_criacao", ""), reverse=True)
-            except Exception as e:
-                logger.warning(f"Erro ao ordenar aulas por data_criacao: {e}")
-
-            # Para cada aula filtrada, criar um botão para visualizá-la
-            for aula in aulas:
-                # Layout para a aula
-                aula_layout = BoxLayout(
-                    orientation='vertical',
-                    size_hint_y=None,
-                    height=70, # Ajustar altura conforme necessário
-                    spacing=5
-                )
-
-                # Botão com o título da aula
-                btn_aula = Button(
-                    text=aula["titulo"],
-                    background_color=[0.05, 0.15, 0.35, 1],
-                    color=[1, 1, 1, 1],
-                    size_hint_y=None,
-                    height=50,
-                    halign='left',
-                    valign='middle',
-                    text_size=(None, None)
-                )
-                # ✅ CORREÇÃO: Vincula o clique à visualização da aula
-                # Passa a aula inteira para o lambda
-                btn_aula.bind(on_release=lambda instance, a=aula: self.abrir_aula(a))
-                aula_layout.add_widget(btn_aula)
-
-                # Informações da disciplina (se disponível)
-                # (Este bloco pode ser removido se a informação já estiver implícita pelo filtro)
-                # if "disciplina" in aula and aula["disciplina"]:
-                #     disciplina = Label(
-                #         text=f"Disciplina: {aula['disciplina']}",
-                #         color=[0.5, 0.5, 0.5, 1],
-                #         size_hint_y=None,
-                #         height=20,
-                #         font_size=12,
-                #         halign='left'
-                #     )
-                #     disciplina.bind(size=disciplina.setter('text_size'))
-                #     aula_layout.add_widget(disciplina)
-
-                self.aulas_layout.add_widget(aula_layout)
+            self._adicionar_aulas(aulas)
+            Clock.schedule_once(self._preencher_tela, 0)
 
         except Exception as e:
             logger.error(f"Erro ao carregar aulas: {e}", exc_info=True)
@@ -193,6 +150,65 @@ class AlunoAulasScreen(Screen):
                 height=50
             ))
 
+    def carregar_mais_aulas(self):
+        """Busca e exibe a próxima página de aulas, se houver"""
+        if not self.proximo_cursor or self.carregando_pagina or not self.aulas_layout:
+            return
+
+        self.carregando_pagina = True
+        try:
+            aulas, self.proximo_cursor = self.aulas_manager.obter_aulas_paginadas(
+                professor=self.filtrar_por_professor,
+                cursor=self.proximo_cursor
+            )
+            logger.debug(f"Próxima página carregada: {len(aulas)} aulas")
+            self._adicionar_aulas(aulas)
+        except Exception as e:
+            logger.error(f"Erro ao carregar mais aulas: {e}", exc_info=True)
+            self.proximo_cursor = None
+        finally:
+            self.carregando_pagina = False
+
+    def _ao_rolar(self, scroll, scroll_y):
+        """Pede mais uma página quando a rolagem se aproxima do fim (scroll_y -> 0)"""
+        if scroll_y <= 0.1:
+            self.carregar_mais_aulas()
+
+    def _preencher_tela(self, dt=None):
+        """Carrega páginas até a lista ocupar a tela (sem conteúdo não há rolagem)"""
+        if self.proximo_cursor and self.scroll and self.aulas_layout.height <= self.scroll.height:
+            self.carregar_mais_aulas()
+            Clock.schedule_once(self._preencher_tela, 0)
+
+    def _adicionar_aulas(self, aulas):
+        """Adiciona um botão para cada aula da página"""
+        for aula in aulas:
+            # Layout para a aula
+            aula_layout = BoxLayout(
+                orientation='vertical',
+                size_hint_y=None,
+                height=70, # Ajustar altura conforme necessário
+                spacing=5
+            )
+
+            # Botão com o título da aula
+            btn_aula = Button(
+                text=aula["titulo"],
+                background_color=[0.05, 0.15, 0.35, 1],
+                color=[1, 1, 1, 1],
+                size_hint_y=None,
+                height=50,
+                halign='left',
+                valign='middle',
+                text_size=(None, None)
+            )
+            # ✅ CORREÇÃO: Vincula o clique à visualização da aula
+            # Passa a aula inteira para o lambda
+            btn_aula.bind(on_release=lambda instance, a=aula: self.abrir_aula(a))
+            aula_layout.add_widget(btn_aula)
+
+            self.aulas_layout.add_widget(aula_layout)
+
     # ✅ ADIÇÃO: Novo método para voltar à tela de seleção
     def voltar_para_lista_professores(self, instance):
         """Volta para a tela de seleção de professor/disciplina"""
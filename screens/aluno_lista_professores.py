@@ -1,13 +1,16 @@
 # screens/aluno_lista_professores.py
 import os
 import logging
+import threading
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.textinput import TextInput
 from kivy.clock import Clock
+from kivy.utils import escape_markup
 
 from utils.aulas_manager import AulasManager
 
@@ -23,6 +26,11 @@ class AlunoListaProfessoresScreen(Screen):
         self.name = "aluno_lista_professores"
         self.aulas_manager = AulasManager(data_dir=os.path.join(os.path.dirname(__file__), "..", "data"))
         self.professores_disciplinas_layout = None
+        # Busca textual no catálogo de aulas (o mesmo das listagens)
+        self.campo_busca = None
+        self._busca_agendada = None
+        # Número da última busca pedida: resultados de buscas anteriores são descartados
+        self._busca_atual = 0
         logger.debug("AlunoListaProfessoresScreen inicializada.")
 
     def on_enter(self, *args):
@@ -51,6 +59,16 @@ class AlunoListaProfessoresScreen(Screen):
         )
         main_layout.add_widget(titulo)
 
+        # Campo de busca: com texto, a lista mostra as aulas encontradas
+        self.campo_busca = TextInput(
+            hint_text="Buscar aulas, observações ou comentários...",
+            multiline=False,
+            size_hint_y=None,
+            height="45dp"
+        )
+        self.campo_busca.bind(text=self._ao_digitar_busca)
+        main_layout.add_widget(self.campo_busca)
+
         # Espaço
         main_layout.add_widget(Widget(size_hint_y=0.05))
 
@@ -227,6 +245,93 @@ class AlunoListaProfessoresScreen(Screen):
             logger.debug("--- FINALIZANDO carregar_professores_disciplinas (EXCEÇÃO) ---")
 
 
+    def _ao_digitar_busca(self, instance, texto):
+        """Agenda a busca para quando o aluno parar de digitar"""
+        if self._busca_agendada:
+            self._busca_agendada.cancel()
+        self._busca_agendada = Clock.schedule_once(lambda dt: self.buscar_aulas(texto), 0.3)
+
+    def buscar_aulas(self, texto):
+        """Busca as aulas em segundo plano (ou volta à lista de professores, se vazio)"""
+        self._busca_atual += 1
+        if not self.professores_disciplinas_layout:
+            return
+        if not texto.strip():
+            self.carregar_professores_disciplinas()
+            return
+
+        numero = self._busca_atual
+
+        def buscar():
+            # Marcadores de controle: o texto da aula é escapado antes de virar markup
+            resultados = self.aulas_manager.buscar_aulas(texto, destaque=("\x02", "\x03"))
+            logger.debug(f"Busca '{texto}': {len(resultados)} aulas")
+            Clock.schedule_once(lambda dt: self.exibir_resultados(numero, resultados), 0)
+
+        threading.Thread(target=buscar, daemon=True).start()
+
+    def exibir_resultados(self, numero, resultados):
+        """Lista as aulas encontradas, se ainda for a busca mais recente"""
+        if numero != self._busca_atual or not self.professores_disciplinas_layout:
+            return
+        layout = self.professores_disciplinas_layout
+        layout.clear_widgets()
+
+        if not resultados:
+            self._adicionar_mensagem(layout, "Nenhuma aula encontrada.", nivel="info")
+            return
+
+        for resultado in resultados:
+            item_layout = BoxLayout(
+                orientation='vertical',
+                size_hint_y=None,
+                height=110,
+                spacing=5
+            )
+
+            btn_aula = Button(
+                text=f"{resultado['titulo']}\n{resultado['professor']} - {resultado['disciplina'] or ''}",
+                background_color=[0.05, 0.15, 0.35, 1],
+                color=[1, 1, 1, 1],
+                size_hint_y=None,
+                height=60,
+                halign='center',
+                valign='middle',
+                font_size=16
+            )
+            btn_aula.bind(on_release=lambda instance, aula_id=resultado["id"]: self.abrir_resultado(aula_id))
+            item_layout.add_widget(btn_aula)
+
+            trecho = escape_markup(resultado["trecho"] or "").replace("\x02", "[b]").replace("\x03", "[/b]")
+            label_trecho = Label(
+                text=trecho,
+                markup=True,
+                color=[0.3, 0.3, 0.3, 1],
+                size_hint_y=None,
+                height=40,
+                font_size=13,
+                halign='left',
+                valign='top'
+            )
+            label_trecho.bind(size=label_trecho.setter('text_size'))
+            item_layout.add_widget(label_trecho)
+
+            layout.add_widget(item_layout)
+
+    def abrir_resultado(self, aula_id):
+        """Abre a aula escolhida nos resultados da busca"""
+        aula = self.aulas_manager.obter_aula(aula_id)
+        if not aula:
+            self.mostrar_erro("Aula não encontrada.")
+            return
+        try:
+            screen = self.manager.get_screen('aluno_visualizar_aula')
+            screen.carregar_aula(aula)
+            self.manager.current = 'aluno_visualizar_aula'
+        except Exception as e:
+            logger.error(f"Erro ao abrir aula da busca: {e}", exc_info=True)
+            self.mostrar_erro(f"Erro ao abrir aula: {str(e)}")
+
     def _adicionar_mensagem(self, layout, mensagem, nivel="info"):
         """Adiciona uma mensagem de erro ou informação a um layout específico."""
         if not layout:
@@ -10,9 +10,11 @@ from kivy.uix.widget import Widget
 from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.progressbar import ProgressBar
 from kivy.clock import Clock
 
 from utils.aulas_manager import AulasManager
+from utils.ingestao_anexos import IngestaoAnexos
 
 # Configurar logging
 logger = logging.getLogger('degeo_app')
@@ -39,6 +41,13 @@ class ProfessorCriarAulaScreen(Screen):
         self.botoes_excluir_link = []
         # Referência para o FileChooser
         self.filechooser = None
+        # Cópia dos anexos em andamento e popup de progresso
+        self.ingestao = None
+        # Cancelamento pedido pelo professor: vale mesmo se a cópia já terminou
+        self._cancelado = False
+        self.popup_progresso = None
+        self.label_progresso = None
+        self.barra_progresso = None
         logger.debug("ProfessorCriarAulaScreen inicializada.")
 
     # ✅ CORREÇÃO: Resetar o estado da tela ao entrar
@@ -630,77 +639,11 @@ class ProfessorCriarAulaScreen(Screen):
             logger.warning(f"Índice de link inválido para exclusão: {indice}")
 
     def salvar_aula(self, instance):
-        """Salva uma nova aula ou atualiza uma existente"""
-        # Coleta os dados dos campos de input
-        titulo = self.input_titulo.text.strip() if self.input_titulo else ""
-        disciplina = self.input_disciplina.text.strip() if self.input_disciplina else ""
-        observacoes = self.input_observacoes.text.strip() if self.input_observacoes else ""
-
-        # Validações básicas
-        if not titulo:
-            self.mostrar_erro("O título é obrigatório")
-            return
-
-        # Determina se é criação ou edição e chama o método apropriado no aulas_manager
-        if self.modo == 'criar':
-            logger.info(f"Tentando CRIAR nova aula. Professor: '{self.nome_professor}'")
-            sucesso, mensagem = self.aulas_manager.criar_aula(
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa a lista de caminhos de arquivos
-                links=self.links_adicionados,       # Passa a lista de dicionários de links
-                professor=self.nome_professor       # ✅ Passa o nome do professor logado
-            )
-        else: # self.modo == 'editar'
-            logger.info(f"Tentando ATUALIZAR aula ID {self.aula_id}. Professor: '{self.nome_professor}'")
-            # >>>>>>>>> LOG DE DEPURAÇÃO <<<<<<<<<
-            logger.debug(f"[SALVAR_AULA - EDITAR] Estado FINAL de self.arquivos_selecionados ANTES de chamar atualizar_aula: {self.arquivos_selecionados}")
-            logger.debug(f"[SALVAR_AULA - EDITAR] Tamanho da lista ANTES: {len(self.arquivos_selecionados)}")
-            # >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-            sucesso, mensagem = self.aulas_manager.atualizar_aula(
-                aula_id=self.aula_id,
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa os arquivos atuais (novos + mantidos)
-                links=self.links_adicionados,       # Passa os links atuais (novos + mantidos)
-                professor=self.nome_professor       # Passa o nome do professor logado (deve ser o mesmo)
-            )
-            logger.info(f"Tentando ATUALIZAR aula ID {self.aula_id}. Professor: '{self.nome_professor}'")
-            sucesso, mensagem = self.aulas_manager.atualizar_aula(
-                aula_id=self.aula_id,
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa os arquivos atuais (novos + mantidos)
-                links=self.links_adicionados,       # Passa os links atuais (novos + mantidos)
-                professor=self.nome_professor       # ✅ Passa o nome do professor logado (deve ser o mesmo)
-            )
-
-        # Trata o resultado da operação
-        if sucesso:
-            self.mostrar_sucesso("Aula salva com sucesso!")
-            # ✅ CHAMADA AO MÉTODO QUE SERÁ DEFINIDO
-            if self.modo == 'criar':
-                self.limpar_campos() # Limpa os campos apenas após criação
-
-            # Volta para a tela de visualização de aulas após salvar
-            try:
-                # Certifique-se de que o nome do professor está definido na tela de visualização
-                visualizar_screen = self.manager.get_screen('professor_visualizar_aulas')
-                # ✅ Garante que o nome do professor correto seja passado
-                visualizar_screen.nome_professor = self.nome_professor
-                self.manager.current = 'professor_visualizar_aulas'
-            except Exception as e:
-                logger.error(f"Erro ao voltar para a tela de visualização: {e}")
-                # Fallback: Voltar para a tela inicial do professor
-                self.voltar_para_home(instance)
+        """Salva uma nova aula ou atualiza uma existente
 
-        else:
-            self.mostrar_erro(mensagem)
-
-        """Salva uma nova aula ou atualiza uma existente"""
+        Os anexos são copiados em segundo plano (IngestaoAnexos), com barra de
+        progresso e opção de cancelar; a aula só é gravada quando a cópia termina.
+        """
         # Coleta os dados dos campos de input
         titulo = self.input_titulo.text.strip() if self.input_titulo else ""
         disciplina = self.input_disciplina.text.strip() if self.input_disciplina else ""
@@ -711,67 +654,44 @@ class ProfessorCriarAulaScreen(Screen):
             self.mostrar_erro("O título é obrigatório")
             return
 
-        # Determina se é criação ou edição e chama o método apropriado no aulas_manager
-        if self.modo == 'criar':
-            logger.info(f"Tentando CRIAR nova aula. Professor: '{self.nome_professor}'")
-            sucesso, mensagem = self.aulas_manager.criar_aula(
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa a lista de caminhos de arquivos
-                links=self.links_adicionados,       # Passa a lista de dicionários de links
-                professor=self.nome_professor       # Passa o nome do professor logado
-            )
-        else: # self.modo == 'editar'
-            logger.info(f"Tentando ATUALIZAR aula ID {self.aula_id}. Professor: '{self.nome_professor}'")
-            sucesso, mensagem = self.aulas_manager.atualizar_aula(
-                aula_id=self.aula_id,
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa os arquivos atuais (novos + mantidos)
-                links=self.links_adicionados,       # Passa os links atuais (novos + mantidos)
-                professor=self.nome_professor       # Passa o nome do professor logado (deve ser o mesmo)
-            )
-
-        # Trata o resultado da operação
-        if sucesso:
-            self.mostrar_sucesso("Aula salva com sucesso!")
-            # --- LINHA REMOVIDA: self.limpar_campos() ---
-            # Se quiser limpar os campos manualmente aqui, faça-o diretamente, por exemplo:
-            # if self.modo == 'criar':
-            #     if self.input_titulo: self.input_titulo.text = ""
-            #     if self.input_disciplina: self.input_disciplina.text = ""
-            #     if self.input_observacoes: self.input_observacoes.text = ""
-            #     self.arquivos_selecionados = []
-            #     self.links_adicionados = []
-            #     self.atualizar_lista_arquivos()
-            #     self.atualizar_lista_links()
-
-            # Volta para a tela de visualização de aulas após salvar
-            try:
-                # Certifique-se de que o nome do professor está definido na tela de visualização
-                visualizar_screen = self.manager.get_screen('professor_visualizar_aulas')
-                # Passa o nome do professor novamente, por garantia
-                visualizar_screen.nome_professor = self.nome_professor
-                self.manager.current = 'professor_visualizar_aulas'
-            except Exception as e:
-                logger.error(f"Erro ao voltar para a tela de visualização: {e}")
-                # Fallback: Voltar para a tela inicial do professor
-                self.voltar_para_home(instance)
-
-        else:
-            self.mostrar_erro(mensagem)
+        # Evita dois salvamentos simultâneos (duplo clique)
+        if self.ingestao:
+            logger.debug("Salvamento já em andamento; clique ignorado")
+            return
 
-        """Salva uma nova aula ou atualiza uma existente"""
-        # Coleta os dados dos campos de input
-        titulo = self.input_titulo.text.strip() if self.input_titulo else ""
-        disciplina = self.input_disciplina.text.strip() if self.input_disciplina else ""
-        observacoes = self.input_observacoes.text.strip() if self.input_observacoes else ""
+        logger.debug(f"[SALVAR_AULA] Copiando {len(self.arquivos_selecionados)} anexos em segundo plano")
+        self._cancelado = False
+        self._abrir_progresso_anexos()
+        self.ingestao = IngestaoAnexos(
+            self.aulas_manager.blobs,
+            self.arquivos_selecionados,
+            ao_progredir=self._atualizar_progresso_anexos,
+            ao_concluir=lambda sucesso, resultado: self._finalizar_salvamento(
+                sucesso, resultado, titulo, disciplina, observacoes, instance)
+        )
+        self.ingestao.iniciar()
+
+    def _finalizar_salvamento(self, sucesso, resultado, titulo, disciplina, observacoes, instance):
+        """Chamado (via Clock) quando a cópia dos anexos termina"""
+        self.ingestao = None
+        if self.popup_progresso:
+            self.popup_progresso.dismiss()
+            self.popup_progresso = None
+
+        # A cópia pode ter terminado antes do clique em Cancelar chegar
+        if self._cancelado:
+            self._cancelado = False
+            if sucesso:
+                blobs = self.aulas_manager.blobs
+                for anexo in resultado:
+                    blobs.liberar(blobs.digest_de(anexo["caminho"]))
+                resultado = "Envio de anexos cancelado"
+            logger.info("Salvamento cancelado; aula não gravada")
+            self.mostrar_erro(resultado)
+            return
 
-        # Validações básicas
-        if not titulo:
-            self.mostrar_erro("O título é obrigatório")
+        if not sucesso:
+            self.mostrar_erro(resultado)
             return
 
         # Determina se é criação ou edição e chama o método apropriado no aulas_manager
@@ -781,7 +701,7 @@ class ProfessorCriarAulaScreen(Screen):
                 titulo=titulo,
                 disciplina=disciplina,
                 observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa a lista de caminhos de arquivos
+                anexos=resultado,                   # Anexos já copiados para o blob store
                 links=self.links_adicionados,       # Passa a lista de dicionários de links
                 professor=self.nome_professor       # ✅ Passa o nome do professor logado
             )
@@ -792,29 +712,22 @@ class ProfessorCriarAulaScreen(Screen):
                 titulo=titulo,
                 disciplina=disciplina,
                 observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa os arquivos atuais (novos + mantidos)
+                anexos=resultado,                   # Anexos atuais (novos + mantidos) já no blob store
                 links=self.links_adicionados,       # Passa os links atuais (novos + mantidos)
-                professor=self.nome_professor       # ✅ Passa o nome do professor logado (deve ser o mesmo)
+                professor=self.nome_professor       # Passa o nome do professor logado (deve ser o mesmo)
             )
 
         # Trata o resultado da operação
         if sucesso:
             self.mostrar_sucesso("Aula salva com sucesso!")
-            # Limpa os campos se foi uma criação
             if self.modo == 'criar':
-                self.limpar_campos()
-                # Opcional: Atualizar a tela de visualização se estiver aberta
-                # try:
-                #     visualizar_screen = self.manager.get_screen('professor_visualizar_aulas')
-                #     visualizar_screen.carregar_aulas() # Recarrega a lista
-                # except Exception as e:
-                #     logger.warning(f"Não foi possível atualizar a tela de visualização: {e}")
+                self.limpar_campos() # Limpa os campos apenas após criação
 
             # Volta para a tela de visualização de aulas após salvar
             try:
                 # Certifique-se de que o nome do professor está definido na tela de visualização
                 visualizar_screen = self.manager.get_screen('professor_visualizar_aulas')
-                # Passa o nome do professor novamente, por garantia
+                # ✅ Garante que o nome do professor correto seja passado
                 visualizar_screen.nome_professor = self.nome_professor
                 self.manager.current = 'professor_visualizar_aulas'
             except Exception as e:
@@ -825,70 +738,48 @@ class ProfessorCriarAulaScreen(Screen):
         else:
             self.mostrar_erro(mensagem)
 
-        """Salva uma nova aula ou atualiza uma existente"""
-        titulo = self.input_titulo.text.strip() if self.input_titulo else ""
-        disciplina = self.input_disciplina.text.strip() if self.input_disciplina else ""
-        observacoes = self.input_observacoes.text.strip() if self.input_observacoes else ""
-        
-        # Validações
-        if not titulo:
-            self.mostrar_erro("O título é obrigatório")
+    def _abrir_progresso_anexos(self):
+        """Popup com a barra de progresso da cópia dos anexos e botão Cancelar"""
+        conteudo = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.label_progresso = Label(text="Preparando anexos...")
+        self.barra_progresso = ProgressBar(max=1, value=0)
+        btn_cancelar = Button(
+            text="Cancelar",
+            background_color=[0.8, 0.2, 0.2, 1],
+            color=[1, 1, 1, 1],
+            size_hint_y=None,
+            height=40
+        )
+        btn_cancelar.bind(on_release=self.cancelar_salvamento)
+        conteudo.add_widget(self.label_progresso)
+        conteudo.add_widget(self.barra_progresso)
+        conteudo.add_widget(btn_cancelar)
+
+        self.popup_progresso = Popup(
+            title='Salvando aula',
+            content=conteudo,
+            size_hint=(0.8, 0.35),
+            auto_dismiss=False
+        )
+        self.popup_progresso.open()
+
+    def _atualizar_progresso_anexos(self, copiados, total, nome):
+        """Recebe (via Clock) o progresso da cópia"""
+        if not self.popup_progresso:
             return
-        
-        # Verifica se estamos editando uma aula existente
-        if self.modo == 'criar':
-            sucesso, mensagem = self.aulas_manager.criar_aula(
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados,
-                links=self.links_adicionados,
-                professor=self.nome_professor
-            )
-        else:
-            sucesso, mensagem = self.aulas_manager.atualizar_aula(
-                aula_id=self.aula_id,
-                titulo=titulo,
-                disciplina=disciplina,
-                observacoes=observacoes,
-                arquivos=self.arquivos_selecionados, # Passa os arquivos atuais
-                links=self.links_adicionados,       # Passa os links atuais
-                professor=self.nome_professor
-            )
-        
-        if sucesso:
-            self.mostrar_sucesso("Aula salva com sucesso!")
-            # Limpa os campos para uma nova criação (a menos que estejamos editando)
-            if self.modo == 'criar':
-                self.input_titulo.text = ""
-                self.input_disciplina.text = ""
-                self.input_observacoes.text = ""
-                self.arquivos_selecionados = []
-                self.links_adicionados = []
-                self.atualizar_lista_arquivos()
-                self.atualizar_lista_links()
-                # Opcionalmente, atualizar a tela de visualização
-                try:
-                    visualizar_screen = self.manager.get_screen('professor_visualizar_aulas')
-                    # Se você quiser forçar uma atualização na tela de visualização
-                    # Clock.schedule_once(lambda dt: setattr(visualizar_screen, 'nome_professor', self.nome_professor) or visualizar_screen.carregar_aulas(), 0.1)
-                except Exception as e:
-                    logger.warning(f"Não foi possível atualizar a tela de visualização após criação: {e}")
-            else:
-                # Volta para a tela de visualização após edição
-                # Certifique-se de que o nome_professor está definido na tela de visualização
-                try:
-                    visualizar_screen = self.manager.get_screen('professor_visualizar_aulas')
-                    # Atualizar o nome do professor na tela de visualização, se necessário
-                    # visualizar_screen.nome_professor = self.nome_professor # Se não estiver definido
-                    # Voltar para a tela de visualização
-                    self.manager.current = 'professor_visualizar_aulas'
-                except Exception as e:
-                   logger.error(f"Erro ao voltar para a tela de visualização: {e}")
-                   self.voltar_para_home(instance) # Fallback
-        else:
-            self.mostrar_erro(mensagem)
-    
+        self.barra_progresso.max = max(total, 1)
+        self.barra_progresso.value = copiados
+        percentual = int(copiados * 100 / total) if total else 100
+        self.label_progresso.text = f"{nome}\n{percentual}%" if nome else f"{percentual}%"
+
+    def cancelar_salvamento(self, instance=None):
+        """Interrompe a cópia dos anexos; nada é gravado"""
+        if self.ingestao:
+            logger.info("Cancelando o envio dos anexos")
+            self._cancelado = True
+            self.label_progresso.text = "Cancelando..."
+            self.ingestao.cancelar()
+
     def mostrar_erro(self, mensagem):
         """Mostra uma mensagem de erro"""
         from kivy.uix.popup import Popup
@@ -9,8 +9,7 @@ from kivy.clock import Clock
 import os
 import json
 from utils.aulas_manager import AulasManager
-# Import correto do AtualizacoesManager (certifique-se de que o arquivo exista)
-from utils.atualizacoes_manager import AtualizacoesManager # ✅ VERIFICAR SE O ARQUIVO EXISTE
+from services.agendador_atualizacoes import obter_agendador
 import logging
 
 # Configurar logging
@@ -21,15 +20,8 @@ class ProfessorHomeScreen(Screen):
         super(ProfessorHomeScreen, self).__init__(**kwargs)
         self.name = "professor_home"
         self.aulas_manager = AulasManager(data_dir=os.path.join(os.path.dirname(__file__), "..", "data"))
-        # ✅ CORREÇÃO: Inicializar atualizacoes_manager
-        try:
-            # Tenta inicializar o AtualizacoesManager
-            self.atualizacoes_manager = AtualizacoesManager(data_dir=os.path.join(os.path.dirname(__file__), "..", "data"))
-            logger.debug("AtualizacoesManager inicializado com sucesso.")
-        except Exception as e:
-            # Se falhar, define como None e loga o erro
-            self.atualizacoes_manager = None
-            logger.error(f"Falha ao inicializar AtualizacoesManager: {e}", exc_info=True)
+        # Verificações de sites ficam no agendador do app
+        self.agendador = obter_agendador()
 
         self.nome_professor = ""  # Deve ser preenchido pela tela de login/home
         # ✅ CORREÇÃO: Inicializar genero
@@ -39,9 +31,6 @@ class ProfessorHomeScreen(Screen):
         self.badges = {}
         # Armazena os layouts dos badges para atualização
         self.badge_layouts = {}
-        # Cache para evitar verificações excessivas
-        self.ultima_verificacao = 0
-        self.intervalo_minimo_verificacao = 300  # 5 minutos
         # Dicionário para armazenar os botões
         self.botoes = {}  # ✅ Inicialização do dicionário de botões
         logger.debug("ProfessorHomeScreen inicializada.")
@@ -50,16 +39,11 @@ class ProfessorHomeScreen(Screen):
         """Método chamado quando a tela é exibida"""
         logger.info(f"Entrando na tela inicial do professor: {self.nome_professor}")
         Clock.schedule_once(self.construir_interface, 0)
-        # Iniciar verificação de atualizações em segundo plano
-        Clock.schedule_once(self.iniciar_verificacao_atualizacoes, 0.5)
 
-    def iniciar_verificacao_atualizacoes(self, dt):
-        """Inicia a verificação de atualizações em segundo plano"""
-        logger.debug("Iniciando verificação de atualizações em segundo plano")
-        # O método verificar_todas_atualizacoes não existe em AtualizacoesManager
-        # As verificações individuais já são feitas em atualizar_badges
-        # Mantendo vazio conforme sugestão anterior
-        pass
+    def on_leave(self, *args):
+        """Método chamado quando a tela é deixada"""
+        # Parar de receber as contagens do agendador
+        self.agendador.cancelar_inscricao(self._atualizar_badge)
 
     def construir_interface(self, dt=None):
         """Constrói a interface da tela inicial do professor"""
@@ -161,9 +145,8 @@ class ProfessorHomeScreen(Screen):
 
         self.add_widget(main_layout)
 
-        # Atualizar indicadores de atualização (apenas se o manager existir)
-        if self.atualizacoes_manager:
-             self.atualizar_badges()
+        # Atualizar indicadores de atualização
+        self.atualizar_badges()
 
     def abrir_criar_aula(self, instance):
         """Abre a tela para criar uma nova aula"""
@@ -438,78 +421,16 @@ class ProfessorHomeScreen(Screen):
         self.manager.current = 'login'
 
     def atualizar_badges(self, dt=None):
-        """Atualiza os badges de notificação com otimizações de desempenho"""
+        """Inscreve a tela no agendador e pede uma nova rodada de verificações"""
         # Verifica se a tela ainda está ativa
         if self.manager.current != 'professor_home':
-            return False  # Cancela o agendamento futuro
-
-        # Verifica se o atualizacoes_manager foi inicializado
-        if not self.atualizacoes_manager:
-            logger.warning("AtualizacoesManager não inicializado. Badges não serão atualizados.")
-            return False # Cancela o agendamento futuro
-
-        # Define callbacks para cada verificação
-        def criar_callback(chave):
-            def callback(resultado):
-                self._atualizar_badge(chave, resultado)
-            return callback
-
-        # Inicia verificações assíncronas
-        self.atualizacoes_manager.verificar_atualizacao(
-            "noticias",
-            "https://geologia.ufc.br/wp-json/wp/v2/posts    ",
-            criar_callback('noticias')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "calendario",
-            "https://www.ufc.br/calendario-universitario/2025    ",
-            criar_callback('calendario')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "revista",
-            "https://www.periodicos.ufc.br/index.php/geologia    ",
-            criar_callback('revista')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "graduacao",
-            "https://geologia.ufc.br/pt/graduacao/    ",
-            criar_callback('graduacao')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "sobre_geologia",
-            "https://geologia.ufc.br/pt/sobre-a-geologia/    ",
-            criar_callback('sobre_geologia')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "sobre_departamento",
-            "https://geologia.ufc.br/pt/sobre/    ",
-            criar_callback('sobre_departamento')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "coordenacao",
-            "https://geologia.ufc.br/pt/estrutura-organizacional-da-coordenacao-de-graduacao/    ",
-            criar_callback('coordenacao')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "acessibilidade",
-            "https://geologia.ufc.br/pt/acessibilidade/    ",
-            criar_callback('acessibilidade')
-        )
-
-        self.atualizacoes_manager.verificar_atualizacao(
-            "normas_ufc",
-            "https://geologia.ufc.br/pt/estatuto-regimento-e-normas-da-ufc/    ",
-            criar_callback('normas_ufc')
-        )
+            return False
 
-        return True  # Continua o agendamento
+        # As verificações (e o intervalo entre elas) são do agendador; a
+        # inscrição já entrega as contagens conhecidas
+        self.agendador.inscrever(self._atualizar_badge)
+        self.agendador.verificar_todas()
+        return True
 
     def _atualizar_badge(self, chave, tem_atualizacao):
         """Atualiza um badge específico com otimização de desempenho"""
@@ -24,6 +24,10 @@ class ProfessorVisualizarAulasScreen(Screen):
         self.aulas_manager = AulasManager(data_dir=os.path.join(os.path.dirname(__file__), "..", "data"))
         self.nome_professor = ""  # Deve ser preenchido pela tela de login/home
         self.aulas_layout = None
+        # Paginação: cursor da próxima página e trava para não pedir a mesma página duas vezes
+        self.scroll = None
+        self.proximo_cursor = None
+        self.carregando_pagina = False
         logger.debug("ProfessorVisualizarAulasScreen inicializada.")
 
     def on_enter(self, *args):
@@ -60,6 +64,9 @@ class ProfessorVisualizarAulasScreen(Screen):
 
         # ScrollView para a lista de aulas
         scroll = ScrollView()
+        self.scroll = scroll
+        # Carrega a próxima página quando a rolagem chega perto do fim
+        scroll.bind(scroll_y=self._ao_rolar)
         self.aulas_layout = BoxLayout(
             orientation='vertical',
             size_hint_y=None,
@@ -107,9 +114,10 @@ class ProfessorVisualizarAulasScreen(Screen):
 
         try:
             logger.debug(f"Carregando aulas para o professor: '{self.nome_professor}'")
-            todas_aulas = self.aulas_manager.obter_aulas()
-            # Filtra apenas as aulas do professor logado
-            aulas = [a for a in todas_aulas if a.get("professor", "") == self.nome_professor]
+            # Apenas a primeira página do professor logado; as demais vêm com a rolagem
+            aulas, self.proximo_cursor = self.aulas_manager.obter_aulas_paginadas(
+                professor=self.nome_professor
+            )
 
             if not aulas:
                 self.aulas_layout.add_widget(Label(
@@ -120,74 +128,8 @@ class ProfessorVisualizarAulasScreen(Screen):
                 ))
                 return
 
-            for aula in aulas:
-                # Layout para a aula
-                aula_item_layout = BoxLayout(
-                    orientation='vertical',
-                    size_hint_y=None,
-                    height=120, # Ajustar altura conforme necessário
-                    spacing=5
-                )
-
-                # Título da aula
-                titulo_aula = Label(
-                    text=aula["titulo"],
-                    color=[0.05, 0.15, 0.35, 1],
-                    size_hint_y=None,
-                    height=30,
-                    font_size=18,
-                    bold=True,
-                    halign='left'
-                )
-                titulo_aula.bind(size=titulo_aula.setter('text_size'))
-                aula_item_layout.add_widget(titulo_aula)
-
-                # Disciplina (se disponível)
-                if aula.get("disciplina"):
-                    disciplina = Label(
-                        text=f"Disciplina: {aula['disciplina']}",
-                        color=[0.3, 0.3, 0.3, 1],
-                        size_hint_y=None,
-                        height=20,
-                        font_size=14,
-                        halign='left'
-                    )
-                    disciplina.bind(size=disciplina.setter('text_size'))
-                    aula_item_layout.add_widget(disciplina)
-
-                # Layout para botões
-                botoes_layout = BoxLayout(
-                    orientation='horizontal',
-                    size_hint_y=None,
-                    height=40,
-                    spacing=10
-                )
-
-                # Botão Editar
-                btn_editar = Button(
-                    text="Editar",
-                    background_color=[0.05, 0.15, 0.35, 1],
-                    color=[1, 1, 1, 1],
-                    size_hint_x=0.5
-                )
-                # ✅ CORREÇÃO: Passar a aula inteira para o lambda
-                btn_editar.bind(on_release=lambda instance, a=aula: self.editar_aula(a))
-                botoes_layout.add_widget(btn_editar)
-
-                # Botão Excluir
-                btn_excluir = Button(
-                    text="Excluir",
-                    background_color=[0.8, 0.2, 0.2, 1], # Vermelho
-                    color=[1, 1, 1, 1],
-                    size_hint_x=0.5
-                )
-                # ✅ CORREÇÃO: Passar a aula inteira para o lambda
-                btn_excluir.bind(on_release=lambda instance, a=aula: self.excluir_aula(a))
-                botoes_layout.add_widget(btn_excluir)
-
-                aula_item_layout.add_widget(botoes_layout)
-
-                self.aulas_layout.add_widget(aula_item_layout)
+            self._adicionar_aulas(aulas)
+            Clock.schedule_once(self._preencher_tela, 0)
 
         except Exception as e:
             logger.error(f"Erro ao carregar aulas: {e}", exc_info=True)
@@ -198,6 +140,106 @@ class ProfessorVisualizarAulasScreen(Screen):
                 height=50
             ))
 
+    def carregar_mais_aulas(self):
+        """Busca e exibe a próxima página de aulas, se houver"""
+        if not self.proximo_cursor or self.carregando_pagina or not self.aulas_layout:
+            return
+
+        self.carregando_pagina = True
+        try:
+            aulas, self.proximo_cursor = self.aulas_manager.obter_aulas_paginadas(
+                professor=self.nome_professor,
+                cursor=self.proximo_cursor
+            )
+            self._adicionar_aulas(aulas)
+        except Exception as e:
+            logger.error(f"Erro ao carregar mais aulas: {e}", exc_info=True)
+            self.proximo_cursor = None
+        finally:
+            self.carregando_pagina = False
+
+    def _ao_rolar(self, scroll, scroll_y):
+        """Pede mais uma página quando a rolagem se aproxima do fim (scroll_y -> 0)"""
+        if scroll_y <= 0.1:
+            self.carregar_mais_aulas()
+
+    def _preencher_tela(self, dt=None):
+        """Carrega páginas até a lista ocupar a tela (sem conteúdo não há rolagem)"""
+        if self.proximo_cursor and self.scroll and self.aulas_layout.height <= self.scroll.height:
+            self.carregar_mais_aulas()
+            Clock.schedule_once(self._preencher_tela, 0)
+
+    def _adicionar_aulas(self, aulas):
+        """Adiciona o item (título, disciplina, Editar/Excluir) de cada aula da página"""
+        for aula in aulas:
+            # Layout para a aula
+            aula_item_layout = BoxLayout(
+                orientation='vertical',
+                size_hint_y=None,
+                height=120, # Ajustar altura conforme necessário
+                spacing=5
+            )
+
+            # Título da aula
+            titulo_aula = Label(
+                text=aula["titulo"],
+                color=[0.05, 0.15, 0.35, 1],
+                size_hint_y=None,
+                height=30,
+                font_size=18,
+                bold=True,
+                halign='left'
+            )
+            titulo_aula.bind(size=titulo_aula.setter('text_size'))
+            aula_item_layout.add_widget(titulo_aula)
+
+            # Disciplina (se disponível)
+            if aula.get("disciplina"):
+                disciplina = Label(
+                    text=f"Disciplina: {aula['disciplina']}",
+                    color=[0.3, 0.3, 0.3, 1],
+                    size_hint_y=None,
+                    height=20,
+                    font_size=14,
+                    halign='left'
+                )
+                disciplina.bind(size=disciplina.setter('text_size'))
+                aula_item_layout.add_widget(disciplina)
+
+            # Layout para botões
+            botoes_layout = BoxLayout(
+                orientation='horizontal',
+                size_hint_y=None,
+                height=40,
+                spacing=10
+            )
+
+            # Botão Editar
+            btn_editar = Button(
+                text="Editar",
+                background_color=[0.05, 0.15, 0.35, 1],
+                color=[1, 1, 1, 1],
+                size_hint_x=0.5
+            )
+            # ✅ CORREÇÃO: Passar a aula inteira para o lambda
+            btn_editar.bind(on_release=lambda instance, a=aula: self.editar_aula(a))
+            botoes_layout.add_widget(btn_editar)
+
+            # Botão Excluir
+            btn_excluir = Button(
+                text="Excluir",
+                background_color=[0.8, 0.2, 0.2, 1], # Vermelho
+                color=[1, 1, 1, 1],
+                size_hint_x=0.5
+            )
+            # ✅ CORREÇÃO: Passar a aula inteira para o lambda
+            btn_excluir.bind(on_release=lambda instance, a=aula: self.excluir_aula(a))
+            botoes_layout.add_widget(btn_excluir)
+
+            aula_item_layout.add_widget(botoes_layout)
+
+            self.aulas_layout.add_widget(aula_item_layout)
+
     # ✅ MÉTODO ADICIONADO: Editar aula
     def editar_aula(self, aula):
         """Abre a tela de criação/edição para a aula selecionada"""
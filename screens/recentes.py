@@ -1,5 +1,4 @@
 # screens/recentes.py
-import requests
 from datetime import datetime
 from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen
@@ -9,6 +8,9 @@ import os
 import webbrowser
 from plyer import notification
 import logging
+from utils.cache_validadores import obter_cache_validadores
+from utils.http_cliente import obter_cliente_http
+from utils.wordpress_api import e_api_wordpress, data_ultimo_post
 
 # Configurar logging para diagnóstico
 logging.basicConfig(level=logging.DEBUG)
@@ -17,6 +19,9 @@ logger = logging.getLogger('degeo_app')
 # Caminho do arquivo de logs
 ARQUIVO_LOG = "logs_atualizacoes.json"
 
+# ETag / Last-Modified e a última data encontrada em cada URL
+ARQUIVO_VALIDADORES = os.path.join(os.path.dirname(__file__), "..", "data", "validadores_recentes.json")
+
 def carregar_logs():
     if os.path.exists(ARQUIVO_LOG):
         try:
@@ -34,51 +39,72 @@ def salvar_logs(logs):
     except Exception as e:
         logger.error(f"Erro ao salvar logs: {e}")
 
+def _requisitar(url, validadores):
+    """GET condicional: (304, data guardada) se nada mudou, senão (status, response)"""
+    response = obter_cliente_http().get(url, timeout=5, headers=validadores.cabecalhos(url))
+    logger.debug(f"Resposta do site ({url}): {response.status_code}")
+    if response.status_code == 304:
+        guardada = validadores.resultado(url)
+        return 304, datetime.fromisoformat(guardada) if guardada else None
+    return response.status_code, response
+
 def verificar_atualizacao_site(url, seletor_data=None):
     """Verifica atualização em sites com API ou scraping."""
     logger.debug(f"Verificando atualização para: {url}")
+    validadores = obter_cache_validadores(ARQUIVO_VALIDADORES)
     try:
         # Primeiro, tenta verificar se é uma URL de API do WordPress
-        if "wp-json" in url:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if len(data) > 0:  # ✅ CORREÇÃO: Condição completa
-                    # Ajuste para o formato de data do WordPress (ISO 8601)
-                    return datetime.strptime(data[0]['date'], "%Y-%m-%dT%H:%M:%S")
+        if e_api_wordpress(url):
+            # Só a data do post mais recente (per_page=1, _fields=date)
+            status, resposta, ultima = data_ultimo_post(url, timeout=5, cabecalhos=validadores.cabecalhos(url))
+            if status == 304:
+                guardada = validadores.resultado(url)
+                return datetime.fromisoformat(guardada) if guardada else None
+            if status == 200 and ultima:
+                validadores.registrar(url, resposta, ultima.isoformat())
+                return ultima
         
         # Se não for API ou falhar, usa scraping
-        response = requests.get(url, timeout=5)
-        logger.debug(f"Resposta do site ({url}): {response.status_code}")
+        status, resposta = _requisitar(url, validadores)
+        if status == 304:
+            # Página igual à da última verificação: nada para analisar
+            return resposta
         
-        if response.status_code == 200:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Tenta encontrar data em vários formatos possíveis
-            data_elemento = None
-            if seletor_data:
-                data_elemento = soup.select_one(seletor_data)
-            
-            # Se não encontrou com seletor, tenta padrões comuns
-            if not data_elemento:
-                # Padrões comuns para data em sites WordPress
-                data_elemento = soup.select_one("time.entry-date, .post-date, .date, .entry-meta time")
-            
-            if data_elemento:
-                data_texto = data_elemento.get('datetime', data_elemento.text).strip()
-                logger.debug(f"Data encontrada no scraping: {data_texto}")
-                
-                # Tenta vários formatos de data
-                for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%dT%H:%M:%S", "%B %d, %Y"]:
-                    try:
-                        return datetime.strptime(data_texto, fmt)
-                    except ValueError:
-                        continue
+        if status == 200:
+            ultima = _extrair_data_pagina(resposta.text, seletor_data)
+            validadores.registrar(url, resposta, ultima.isoformat() if ultima else None)
+            return ultima
     except Exception as e:
         logger.error(f"Erro ao verificar atualização: {e}")
     return None
 
+def _extrair_data_pagina(html, seletor_data=None):
+    """Procura a data de publicação mais visível de uma página HTML"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    
+    # Tenta encontrar data em vários formatos possíveis
+    data_elemento = None
+    if seletor_data:
+        data_elemento = soup.select_one(seletor_data)
+    
+    # Se não encontrou com seletor, tenta padrões comuns
+    if not data_elemento:
+        # Padrões comuns para data em sites WordPress
+        data_elemento = soup.select_one("time.entry-date, .post-date, .date, .entry-meta time")
+    
+    if data_elemento:
+        data_texto = data_elemento.get('datetime', data_elemento.text).strip()
+        logger.debug(f"Data encontrada no scraping: {data_texto}")
+        
+        # Tenta vários formatos de data
+        for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%dT%H:%M:%S", "%B %d, %Y"]:
+            try:
+                return datetime.strptime(data_texto, fmt)
+            except ValueError:
+                continue
+    return None
+
 class RecentesScreen(Screen):
     # IDs dos badges (DEVEM corresponder EXATAMENTE aos IDs no KV)
     badge_noticias = ObjectProperty(None)
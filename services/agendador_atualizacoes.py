@@ -0,0 +1,189 @@
+# services/agendador_atualizacoes.py
+import os
+import logging
+import threading
+from functools import partial
+
+from utils.atualizacoes_manager import AtualizacoesManager
+from utils.http_cliente import obter_cliente_http
+
+logger = logging.getLogger('degeo_app')
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+# Sites acompanhados pelo app (ordem dos botões na tela do aluno).
+# "recurso" é a chave usada em atualizacoes.json e nas notificações; "url" é
+# a página aberta no navegador e "api", quando existe, o endereço verificado.
+FONTES = [
+    {
+        "recurso": "noticias",
+        "nome": "Notícias",
+        "url": "https://geologia.ufc.br/pt/category/noticias/",
+        # Verificada pela API REST do WordPress (só os posts novos, campos mínimos)
+        "api": "https://geologia.ufc.br/wp-json/wp/v2/posts",
+        "descricao": "Verifique as últimas notícias do departamento"
+    },
+    {
+        "recurso": "calendario",
+        "nome": "Calendário Acadêmico",
+        "url": "https://www.ufc.br/calendario-universitario/2025",
+        "descricao": "Consulte o calendário universitário"
+    },
+    {
+        "recurso": "revista",
+        "nome": "Revista",
+        "url": "https://www.periodicos.ufc.br/index.php/geologia",
+        "descricao": "Acesse a revista do departamento"
+    },
+    {
+        "recurso": "graduacao",
+        "nome": "Graduação",
+        "url": "https://geologia.ufc.br/pt/graduacao/",
+        "descricao": "Informações sobre o curso de graduação"
+    },
+    {
+        "recurso": "sobre_geologia",
+        "nome": "Sobre a Geologia",
+        "url": "https://geologia.ufc.br/pt/sobre-a-geologia/",
+        "descricao": "Conheça mais sobre a geologia"
+    },
+    {
+        "recurso": "sobre_departamento",
+        "nome": "Sobre o Departamento",
+        "url": "https://geologia.ufc.br/pt/sobre/",
+        "descricao": "Saiba mais sobre nosso departamento"
+    },
+    {
+        "recurso": "coordenacao",
+        "nome": "Coordenação",
+        "url": "https://geologia.ufc.br/pt/estrutura-organizacional-da-coordenacao-de-graduacao/",
+        "descricao": "Contato com a coordenação de graduação"
+    },
+    {
+        "recurso": "acessibilidade",
+        "nome": "Acessibilidade",
+        "url": "https://geologia.ufc.br/pt/acessibilidade/",
+        "descricao": "Recursos de acessibilidade"
+    },
+    {
+        "recurso": "normas_ufc",
+        "nome": "Normas UFC",
+        "url": "https://geologia.ufc.br/pt/estatuto-regimento-e-normas-da-ufc/",
+        "descricao": "Consulte as normas da UFC"
+    },
+]
+
+# Intervalo entre rodadas de verificação (segundos)
+INTERVALO_VERIFICACAO = 300
+
+
+class AgendadorAtualizacoes:
+    """
+    Serviço único do app que verifica as FONTES periodicamente.
+
+    É dono do único AtualizacoesManager (e, por ele, do NotificacoesManager
+    e do pool de verificações). É iniciado uma vez em DegeoApp.build; as
+    telas só se inscrevem para receber `callback(recurso, quantidade)` na
+    thread principal, sem criar managers nem agendamentos próprios.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, fontes=FONTES, intervalo=INTERVALO_VERIFICACAO, motor=None):
+        self.data_dir = data_dir
+        self.fontes = list(fontes)
+        self.intervalo = intervalo
+        self.atualizacoes_manager = AtualizacoesManager(data_dir=data_dir, motor=motor)
+        self.notificacoes_manager = self.atualizacoes_manager.notificacoes_manager
+        # Última quantidade conhecida por recurso (reenviada a quem se inscreve)
+        self.contagens = {}
+        self.inscritos = []
+        self._evento = None
+
+    @property
+    def motor(self):
+        return self.atualizacoes_manager.motor
+
+    def iniciar(self):
+        """Inicializa os serviços de notificação e começa as verificações periódicas"""
+        if self._evento is not None:
+            return
+        try:
+            self.notificacoes_manager.inicializar_servicos()
+        except Exception as e:
+            logger.error(f"Erro ao inicializar serviços de notificação: {e}")
+
+        from kivy.clock import Clock
+        self._evento = Clock.schedule_interval(self.verificar_todas, self.intervalo)
+        self.verificar_todas()
+        logger.info(f"Agendador de atualizações iniciado ({len(self.fontes)} fontes, a cada {self.intervalo}s)")
+
+    def parar(self):
+        if self._evento is not None:
+            self._evento.cancel()
+            self._evento = None
+
+    def inscrever(self, callback):
+        """Passa a receber callback(recurso, quantidade); recebe já as contagens conhecidas"""
+        if callback not in self.inscritos:
+            self.inscritos.append(callback)
+        for recurso, quantidade in list(self.contagens.items()):
+            callback(recurso, quantidade)
+
+    def cancelar_inscricao(self, callback):
+        if callback in self.inscritos:
+            self.inscritos.remove(callback)
+
+    def verificar_todas(self, dt=None):
+        """Verifica todas as fontes (em paralelo; resultados chegam pelos inscritos)"""
+        for fonte in self.fontes:
+            self.verificar(fonte["recurso"])
+
+    def verificar(self, recurso, forcar=False):
+        fonte = self.fonte(recurso)
+        if not fonte:
+            return
+        metodo = (self.atualizacoes_manager.forcar_verificacao if forcar
+                  else self.atualizacoes_manager.verificar_atualizacao)
+        metodo(recurso, fonte.get("api", fonte["url"]), partial(self._ao_verificar, recurso))
+
+    def fonte(self, recurso):
+        for fonte in self.fontes:
+            if fonte["recurso"] == recurso:
+                return fonte
+        return None
+
+    def contagem(self, recurso):
+        return self.contagens.get(recurso, 0)
+
+    def diagnostico(self):
+        """Contadores do pool de verificações e estado do disjuntor de cada host"""
+        return {
+            "verificacoes": self.motor.estatisticas(),
+            "hosts": obter_cliente_http().diagnostico()
+        }
+
+    def marcar_como_lido(self, recurso):
+        """Marca o recurso como lido e zera o badge em todas as telas"""
+        resultado = self.atualizacoes_manager.marcar_como_lido(recurso)
+        self._ao_verificar(recurso, 0)
+        return resultado
+
+    def _ao_verificar(self, recurso, quantidade):
+        self.contagens[recurso] = quantidade
+        for callback in list(self.inscritos):
+            try:
+                callback(recurso, quantidade)
+            except Exception as e:
+                logger.error(f"Erro ao atualizar inscrito de {recurso}: {e}")
+
+
+_agendadores = {}
+_agendadores_lock = threading.Lock()
+
+
+def obter_agendador(data_dir=DATA_DIR):
+    """Retorna o AgendadorAtualizacoes do app (um por diretório de dados)"""
+    chave = os.path.abspath(data_dir)
+    with _agendadores_lock:
+        if chave not in _agendadores:
+            _agendadores[chave] = AgendadorAtualizacoes(data_dir=chave)
+        return _agendadores[chave]
@@ -0,0 +1,132 @@
+# services/despachante_push.py
+import time
+import queue
+import random
+import logging
+import threading
+
+from services.fcm_service import MAX_TOKENS_MULTICAST, ENTREGUE, INVALIDO, REPETIR
+
+logger = logging.getLogger('degeo_app')
+
+# Novas tentativas de um lote com falha temporária e espera entre elas
+TENTATIVAS_PUSH = 4
+ESPERA_BASE_PUSH = 1.0
+ESPERA_MAXIMA_PUSH = 30.0
+
+
+class DespachantePush:
+    """
+    Fila de notificações push enviada em segundo plano, em lotes multicast.
+
+    `enfileirar` só coloca a mensagem na fila e volta na hora; uma thread
+    de trabalho divide os tokens em lotes de até `tamanho_lote` e manda cada
+    lote numa única requisição (FCMService.enviar_multicast). Tokens com
+    falha temporária são reenviados com espera exponencial e jitter (ou o
+    Retry-After do servidor); tokens que o FCM diz não existirem são
+    entregues a `ao_tokens_invalidos` para serem removidos do registro.
+    """
+
+    def __init__(self, fcm_service, ao_tokens_invalidos=None, tamanho_lote=MAX_TOKENS_MULTICAST,
+                 tentativas=TENTATIVAS_PUSH, espera_base=ESPERA_BASE_PUSH, espera_maxima=ESPERA_MAXIMA_PUSH):
+        self.fcm_service = fcm_service
+        self.ao_tokens_invalidos = ao_tokens_invalidos
+        self.tamanho_lote = tamanho_lote
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._estatisticas = {
+            "mensagens": 0,      # notificações enviadas (todas as tentativas concluídas)
+            "requisicoes": 0,    # POSTs ao FCM
+            "entregues": 0,      # tokens com entrega confirmada
+            "invalidos": 0,      # tokens removidos
+            "falhas": 0,         # tokens que esgotaram as tentativas ou com erro definitivo
+            "repeticoes": 0,     # lotes reenviados
+            "tempo_envio": 0.0,  # segundos gastos enviando
+        }
+
+    def enfileirar(self, tokens, titulo, mensagem, dados=None):
+        """Agenda o envio da notificação para os tokens (não bloqueia)"""
+        tokens = list(dict.fromkeys(tokens))
+        if not tokens:
+            return False
+        self._fila.put((tokens, titulo, mensagem, dados))
+        self._garantir_thread()
+        return True
+
+    def aguardar(self, timeout=None):
+        """Espera a fila esvaziar; False se o tempo acabar antes"""
+        limite = time.monotonic() + timeout if timeout is not None else None
+        while self._fila.unfinished_tasks:
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def estatisticas(self):
+        with self._lock:
+            estatisticas = dict(self._estatisticas)
+        estatisticas["na_fila"] = self._fila.unfinished_tasks
+        tempo = estatisticas.pop("tempo_envio")
+        estatisticas["tokens_por_segundo"] = round(estatisticas["entregues"] / tempo, 1) if tempo else 0.0
+        return estatisticas
+
+    def _garantir_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._trabalhar, name="despachante-push", daemon=True)
+                self._thread.start()
+
+    def _trabalhar(self):
+        while True:
+            tokens, titulo, mensagem, dados = self._fila.get()
+            inicio = time.perf_counter()
+            try:
+                for i in range(0, len(tokens), self.tamanho_lote):
+                    self._enviar_lote(tokens[i:i + self.tamanho_lote], titulo, mensagem, dados)
+            except Exception as e:
+                logger.error(f"Erro no envio push: {e}")
+            finally:
+                with self._lock:
+                    self._estatisticas["mensagens"] += 1
+                    self._estatisticas["tempo_envio"] += time.perf_counter() - inicio
+                self._fila.task_done()
+
+    def _enviar_lote(self, lote, titulo, mensagem, dados):
+        for tentativa in range(1, self.tentativas + 1):
+            resultados, espera = self.fcm_service.enviar_multicast(lote, titulo, mensagem, dados)
+            invalidos = [token for token, resultado in resultados.items() if resultado == INVALIDO]
+            repetir = [token for token, resultado in resultados.items() if resultado == REPETIR]
+            esgotou = tentativa == self.tentativas
+            with self._lock:
+                self._estatisticas["requisicoes"] += 1
+                self._estatisticas["entregues"] += sum(1 for r in resultados.values() if r == ENTREGUE)
+                self._estatisticas["invalidos"] += len(invalidos)
+                self._estatisticas["falhas"] += sum(1 for r in resultados.values()
+                                                    if r not in (ENTREGUE, INVALIDO, REPETIR))
+                if repetir and esgotou:
+                    self._estatisticas["falhas"] += len(repetir)
+                elif repetir:
+                    self._estatisticas["repeticoes"] += 1
+
+            if invalidos and self.ao_tokens_invalidos:
+                try:
+                    self.ao_tokens_invalidos(invalidos)
+                except Exception as e:
+                    logger.error(f"Erro ao remover tokens inválidos: {e}")
+            if not repetir:
+                return
+            if esgotou:
+                logger.warning(f"{len(repetir)} tokens sem entrega após {self.tentativas} tentativas")
+                return
+            lote = repetir
+            time.sleep(self._espera(tentativa, espera))
+
+    def _espera(self, tentativa, pedida=None):
+        """Retry-After do servidor, ou backoff exponencial com jitter completo"""
+        if pedida is not None:
+            return min(self.espera_maxima, pedida)
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * (2 ** (tentativa - 1))))
@@ -1,31 +1,48 @@
 # ✅ NOVO ARQUIVO - Colocar na pasta 'services/'
-import requests
 import json
 import logging
 from datetime import datetime
+import requests
+from utils.http_cliente import obter_cliente_http
+from utils.disjuntor import CircuitoAberto
 
 logger = logging.getLogger('degeo_app')
 
+# Chave de exemplo: enquanto não for trocada, o envio é apenas simulado
+CHAVE_EXEMPLO = "sua_chave_firebase_aqui"
+
+# Tokens por requisição multicast (registration_ids aceita até 1000)
+MAX_TOKENS_MULTICAST = 500
+
+# Resultado de cada token num envio multicast
+ENTREGUE = "ok"
+INVALIDO = "invalido"     # token não existe mais: deve ser removido
+REPETIR = "repetir"       # falha temporária: enviar de novo mais tarde
+FALHOU = "falha"          # erro definitivo da mensagem (não do token)
+
+# Erros do FCM por token (campo "error" de cada item de "results")
+ERROS_TOKEN_INVALIDO = {"NotRegistered", "InvalidRegistration", "MismatchSenderId"}
+ERROS_TEMPORARIOS = {"Unavailable", "InternalServerError", "DeviceMessageRateExceeded"}
+
 class FCMService:
-    def __init__(self):
+    def __init__(self, server_key=CHAVE_EXEMPLO, api_url="https://fcm.googleapis.com/fcm/send"):
         # Em produção, use uma chave real do Firebase
-        self.server_key = "sua_chave_firebase_aqui"  
-        self.api_url = "https://fcm.googleapis.com/fcm/send"
+        self.server_key = server_key
+        self.api_url = api_url
+        
+    @property
+    def simulado(self):
+        return self.server_key == CHAVE_EXEMPLO
         
     def enviar_notificacao_push(self, token, titulo, mensagem, dados=None):
-        """Envia notificação push via FCM - VERSÃO SIMULADA"""
+        """Envia notificação push via FCM (simulada sem chave real)"""
         try:
-            # Por enquanto, simular envio para desenvolvimento
-            logger.info(f"SIMULAÇÃO FCM - Notificação: {titulo} - {mensagem}")
-            logger.info(f"SIMULAÇÃO FCM - Token: {token}")
-            logger.info(f"SIMULAÇÃO FCM - Dados: {dados}")
-            
-            # Em produção real, descomente o código abaixo:
-            """
-            headers = {
-                'Authorization': f'key={self.server_key}',
-                'Content-Type': 'application/json'
-            }
+            if self.simulado:
+                # Por enquanto, simular envio para desenvolvimento
+                logger.info(f"SIMULAÇÃO FCM - Notificação: {titulo} - {mensagem}")
+                logger.info(f"SIMULAÇÃO FCM - Token: {token}")
+                logger.info(f"SIMULAÇÃO FCM - Dados: {dados}")
+                return True  # Simular sucesso
             
             payload = {
                 'to': token,
@@ -37,14 +54,7 @@ class FCMService:
                 },
                 'data': dados or {}
             }
-            
-            response = requests.post(self.api_url, headers=headers, 
-                                   json=payload, timeout=10)
-            
-            return response.status_code == 200
-            """
-            
-            return True  # Simular sucesso
+            return self._enviar(payload)
                 
         except Exception as e:
             logger.error(f"Erro ao enviar notificação FCM: {e}")
@@ -53,8 +63,88 @@ class FCMService:
     def enviar_notificacao_topic(self, topic, titulo, mensagem, dados=None):
         """Envia notificação para um tópico específico"""
         try:
-            logger.info(f"SIMULAÇÃO FCM Tópico - {topic}: {titulo}")
-            return True
+            if self.simulado:
+                logger.info(f"SIMULAÇÃO FCM Tópico - {topic}: {titulo}")
+                return True
+            
+            payload = {
+                'to': f'/topics/{topic}',
+                'notification': {'title': titulo, 'body': mensagem},
+                'data': dados or {}
+            }
+            return self._enviar(payload)
         except Exception as e:
             logger.error(f"Erro ao enviar notificação para tópico: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def enviar_multicast(self, tokens, titulo, mensagem, dados=None):
+        """Envia a mesma notificação para até MAX_TOKENS_MULTICAST tokens numa requisição
+
+        Retorna ({token: ENTREGUE | INVALIDO | REPETIR | FALHOU}, espera
+        pedida pelo servidor em segundos ou None). Falhas de rede e 5xx
+        marcam o lote inteiro para repetir; as novas tentativas ficam com
+        quem chamou (DespachantePush).
+        """
+        tokens = list(tokens)
+        if self.simulado:
+            logger.info(f"SIMULAÇÃO FCM - Multicast para {len(tokens)} tokens: {titulo} - {mensagem}")
+            return {token: ENTREGUE for token in tokens}, None
+        
+        payload = {
+            'registration_ids': list(tokens),
+            'notification': {
+                'title': titulo,
+                'body': mensagem,
+                'sound': 'default',
+                'badge': '1'
+            },
+            'data': dados or {}
+        }
+        try:
+            response = self._postar(payload, tentativas=1)
+        except (requests.RequestException, CircuitoAberto) as e:
+            logger.warning(f"Falha de rede no envio FCM ({e.__class__.__name__}); lote será repetido")
+            return {token: REPETIR for token in tokens}, None
+        
+        espera = _segundos_retry_after(response.headers.get("Retry-After"))
+        if response.status_code >= 500 or response.status_code == 429:
+            return {token: REPETIR for token in tokens}, espera
+        if response.status_code != 200:
+            logger.error(f"FCM recusou o envio ({response.status_code}): {response.text[:200]}")
+            return {token: FALHOU for token in tokens}, None
+        
+        resultados = {}
+        itens = response.json().get('results', [])
+        for token, item in zip(tokens, itens):
+            erro = item.get('error')
+            if not erro:
+                resultados[token] = ENTREGUE
+            elif erro in ERROS_TOKEN_INVALIDO:
+                resultados[token] = INVALIDO
+            elif erro in ERROS_TEMPORARIOS:
+                resultados[token] = REPETIR
+            else:
+                resultados[token] = FALHOU
+        # Resposta sem resultado para algum token: tenta de novo
+        for token in tokens[len(itens):]:
+            resultados[token] = REPETIR
+        return resultados, espera
+    
+    def _enviar(self, payload):
+        """POST para o FCM pelo cliente HTTP compartilhado (conexão reaproveitada)"""
+        return self._postar(payload).status_code == 200
+    
+    def _postar(self, payload, **kwargs):
+        headers = {
+            'Authorization': f'key={self.server_key}',
+            'Content-Type': 'application/json'
+        }
+        return obter_cliente_http().post(self.api_url, headers=headers, json=payload, timeout=10, **kwargs)
+
+
+def _segundos_retry_after(valor):
+    """Retry-After em segundos (o FCM usa o formato numérico)"""
+    try:
+        return max(0.0, float(valor))
+    except (TypeError, ValueError):
+        return None
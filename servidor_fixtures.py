@@ -0,0 +1,464 @@
+# servidor_fixtures.py
+"""
+Servidor HTTP local que reproduz respostas gravadas dos sites verificados
+pelo app, para medir e testar o verificador de atualizações sem rede.
+
+Cada host gravado (geologia.ufc.br, www.ufc.br...) ganha um servidor próprio
+num endereço de loopback distinto (127.0.0.1, 127.0.0.2...), então limites
+e disjuntores por host se comportam como com os sites reais. As fixtures são
+um JSON {url: fixture}, com dois tipos:
+
+- "pagina": status, cabeçalhos e corpo servidos como gravados;
+- "wordpress": lista de posts servida como /wp-json/wp/v2/posts (after,
+  per_page, page, _fields e X-WP-TotalPages).
+
+Toda resposta 200 tem ETag e Last-Modified e requisições condicionais
+recebem 304. Latência, erros HTTP, host fora do ar e corpos inflados podem
+ser injetados por URL com `configurar`.
+
+ServidorFCM imita o endpoint legado do FCM (/fcm/send, com `to` ou
+`registration_ids`), com tokens inválidos, falhas temporárias por token e
+respostas 503 com Retry-After programáveis, para testes de carga do envio
+push.
+
+Uso:
+    python servidor_fixtures.py                      # fixtures sintéticas das FONTES
+    python servidor_fixtures.py --fixtures arq.json  # fixtures gravadas
+    python servidor_fixtures.py --gravar arq.json    # grava as FONTES (precisa de rede)
+"""
+import sys
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import copy
+import threading
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório atual ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Contador:
+    """Envolve o wfile do handler contando os bytes enviados"""
+
+    def __init__(self, arquivo, contar):
+        self._arquivo = arquivo
+        self._contar = contar
+
+    def write(self, dados):
+        self._contar(len(dados))
+        return self._arquivo.write(dados)
+
+    def flush(self):
+        self._arquivo.flush()
+
+    def close(self):
+        self._arquivo.close()
+
+    @property
+    def closed(self):
+        return self._arquivo.closed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    servidor_fixtures = None
+    origem = None          # "https://geologia.ufc.br"
+
+    def setup(self):
+        super().setup()
+        self.wfile = _Contador(self.wfile, self._contar_bytes)
+
+    def handle(self):
+        inicio = time.thread_time()
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente desistiu da resposta (limite de bytes, timeout)
+            pass
+        finally:
+            self.servidor_fixtures._somar("cpu_servidor", time.thread_time() - inicio)
+
+    def _contar_bytes(self, quantidade):
+        self.servidor_fixtures._somar("bytes_enviados", quantidade)
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        url = f"{self.origem}{partes.path}"
+        consulta = {k: v[0] for k, v in parse_qs(partes.query).items()}
+        self.servidor_fixtures._somar("requisicoes", 1)
+
+        fixture = self.servidor_fixtures.fixtures.get(url)
+        if fixture is None:
+            self._responder(404, {"Content-Type": "text/plain"}, b"sem fixture")
+            return
+
+        if fixture.get("latencia"):
+            time.sleep(fixture["latencia"])
+        if fixture.get("fora_do_ar"):
+            # Fecha sem responder: o cliente vê uma falha de conexão
+            self.close_connection = True
+            return
+        if fixture.get("erro") and fixture.get("erros", 1) != 0:
+            if fixture.get("erros") is not None:
+                fixture["erros"] -= 1
+            self._responder(fixture["erro"], {"Content-Type": "text/plain"}, b"erro injetado")
+            return
+
+        if fixture["tipo"] == "wordpress":
+            status, cabecalhos, corpo = _resposta_wordpress(fixture, consulta)
+        else:
+            status = fixture.get("status", 200)
+            cabecalhos = dict(fixture.get("cabecalhos", {}))
+            cabecalhos.setdefault("Content-Type", "text/html; charset=UTF-8")
+            corpo = fixture["corpo"].encode("utf-8")
+        if fixture.get("preenchimento"):
+            corpo += b" " * fixture["preenchimento"]
+
+        if status == 200:
+            etag = '"' + hashlib.sha1(corpo).hexdigest() + '"'
+            cabecalhos["ETag"] = etag
+            cabecalhos["Last-Modified"] = formatdate(fixture.get("modificado", 0), usegmt=True)
+            if self.headers.get("If-None-Match") == etag:
+                self.servidor_fixtures._somar("respostas_304", 1)
+                self._responder(304, {"ETag": etag}, b"")
+                return
+        self._responder(status, cabecalhos, corpo)
+
+    def _responder(self, status, cabecalhos, corpo):
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _resposta_wordpress(fixture, consulta):
+    """Imita a coleção de posts da API REST do WordPress"""
+    posts = sorted(fixture["posts"], key=lambda p: p["date"], reverse=True)
+    if "after" in consulta:
+        posts = [p for p in posts if p["date"] > consulta["after"]]
+    total = len(posts)
+    por_pagina = int(consulta.get("per_page", 10))
+    pagina = int(consulta.get("page", 1))
+    total_paginas = max(1, -(-total // por_pagina))
+    cabecalhos = {
+        "Content-Type": "application/json; charset=UTF-8",
+        "X-WP-Total": str(total),
+        "X-WP-TotalPages": str(total_paginas)
+    }
+    if pagina > total_paginas:
+        return 400, cabecalhos, json.dumps({"code": "rest_post_invalid_page_number"}).encode()
+    posts = posts[(pagina - 1) * por_pagina:pagina * por_pagina]
+    if "_fields" in consulta:
+        campos = consulta["_fields"].split(",")
+        posts = [{c: p[c] for c in campos if c in p} for p in posts]
+    return 200, cabecalhos, json.dumps(posts).encode()
+
+
+class ServidorFixtures:
+    """Um servidor de loopback por host das fixtures, com injeção de falhas"""
+
+    def __init__(self, fixtures):
+        self.fixtures = copy.deepcopy(fixtures)
+        self._servidores = {}   # "https://host" -> ThreadingHTTPServer
+        self._lock = threading.Lock()
+        self.zerar_estatisticas()
+
+    def iniciar(self):
+        origens = sorted({_origem(url) for url in self.fixtures})
+        for numero, origem in enumerate(origens, start=1):
+            handler = type("_HandlerFixtures", (_Handler,),
+                           {"servidor_fixtures": self, "origem": origem})
+            servidor = _criar_servidor(numero, handler)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            self._servidores[origem] = servidor
+        return self
+
+    def encerrar(self):
+        for servidor in self._servidores.values():
+            servidor.shutdown()
+            servidor.server_close()
+        self._servidores.clear()
+
+    def url_local(self, url):
+        """Endereço da URL original neste servidor"""
+        partes = urlsplit(url)
+        endereco, porta = self._servidores[_origem(url)].server_address[:2]
+        local = f"http://{endereco}:{porta}{partes.path}"
+        return f"{local}?{partes.query}" if partes.query else local
+
+    def configurar(self, url=None, **opcoes):
+        """Injeta falhas numa URL (ou em todas, sem `url`)
+
+        Opções: latencia (s), erro (status) e erros (quantas respostas com
+        o erro; None = todas), fora_do_ar (fecha sem responder) e
+        preenchimento (bytes extras no corpo). None remove a opção.
+        """
+        alvos = [self.fixtures[url]] if url else self.fixtures.values()
+        with self._lock:
+            for fixture in alvos:
+                for nome, valor in opcoes.items():
+                    if valor is None and nome != "erros":
+                        fixture.pop(nome, None)
+                    else:
+                        fixture[nome] = valor
+
+    def publicar(self, url, titulo, data=None):
+        """Acrescenta um post (wordpress) ou artigo (pagina) no topo da fixture"""
+        data = data or datetime.now().replace(microsecond=0)
+        with self._lock:
+            fixture = self.fixtures[url]
+            fixture["modificado"] = time.time()
+            if fixture["tipo"] == "wordpress":
+                proximo = max((p["id"] for p in fixture["posts"]), default=0) + 1
+                fixture["posts"].append(_post(proximo, titulo, data, _origem(url)))
+            else:
+                abertura = re.compile(r"<main\b[^>]*>" if "<main" in fixture["corpo"] else r"<body\b[^>]*>")
+                fixture["corpo"] = abertura.sub(lambda m: f"{m.group(0)}\n{_artigo(titulo, data, url)}",
+                                                fixture["corpo"], count=1)
+
+    def _somar(self, nome, valor):
+        with self._lock:
+            self._estatisticas[nome] += valor
+
+    def estatisticas(self):
+        with self._lock:
+            return dict(self._estatisticas)
+
+    def zerar_estatisticas(self):
+        with self._lock:
+            self._estatisticas = {"requisicoes": 0, "respostas_304": 0, "bytes_enviados": 0,
+                                  "cpu_servidor": 0.0}
+
+
+def _origem(url):
+    partes = urlsplit(url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def _criar_servidor(numero, handler):
+    """Servidor em 127.0.0.N; cai para 127.0.0.1 onde só ele existe (macOS)"""
+    try:
+        return ThreadingHTTPServer((f"127.0.0.{numero}", 0), handler)
+    except OSError:
+        return ThreadingHTTPServer(("127.0.0.1", 0), handler)
+
+
+class _HandlerFCM(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    servidor_fcm = None
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        status, cabecalhos, resposta = self.servidor_fcm._processar(self.headers.get("Authorization"), corpo)
+        dados = json.dumps(resposta).encode()
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorFCM:
+    """Substituto local do FCM (API HTTP legada) para testes do envio push
+
+    - tokens_invalidos: tokens respondidos com NotRegistered;
+    - indisponiveis: token -> quantas vezes responder Unavailable;
+    - falhas: quantas próximas requisições recebem 503 (com Retry-After);
+    - latencia: atraso (s) de cada resposta.
+    """
+
+    def __init__(self, chave="chave-teste", latencia=0.0, retry_after=0):
+        self.chave = chave
+        self.latencia = latencia
+        self.retry_after = retry_after
+        self.tokens_invalidos = set()
+        self.indisponiveis = {}
+        self.falhas = 0
+        self._lock = threading.Lock()
+        self._servidor = None
+        self.zerar_estatisticas()
+
+    @property
+    def url(self):
+        endereco, porta = self._servidor.server_address[:2]
+        return f"http://{endereco}:{porta}/fcm/send"
+
+    def iniciar(self):
+        handler = type("_HandlerServidorFCM", (_HandlerFCM,), {"servidor_fcm": self})
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def encerrar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def estatisticas(self):
+        with self._lock:
+            return {"requisicoes": self.requisicoes, "tokens": sum(self.entregas.values()),
+                    "maior_lote": self.maior_lote}
+
+    def zerar_estatisticas(self):
+        with self._lock:
+            self.requisicoes = 0
+            self.maior_lote = 0
+            # token -> quantas notificações recebeu
+            self.entregas = {}
+
+    def _processar(self, autorizacao, corpo):
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._lock:
+            self.requisicoes += 1
+            if autorizacao != f"key={self.chave}":
+                return 401, {}, {"erro": "chave inválida"}
+            if self.falhas > 0:
+                self.falhas -= 1
+                return 503, {"Retry-After": str(self.retry_after)}, {}
+            tokens = corpo.get("registration_ids") or [corpo.get("to")]
+            self.maior_lote = max(self.maior_lote, len(tokens))
+            resultados = []
+            for token in tokens:
+                if token in self.tokens_invalidos:
+                    resultados.append({"error": "NotRegistered"})
+                elif self.indisponiveis.get(token, 0) > 0:
+                    self.indisponiveis[token] -= 1
+                    resultados.append({"error": "Unavailable"})
+                else:
+                    self.entregas[token] = self.entregas.get(token, 0) + 1
+                    resultados.append({"message_id": f"0:{self.requisicoes}:{len(resultados)}"})
+        sucesso = sum(1 for r in resultados if "message_id" in r)
+        return 200, {}, {"multicast_id": self.requisicoes, "success": sucesso,
+                         "failure": len(resultados) - sucesso, "results": resultados}
+
+
+# ---------------------------------------------------------------------------
+# Fixtures sintéticas (formato das páginas WordPress dos sites da UFC)
+# ---------------------------------------------------------------------------
+
+def _post(numero, titulo, data, origem):
+    return {
+        "id": numero,
+        "date": data.isoformat(),
+        "title": {"rendered": titulo},
+        "link": f"{origem}/pt/noticia-{numero}/",
+        "content": {"rendered": "<p>" + "Texto completo da notícia do departamento. " * 150 + "</p>"},
+        "excerpt": {"rendered": "<p>" + "Resumo da notícia. " * 20 + "</p>"}
+    }
+
+
+def _artigo(titulo, data, url):
+    return (f'<article class="post"><h2 class="entry-title"><a href="{url}">{titulo}</a></h2>'
+            f'<div class="entry-meta"><time class="entry-date" datetime="{data.strftime("%Y-%m-%d")}">'
+            f'{data.strftime("%d/%m/%Y")}</time></div>'
+            f'<div class="entry-summary"><p>{"Resumo do conteúdo publicado. " * 8}</p></div></article>')
+
+
+def _pagina(nome, url, artigos):
+    """Página com o peso típico do tema: menus, scripts e rodapé em volta do conteúdo"""
+    menu = "".join(f'<li class="menu-item"><a href="{url}item-{i}/">Item de menu {i}</a></li>' for i in range(120))
+    script = "var dados = " + json.dumps({"nonce": "x" * 32, "itens": list(range(2000))}) + ";"
+    conteudo = "\n".join(_artigo(titulo, data, url) for titulo, data in artigos)
+    return (f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="UTF-8"><title>{nome}</title>'
+            f'<style>{"body{margin:0}" * 400}</style><script>{script}</script></head>'
+            f'<body><header><nav><ul>{menu}</ul></nav></header>'
+            f'<main>\n{conteudo}\n</main>'
+            f'<footer><ul>{menu}</ul><p>Universidade Federal do Ceará</p></footer></body></html>')
+
+
+def fixtures_sinteticas(fontes=None, posts=40, artigos=8):
+    """Fixtures das FONTES do app: API do WordPress para quem tem `api`, HTML para o resto"""
+    if fontes is None:
+        from services.agendador_atualizacoes import FONTES
+        fontes = FONTES
+    agora = datetime.now().replace(microsecond=0)
+    fixtures = {}
+    for fonte in fontes:
+        url = fonte.get("api", fonte["url"])
+        if "api" in fonte:
+            fixtures[url] = {
+                "tipo": "wordpress",
+                "modificado": time.time(),
+                "posts": [_post(i, f"{fonte['nome']}: publicação número {i}",
+                                agora - timedelta(hours=6 * (posts - i)), _origem(url))
+                          for i in range(1, posts + 1)]
+            }
+        else:
+            lista = [(f"{fonte['nome']}: publicação número {i}", agora - timedelta(days=i))
+                     for i in range(artigos)]
+            fixtures[url] = {"tipo": "pagina", "modificado": time.time(),
+                             "corpo": _pagina(fonte["nome"], url, lista)}
+    return fixtures
+
+
+def carregar_fixtures(arquivo):
+    with open(arquivo, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def gravar_fixtures(arquivo, fontes=None):
+    """Grava as respostas atuais dos sites (precisa de rede) no formato de fixtures"""
+    from utils.http_cliente import obter_cliente_http
+    from utils.wordpress_api import e_api_wordpress, montar_url
+    if fontes is None:
+        from services.agendador_atualizacoes import FONTES
+        fontes = FONTES
+    fixtures = {}
+    for fonte in fontes:
+        url = fonte.get("api", fonte["url"])
+        try:
+            if e_api_wordpress(url):
+                response = obter_cliente_http().get(montar_url(url, per_page=100), timeout=10)
+                fixtures[url] = {"tipo": "wordpress", "modificado": time.time(), "posts": response.json()}
+            else:
+                response = obter_cliente_http().get(url, timeout=10)
+                fixtures[url] = {"tipo": "pagina", "status": response.status_code, "modificado": time.time(),
+                                 "cabecalhos": {"Content-Type": response.headers.get("Content-Type", "text/html")},
+                                 "corpo": response.text}
+            print(f"   {url}: {len(response.content)} bytes")
+        except Exception as e:
+            print(f"   {url}: erro ({e})")
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(fixtures, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local com respostas gravadas dos sites")
+    parser.add_argument("--fixtures", help="JSON de fixtures (padrão: sintéticas das FONTES)")
+    parser.add_argument("--gravar", metavar="ARQUIVO", help="grava as FONTES reais em ARQUIVO e sai")
+    parser.add_argument("--latencia", type=float, default=0.0, help="atraso (s) em todas as respostas")
+    args = parser.parse_args()
+
+    if args.gravar:
+        gravar_fixtures(args.gravar)
+        sys.exit(0)
+
+    servidor = ServidorFixtures(carregar_fixtures(args.fixtures) if args.fixtures else fixtures_sinteticas())
+    servidor.iniciar()
+    if args.latencia:
+        servidor.configurar(latencia=args.latencia)
+    for url in servidor.fixtures:
+        print(f"{servidor.url_local(url)}  <-  {url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servidor.encerrar()
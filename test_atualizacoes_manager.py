@@ -0,0 +1,333 @@
+# test_atualizacoes_manager.py
+import sys
+import os
+import time
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.atualizacoes_manager import AtualizacoesManager
+from utils.motor_verificacao import MotorVerificacao
+from utils.cache_validadores import CacheValidadores
+from utils.intervalos_adaptativos import registrar_resultado, intervalo_atual
+from services.agendador_atualizacoes import AgendadorAtualizacoes, FONTES as FONTES_APP, obter_agendador
+
+# Mesmos recursos da tela do aluno: 7 dos 9 endereços estão no mesmo host
+FONTES = {
+    "noticias": "https://geologia.ufc.br/pt/category/noticias/",
+    "calendario": "https://www.ufc.br/calendario-universitario/2025",
+    "revista": "https://www.periodicos.ufc.br/index.php/geologia",
+    "graduacao": "https://geologia.ufc.br/pt/graduacao/",
+    "sobre_geologia": "https://geologia.ufc.br/pt/sobre-a-geologia/",
+    "sobre_departamento": "https://geologia.ufc.br/pt/sobre/",
+    "coordenacao": "https://geologia.ufc.br/pt/estrutura-organizacional-da-coordenacao-de-graduacao/",
+    "acessibilidade": "https://geologia.ufc.br/pt/acessibilidade/",
+    "normas_ufc": "https://geologia.ufc.br/pt/estatuto-regimento-e-normas-da-ufc/",
+}
+
+
+def _entregar_direto(funcao, *args):
+    funcao(*args)
+
+
+def _aguardar(condicao, timeout=10):
+    """Espera as verificações em segundo plano (falha em vez de travar o teste)"""
+    limite = time.monotonic() + timeout
+    while not condicao():
+        assert time.monotonic() < limite, "Verificações não terminaram a tempo"
+        time.sleep(0.01)
+
+
+def test_verificacao_paralela():
+    print("🧪 Testando verificação paralela de atualizações...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Teste 1: Limite por host (as tarefas excedentes esperam sem ocupar threads)
+        print("1. Testando limite de verificações por host...")
+        motor = MotorVerificacao(max_threads=8, limite_por_host=2, agendar=_entregar_direto)
+        lock = threading.Lock()
+        simultaneas = {"a.test": 0, "b.test": 0}
+        picos = {"a.test": 0, "b.test": 0}
+        resultados = []
+
+        def verificar(host):
+            with lock:
+                simultaneas[host] += 1
+                picos[host] = max(picos[host], simultaneas[host])
+            time.sleep(0.05)
+            with lock:
+                simultaneas[host] -= 1
+            return host
+
+        for i in range(6):
+            motor.enviar(f"https://a.test/{i}", lambda: verificar("a.test"), resultados.append)
+        motor.enviar("https://b.test/", lambda: verificar("b.test"), resultados.append)
+        _aguardar(lambda: len(resultados) == 7)
+        assert picos == {"a.test": 2, "b.test": 1}, picos
+        assert motor.em_andamento() == 0
+        motor.encerrar()
+
+        # Teste 2: Uma atualização completa leva o tempo do site mais lento
+        print("2. Testando tempo de uma atualização completa...")
+        motor = MotorVerificacao(limite_por_host=9, agendar=_entregar_direto)
+        manager = AtualizacoesManager(data_dir=diretorio, motor=motor)
+        atrasos = {url: 0.1 + 0.05 * i for i, url in enumerate(FONTES.values())}
+
+        def site_falso(url, ultima_lida, impressao_anterior=None):
+            time.sleep(atrasos[url])
+            return 0, [], None
+
+        manager._verificar_quantidade_atualizacoes = site_falso
+        concluidas = []
+        inicio = time.monotonic()
+        for chave, url in FONTES.items():
+            manager.verificar_atualizacao(chave, url, concluidas.append)
+        _aguardar(lambda: len(concluidas) == len(FONTES))
+        duracao = time.monotonic() - inicio
+        print(f"   {len(FONTES)} sites em {duracao:.2f}s (mais lento: {max(atrasos.values()):.2f}s, "
+              f"soma: {sum(atrasos.values()):.2f}s)")
+        assert duracao < max(atrasos.values()) + 0.3
+        # Todas as verificações gravaram no mesmo arquivo sem perder nenhuma
+        assert set(manager._carregar_atualizacoes()) == set(FONTES)
+        motor.encerrar()
+
+    print("✅ Teste de verificação paralela concluído!")
+
+
+def test_verificacao_unica_em_andamento():
+    print("🧪 Testando deduplicação de verificações em andamento...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        motor = MotorVerificacao(limite_por_host=9, agendar=_entregar_direto)
+        # Duas telas, cada uma com o seu manager, pedindo os mesmos recursos
+        aluno = AtualizacoesManager(data_dir=diretorio, motor=motor)
+        professor = AtualizacoesManager(data_dir=diretorio, motor=motor)
+        liberar = threading.Event()
+        buscas = []
+
+        def site_falso(url, ultima_lida, impressao_anterior=None):
+            buscas.append(url)
+            liberar.wait(5)
+            return 0, [], None
+
+        aluno._verificar_quantidade_atualizacoes = site_falso
+        professor._verificar_quantidade_atualizacoes = site_falso
+        resultados = []
+        for manager in (aluno, professor, aluno):
+            for chave, url in FONTES.items():
+                manager.verificar_atualizacao(chave, url, lambda r, c=chave: resultados.append(c))
+        liberar.set()
+        _aguardar(lambda: len(resultados) == 3 * len(FONTES))
+
+        assert sorted(buscas) == sorted(FONTES.values())
+        assert motor.estatisticas() == {"executadas": len(FONTES), "economizadas": 2 * len(FONTES)}
+
+        # Terminada a verificação, um novo pedido busca de novo
+        aluno.forcar_verificacao("noticias", FONTES["noticias"])
+        _aguardar(lambda: motor.estatisticas()["executadas"] == len(FONTES) + 1 and not motor.em_andamento())
+        motor.encerrar()
+
+    print("✅ Teste de deduplicação concluído!")
+
+
+def test_agendador_unico():
+    print("🧪 Testando agendador de atualizações do app...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        motor = MotorVerificacao(agendar=_entregar_direto)
+        agendador = AgendadorAtualizacoes(data_dir=diretorio, motor=motor)
+        agendador.atualizacoes_manager._verificar_atualizacao_real = lambda chave, url: 2 if chave == "revista" else 0
+
+        # Teste 1: Duas telas inscritas recebem as mesmas contagens de uma única rodada
+        print("1. Testando inscrição das telas...")
+        aluno, professor = {}, {}
+        agendador.inscrever(lambda r, q: aluno.__setitem__(r, q))
+        agendador.inscrever(lambda r, q: professor.__setitem__(r, q))
+        agendador.verificar_todas()
+        _aguardar(lambda: motor.estatisticas()["executadas"] == len(FONTES_APP) and not motor.em_andamento())
+        assert aluno == professor == {f["recurso"]: 2 if f["recurso"] == "revista" else 0 for f in FONTES_APP}
+
+        # Teste 2: Quem se inscreve depois recebe as contagens já conhecidas
+        print("2. Testando contagens para novos inscritos...")
+        tarde = {}
+        tarde_callback = lambda r, q: tarde.__setitem__(r, q)
+        agendador.inscrever(tarde_callback)
+        assert tarde == aluno
+
+        # Teste 3: Marcar como lido zera o badge de todos os inscritos
+        print("3. Testando marcação como lido...")
+        agendador.cancelar_inscricao(tarde_callback)
+        assert agendador.marcar_como_lido("revista")
+        assert aluno["revista"] == professor["revista"] == 0 and tarde["revista"] == 2
+        motor.encerrar()
+
+    # Um agendador por processo
+    assert obter_agendador() is obter_agendador()
+    print("✅ Teste do agendador concluído!")
+
+
+def test_intervalos_adaptativos():
+    print("🧪 Testando intervalos adaptativos por fonte...")
+
+    # Uma semana de rodadas a cada 5 minutos: notícias mudam a cada 6 horas,
+    # as normas nunca mudam
+    inicio = datetime(2025, 3, 3)
+    mudancas = {"noticias": timedelta(hours=6), "normas_ufc": None}
+    estado = {chave: {} for chave in mudancas}
+    ultima = {chave: None for chave in mudancas}
+    versao_vista = {chave: 0 for chave in mudancas}
+    verificacoes = {chave: 0 for chave in mudancas}
+    maior_atraso = timedelta(0)
+    rodadas = 7 * 24 * 12
+
+    for rodada in range(rodadas):
+        agora = inicio + timedelta(minutes=5 * rodada)
+        for chave, periodo in mudancas.items():
+            info = estado[chave]
+            if ultima[chave] and (agora - ultima[chave]).total_seconds() < intervalo_atual(info):
+                continue
+            verificacoes[chave] += 1
+            ultima[chave] = agora
+            versao = (agora - inicio) // periodo if periodo else 0
+            mudou = versao != versao_vista[chave]
+            # Depois do primeiro dia a fonte já tem histórico de mudanças
+            if mudou and agora - inicio > timedelta(days=1):
+                maior_atraso = max(maior_atraso, agora - (inicio + versao * periodo))
+            versao_vista[chave] = versao
+            registrar_resultado(info, mudou, agora=agora)
+
+    print(f"   {rodadas} rodadas; verificações: {verificacoes}; maior atraso em notícias: {maior_atraso}")
+    assert verificacoes["normas_ufc"] < 30
+    assert verificacoes["noticias"] < rodadas / 3
+    # Notícias continuam sendo vistas poucos minutos depois de publicadas
+    assert maior_atraso <= timedelta(minutes=30)
+    assert estado["normas_ufc"]["intervalo"] == 24 * 3600
+
+    print("✅ Teste de intervalos adaptativos concluído!")
+
+
+class _PaginaEstatica(BaseHTTPRequestHandler):
+    """Página com ETag e Last-Modified que responde 304 às requisições condicionais"""
+    corpo = ("<html><body><article><h2>Resolução do conselho departamental</h2></article>"
+             "<time class='entry-date' datetime='2025-03-10'>10/03/2025</time></body></html>").encode()
+    etag = '"v1"'
+    requisicoes = []
+
+    @classmethod
+    def publicar(cls, artigo, etag):
+        cls.corpo = cls.corpo.replace(b"<body>", b"<body>" + artigo.encode())
+        cls.etag = etag
+
+    def do_GET(self):
+        self.requisicoes.append(dict(self.headers))
+        if self.path.startswith("/dinamica"):
+            # Sem validadores; nonce, menu e contador mudam a cada resposta, o conteúdo não
+            corpo = (f"<html><body><nav>Visitas: {len(self.requisicoes)}</nav><main>"
+                     f"<script>var nonce='{time.time()}';</script>"
+                     "<h1>Acessibilidade</h1><p>Recursos   de acessibilidade &amp; apoio</p>"
+                     "</main></body></html>").encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", "Mon, 10 Mar 2025 12:00:00 GMT")
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(self.corpo)))
+        self.end_headers()
+        self.wfile.write(self.corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_requisicoes_condicionais():
+    print("🧪 Testando requisições condicionais (ETag / Last-Modified)...")
+    from screens import recentes
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _PaginaEstatica)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/pt/normas/"
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Teste 1: A primeira verificação só registra a referência; o 304 dispensa a análise
+        print("1. Testando verificador de atualizações...")
+        manager = AtualizacoesManager(data_dir=diretorio, motor=MotorVerificacao(agendar=_entregar_direto))
+        manager.tempo_minimo_entre_verificacoes = 0
+        analises = []
+        contar_original = manager._contar_itens_html
+        manager._contar_itens_html = lambda *args: analises.append(1) or contar_original(*args)
+
+        assert manager._verificar_atualizacao_real("normas_ufc", url) == 0
+        _PaginaEstatica.publicar("<article><h2>Nova resolução do conselho universitário</h2></article>", '"v2"')
+        assert manager._verificar_atualizacao_real("normas_ufc", url) == 1
+        assert manager._verificar_atualizacao_real("normas_ufc", url) == 1
+        assert len(analises) == 2
+        assert _PaginaEstatica.requisicoes[-1]["If-None-Match"] == '"v2"'
+        assert _PaginaEstatica.requisicoes[-1]["If-Modified-Since"] == "Mon, 10 Mar 2025 12:00:00 GMT"
+        # Só a mudança gerou notificação
+        assert len(manager.notificacoes_manager.obter_notificacoes_nao_lidas("normas_ufc")) == 1
+        # O 304 conta como "sem mudança" para o intervalo da fonte
+        assert manager._carregar_atualizacoes()["normas_ufc"]["sem_mudanca"] == 1
+
+        # Validadores persistidos: relidos do disco, a próxima requisição já é condicional
+        assert CacheValidadores(manager.validadores.arquivo).cabecalhos(url)["If-None-Match"] == '"v2"'
+        # Depois de lido, o 304 não traz o badge de volta
+        manager.marcar_como_lido("normas_ufc")
+        assert manager._verificar_atualizacao_real("normas_ufc", url) == 0
+
+        # Teste 2: Tela de recentes devolve a data guardada no 304
+        print("2. Testando tela de recentes...")
+        arquivo_original = recentes.ARQUIVO_VALIDADORES
+        recentes.ARQUIVO_VALIDADORES = os.path.join(diretorio, "validadores_recentes.json")
+        try:
+            total = len(_PaginaEstatica.requisicoes)
+            primeira = recentes.verificar_atualizacao_site(url)
+            segunda = recentes.verificar_atualizacao_site(url)
+            assert primeira == segunda and primeira.year == 2025
+            assert "If-None-Match" not in _PaginaEstatica.requisicoes[total]
+            assert "If-None-Match" in _PaginaEstatica.requisicoes[total + 1]
+        finally:
+            recentes.ARQUIVO_VALIDADORES = arquivo_original
+
+        # Teste 3: Sem validadores, a impressão do conteúdo evita a análise
+        print("3. Testando impressão do conteúdo principal...")
+        import bs4
+        arvores = []
+        beautiful_soup = bs4.BeautifulSoup
+
+        class ArvoreContada(beautiful_soup):
+            def __init__(self, *args, **kwargs):
+                arvores.append(1)
+                super().__init__(*args, **kwargs)
+
+        bs4.BeautifulSoup = ArvoreContada
+        try:
+            dinamica = url.replace("/pt/normas/", "/dinamica")
+            for _ in range(4):
+                assert manager._verificar_atualizacao_real("acessibilidade", dinamica) == 0
+        finally:
+            bs4.BeautifulSoup = beautiful_soup
+        # Só a referência da primeira verificação montou a árvore
+        assert len(arvores) == 1
+        info = manager._carregar_atualizacoes()["acessibilidade"]
+        assert info["titulos_vistos"] == ["Acessibilidade"] and info["sem_mudanca"] == 3
+        manager.motor.encerrar()
+
+    servidor.shutdown()
+    print("✅ Teste de requisições condicionais concluído!")
+
+if __name__ == "__main__":
+    test_verificacao_paralela()
+    test_verificacao_unica_em_andamento()
+    test_agendador_unico()
+    test_intervalos_adaptativos()
+    test_requisicoes_condicionais()
@@ -0,0 +1,120 @@
+# test_aula_repository.py
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, insert
+from repositories.aula_repository import AulaRepository
+from repositories.usuario_repository import UsuarioRepository
+from models.database_models import Aula, ArquivoAula, LinkAula, ComentarioAula
+from models.database_manager import DatabaseManager
+
+def _inserir_aulas(repo, professor_id, inicio, fim):
+    """Insere aulas (com arquivo, link e comentário) direto via Core"""
+    base = datetime(2025, 1, 1)
+    with repo.db_manager.engine.begin() as conn:
+        conn.execute(insert(Aula), [
+            {"id": i, "titulo": f"Aula {i}", "disciplina": "Geologia", "observacoes": "",
+             "professor_id": professor_id, "data_criacao": base + timedelta(minutes=i)}
+            for i in range(inicio, fim)
+        ])
+        conn.execute(insert(ArquivoAula), [
+            {"aula_id": i, "nome": "slides.pdf", "caminho": f"arquivos/{i}/slides.pdf"} for i in range(inicio, fim)
+        ])
+        conn.execute(insert(LinkAula), [
+            {"aula_id": i, "titulo": "Vídeo", "url": f"https://exemplo.ufc.br/{i}"} for i in range(inicio, fim)
+        ])
+        conn.execute(insert(ComentarioAula), [
+            {"aula_id": i, "nome_aluno": "Aluno", "comentario": "Ótima aula", "data": base} for i in range(inicio, fim)
+        ])
+
+def _contar_consultas(engine, funcao):
+    consultas = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = funcao()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return len(consultas), resultado
+
+def test_listagem_sem_n_mais_1():
+    print("🧪 Testando número de consultas da listagem de aulas...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, "teste.db")
+        UsuarioRepository(db_path).criar_usuario("Prof Teste", "prof@ufc.br", "123456", "professor")
+        repo = AulaRepository(db_path)
+        engine = repo.db_manager.engine
+
+        # Teste 1: 10 aulas
+        print("1. Contando consultas com 10 aulas...")
+        _inserir_aulas(repo, 1, 1, 11)
+        todas_10, aulas = _contar_consultas(engine, repo.obter_todas_aulas)
+        professor_10, _ = _contar_consultas(engine, lambda: repo.obter_aulas_por_professor("Prof Teste"))
+        assert len(aulas) == 10
+        assert todas_10 <= 4 and professor_10 <= 4
+        assert aulas[0]["professor"] == "Prof Teste"
+        assert aulas[0]["arquivos"] and aulas[0]["links"] and aulas[0]["comentarios"]
+        print(f"   Consultas: todas={todas_10}, por professor={professor_10}")
+
+        # Teste 2: 10.000 aulas - o número de consultas não pode crescer
+        print("2. Contando consultas com 10.000 aulas...")
+        _inserir_aulas(repo, 1, 11, 10001)
+        todas_10k, aulas = _contar_consultas(engine, repo.obter_todas_aulas)
+        professor_10k, aulas_professor = _contar_consultas(engine, lambda: repo.obter_aulas_por_professor("Prof Teste"))
+        assert len(aulas) == 10000 and len(aulas_professor) == 10000
+        assert aulas[0]["id"] == 10000
+        assert todas_10k == todas_10
+        assert professor_10k == professor_10
+        print(f"   Consultas: todas={todas_10k}, por professor={professor_10k}")
+
+        # Teste 3: Paginação por cursor percorre tudo sem repetir aulas
+        print("3. Testando paginação por cursor...")
+        pagina, cursor = repo.obter_aulas_paginadas("Prof Teste", tamanho_pagina=50)
+        assert [a["id"] for a in pagina] == list(range(10000, 9950, -1))
+        consultas_pagina, (pagina, _) = _contar_consultas(
+            engine, lambda: repo.obter_aulas_paginadas("Prof Teste", cursor=cursor, tamanho_pagina=50))
+        assert [a["id"] for a in pagina] == list(range(9950, 9900, -1))
+        assert consultas_pagina == professor_10
+        print(f"   Consultas por página: {consultas_pagina}")
+
+        engine.dispose()
+
+    print("✅ Teste de consultas do AulaRepository concluído!")
+
+def test_remocao_indice_busca_antigo():
+    print("🧪 Testando remoção do índice FTS5 de versões anteriores...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, "teste.db")
+        UsuarioRepository(db_path).criar_usuario("Prof Busca", "busca@ufc.br", "123456", "professor")
+        repo = AulaRepository(db_path)
+        engine = repo.db_manager.engine
+
+        # Banco de uma versão que indexava as aulas no SQLite
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE VIRTUAL TABLE aulas_busca USING fts5(titulo, disciplina, observacoes, comentarios)")
+            conn.exec_driver_sql("CREATE VIEW aulas_busca_origem AS SELECT id, titulo FROM aulas")
+            conn.exec_driver_sql("CREATE TRIGGER aulas_busca_ai AFTER INSERT ON aulas BEGIN "
+                                 "INSERT INTO aulas_busca(rowid, titulo) VALUES (new.id, new.titulo); END")
+
+        # Ao abrir o banco, triggers, visão e tabela são removidos; as escritas seguem normais
+        DatabaseManager(db_path, compartilhado=False).engine.dispose()
+        with engine.connect() as conn:
+            restantes = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE name LIKE '%busca%'").all()
+        assert restantes == []
+        sucesso, _ = repo.criar_aula("Rochas Ígneas", "Petrologia", "", [], [], "Prof Busca")
+        assert sucesso
+
+        engine.dispose()
+
+    print("✅ Teste de remoção do índice de busca concluído!")
+
+if __name__ == "__main__":
+    test_listagem_sem_n_mais_1()
+    test_remocao_indice_busca_antigo()
@@ -0,0 +1,294 @@
+# test_aulas_manager.py
+import sys
+import os
+import json
+import time
+import hashlib
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.aulas_manager import AulasManager
+from utils.aulas_journal import AulasJournal
+from utils.catalogo_aulas import CatalogoAulas
+from utils.busca_aulas import termos_da_consulta, indexar_aula
+from utils.blob_store import BlobStore, ArquivoMuitoGrande
+from utils.ingestao_anexos import IngestaoAnexos
+from migracao_arquivos import MigracaoArquivos
+
+def test_journal_aulas():
+    print("🧪 Testando journal do AulasManager...")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = AulasManager(data_dir=data_dir)
+        aulas_file = os.path.join(data_dir, "aulas.json")
+
+        # Teste 1: Escritas vão para o journal, não para o snapshot
+        print("1. Testando escrita no journal...")
+        _, aula = manager.criar_aula("Mineralogia I", "Mineralogia", professor="Prof A")
+        manager.criar_aula("Petrologia", "Petrologia", professor="Prof B")
+        manager.adicionar_comentario(aula["id"], "Aluno", "Ótima aula")
+        with open(aulas_file, "r", encoding="utf-8") as f:
+            assert json.load(f) == {"aulas": []}
+        print("   Snapshot intacto, mutações no journal")
+
+        # Teste 2: Replay de snapshot + journal
+        print("2. Testando replay...")
+        reaberto = AulasJournal(aulas_file)
+        titulos = [a["titulo"] for a in reaberto.listar()]
+        assert titulos == ["Petrologia", "Mineralogia I"]
+        assert reaberto.obter(aula["id"])["comentarios"][0]["comentario"] == "Ótima aula"
+
+        # Teste 3: Registro truncado (queda no meio do append) é descartado
+        print("3. Testando registro truncado...")
+        with open(aulas_file + ".journal", "a", encoding="utf-8") as f:
+            f.write('{"op": "gravar", "aula": {"id": 99, "tit')
+        reaberto = AulasJournal(aulas_file)
+        assert reaberto.obter(99) is None
+        assert len(reaberto.listar()) == 2
+        reaberto.excluir(aula["id"])
+        assert [a["titulo"] for a in AulasJournal(aulas_file).listar()] == ["Petrologia"]
+
+        # Teste 4: Compactação grava o snapshot e esvazia o journal
+        print("4. Testando compactação...")
+        reaberto.compactar(aguardar=True)
+        with open(aulas_file, "r", encoding="utf-8") as f:
+            assert [a["titulo"] for a in json.load(f)["aulas"]] == ["Petrologia"]
+        assert not os.path.exists(aulas_file + ".journal.compactando")
+
+    print("✅ Teste do journal de aulas concluído!")
+
+def test_catalogo_aulas():
+    print("🧪 Testando catálogo de aulas...")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        aulas_file = os.path.join(data_dir, "aulas.json")
+        catalogo = CatalogoAulas(aulas_file)
+
+        # Teste 1: Índices por professor e disciplina
+        print("1. Testando índices...")
+        catalogo.gravar({"id": 1, "titulo": "A", "professor": "Prof A", "disciplina": "Mineralogia"})
+        catalogo.gravar({"id": 2, "titulo": "B", "professor": "Prof B", "disciplina": "Mineralogia"})
+        catalogo.gravar({"id": 3, "titulo": "C", "professor": "Prof A", "disciplina": "Petrologia"})
+        assert [a["id"] for a in catalogo.obter_por_professor("Prof A")] == [3, 1]
+        assert [a["id"] for a in catalogo.obter_por_disciplina("Mineralogia")] == [2, 1]
+
+        catalogo.gravar({"id": 1, "titulo": "A", "professor": "Prof B", "disciplina": "Mineralogia"})
+        catalogo.excluir(2)
+        assert [a["id"] for a in catalogo.obter_por_professor("Prof A")] == [3]
+        assert [a["id"] for a in catalogo.obter_por_professor("Prof B")] == [1]
+
+        # Teste 2: Alteração externa (outro processo) é detectada por mtime/tamanho
+        print("2. Testando recarga por alteração externa...")
+        outro_processo = AulasJournal(aulas_file)
+        outro_processo.gravar({"id": 4, "titulo": "D", "professor": "Prof A", "disciplina": "Petrologia"})
+        assert [a["id"] for a in catalogo.obter_por_professor("Prof A")] == [4, 3]
+        assert catalogo.proximo_id() == 5
+
+        # Teste 3: Paginação por cursor (data_criacao, id)
+        print("3. Testando paginação...")
+        for i in range(5, 26):
+            catalogo.gravar({"id": i, "titulo": str(i), "professor": "Prof C", "data_criacao": f"2025-01-{i:02d}"})
+        vistos = []
+        pagina, cursor = catalogo.obter_pagina(professor="Prof C", limite=10)
+        while True:
+            vistos.extend(a["id"] for a in pagina)
+            if cursor is None:
+                break
+            pagina, cursor = catalogo.obter_pagina(professor="Prof C", cursor=cursor, limite=10)
+        assert vistos == list(range(25, 4, -1))
+
+        # Teste 4: Busca textual no catálogo (prefixo, sem acento, comentários)
+        print("4. Testando busca textual...")
+        catalogo.gravar({"id": 30, "titulo": "Rochas Ígneas", "professor": "Prof D", "disciplina": "Petrologia",
+                         "observacoes": "Introdução ao magmatismo"})
+        catalogo.gravar({"id": 31, "titulo": "Sedimentar", "professor": "Prof D", "disciplina": "Geologia",
+                         "observacoes": "Formação de rochas por deposição",
+                         "comentarios": [{"nome_aluno": "Ana", "comentario": "E o basalto?"}]})
+        resultados = catalogo.buscar("rochas", destaque=("<", ">"))
+        assert [aula["id"] for _, aula, _ in resultados] == [30, 31]  # título pesa mais
+        assert resultados[1][2] == "Formação de <rochas> por deposição"
+        assert [aula["id"] for _, aula, _ in catalogo.buscar("igne")] == [30]
+        assert [aula["id"] for _, aula, _ in catalogo.buscar("basalto")] == [31]
+        assert catalogo.buscar("rochas basalto")[0][1]["id"] == 31
+        assert catalogo.buscar('"(') == []
+
+        # Edição, comentário novo e exclusão atualizam o índice
+        catalogo.gravar({"id": 31, "titulo": "Sedimentar", "professor": "Prof D", "disciplina": "Geologia",
+                         "comentarios": [{"nome_aluno": "Ana", "comentario": "Vulcanismo"}]})
+        assert catalogo.buscar("basalto") == []
+        assert [aula["id"] for _, aula, _ in catalogo.buscar("vulcan")] == [31]
+        catalogo.excluir(30)
+        assert catalogo.buscar("igneas") == []
+
+        # Aula gravada por outro processo entra na busca
+        outro_processo.gravar({"id": 32, "titulo": "Paleontologia", "professor": "Prof A"})
+        assert [aula["id"] for _, aula, _ in catalogo.buscar("paleo")] == [32]
+
+        # Teste 5: Busca pelo índice invertido com 20.000 aulas
+        print("5. Testando tempo de busca com 20.000 aulas...")
+        temas = ["Mineralogia", "Petrologia", "Geofísica", "Paleontologia", "Hidrogeologia"]
+        catalogo.substituir([{
+            "id": i, "titulo": f"Aula {i}", "professor": f"Prof {i % 40}", "disciplina": temas[i % 5],
+            "observacoes": f"Conteúdo de {temas[i % 5].lower()} para a turma {i % 12}",
+            "data_criacao": f"2025-01-01T00:00:{i:05d}",
+            "comentarios": [{"nome_aluno": "Aluno", "comentario": f"Dúvida sobre o exercício {i % 300}"}]
+        } for i in range(20000, 0, -1)])
+        palavras = {aula["id"]: {p for ps in indexar_aula(aula).values() for p in ps} for aula in catalogo.listar()}
+        for consulta in ("aula 205", "zzz", "hidrogeo turma 7", "exercicio 299", "geofisica"):
+            inicio = time.perf_counter()
+            catalogo.buscar(consulta)
+            duracao = time.perf_counter() - inicio
+            resultados = catalogo.buscar(consulta, limite=100000)
+            print(f"   '{consulta}': {len(resultados)} aulas, 20 primeiras em {duracao * 1000:.1f} ms")
+            # Mesmo resultado de comparar palavra por palavra em todas as aulas
+            termos = termos_da_consulta(consulta)
+            esperadas = {aula_id for aula_id, ps in palavras.items()
+                         if all(any(p.startswith(t) for p in ps) for t in termos)}
+            assert {aula["id"] for _, aula, _ in resultados} == esperadas
+            assert duracao < 0.05
+        # Empate: a mais recente primeiro
+        assert [aula["id"] for _, aula, _ in catalogo.buscar("geofisica", limite=3)] == [19997, 19992, 19987]
+        # Aulas fora da lista substituída saem do índice
+        assert catalogo.buscar("vulcanismo") == []
+        assert catalogo.obter_por_professor("Prof D") == []
+
+    print("✅ Teste do catálogo de aulas concluído!")
+
+def test_blob_store_anexos():
+    print("🧪 Testando blob store de anexos...")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = AulasManager(data_dir=data_dir)
+        origem = os.path.join(data_dir, "icone.png")
+        with open(origem, "wb") as f:
+            f.write(b"\x89PNG" + b"0" * 1000)
+
+        # Teste 1: Upload idêntico em duas aulas ocupa um único blob
+        print("1. Testando deduplicação...")
+        _, aula_a = manager.criar_aula("A", "Geologia", arquivos=[origem], professor="Prof")
+        _, aula_b = manager.criar_aula("B", "Geologia", arquivos=[origem], professor="Prof")
+        caminho = aula_a["arquivos"][0]["caminho"]
+        assert caminho == aula_b["arquivos"][0]["caminho"]
+        assert aula_a["arquivos"][0]["nome"] == "icone.png"
+        digest = BlobStore.digest_de(caminho)
+        assert manager.blobs.indice[digest]["refs"] == 2
+        assert len(os.listdir(os.path.join(data_dir, "blobs", digest[:2]))) == 1
+
+        # Teste 2: Reenviar na edição o anexo que a aula já tem não duplica nada
+        print("2. Testando edição...")
+        manager.atualizar_aula(aula_a["id"], "A", "Geologia", arquivos=[os.path.join(data_dir, caminho)], professor="Prof")
+        assert len(manager.obter_aula(aula_a["id"])["arquivos"]) == 1
+        assert manager.blobs.indice[digest]["refs"] == 2
+
+        # Teste 3: O blob só é apagado com a última referência
+        print("3. Testando contagem de referências...")
+        manager.excluir_aula(aula_a["id"])
+        assert os.path.exists(os.path.join(data_dir, caminho))
+        manager.excluir_aula(aula_b["id"])
+        assert not os.path.exists(os.path.join(data_dir, caminho))
+        assert digest not in manager.blobs.indice
+
+    print("✅ Teste do blob store concluído!")
+
+def test_ingestao_anexos():
+    print("🧪 Testando cópia de anexos em segundo plano...")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = AulasManager(data_dir=data_dir)
+        video = os.path.join(data_dir, "video.mp4")
+        with open(video, "wb") as f:
+            f.write(os.urandom(3 * 1024 * 1024 + 123))
+
+        def executar(arquivos, cancelar=False, **limites):
+            eventos = {"progresso": [], "resultado": None}
+            ingestao = IngestaoAnexos(
+                manager.blobs, arquivos,
+                ao_progredir=lambda copiados, total, nome: eventos["progresso"].append((copiados, total)),
+                ao_concluir=lambda sucesso, resultado: eventos.update(resultado=(sucesso, resultado)),
+                agendar=lambda funcao, *args: funcao(*args),  # sem Kivy: chama direto
+                **limites
+            )
+            if cancelar:
+                ingestao.cancelar()
+            ingestao.iniciar()
+            ingestao.aguardar()
+            return eventos
+
+        # Teste 1: Cópia em blocos com hash na mesma leitura e progresso até 100%
+        print("1. Testando cópia com progresso...")
+        eventos = executar([video])
+        sucesso, anexos = eventos["resultado"]
+        assert sucesso and anexos[0]["nome"] == "video.mp4"
+        assert eventos["progresso"][-1] == (os.path.getsize(video),) * 2
+        with open(video, "rb") as f:
+            assert BlobStore.digest_de(anexos[0]["caminho"]) == hashlib.sha256(f.read()).hexdigest()
+        _, aula = manager.criar_aula("Vídeo", "Geologia", anexos=anexos, professor="Prof")
+        assert aula["arquivos"] == anexos
+        assert manager.blobs.indice[BlobStore.digest_de(anexos[0]["caminho"])]["refs"] == 1
+
+        # Teste 2: Limite verificado antes de ler o arquivo
+        print("2. Testando limite de tamanho...")
+        eventos = executar([video], tamanho_maximo_arquivo=1024)
+        assert eventos["resultado"][0] is False and "limite" in eventos["resultado"][1]
+        assert eventos["progresso"] == []
+        try:
+            manager.blobs.ingerir(video, tamanho_maximo=1024 * 1024)
+            assert False, "deveria ultrapassar o limite"
+        except ArquivoMuitoGrande:
+            pass
+
+        # Teste 3: Cancelamento não deixa blob nem referência
+        print("3. Testando cancelamento...")
+        outro = os.path.join(data_dir, "outro.bin")
+        with open(outro, "wb") as f:
+            f.write(b"x" * 2048)
+        eventos = executar([outro], cancelar=True)
+        assert eventos["resultado"] == (False, "Envio de anexos cancelado")
+        assert len(manager.blobs.indice) == 1
+        assert not [n for n in os.listdir(manager.blobs.blobs_dir) if n.endswith(".tmp")]
+
+    print("✅ Teste de cópia de anexos concluído!")
+
+def test_migracao_arquivos():
+    print("🧪 Testando migração de data/arquivos para o blob store...")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # Layout antigo: a mesma imagem copiada na pasta de duas aulas
+        catalogo = AulasJournal(os.path.join(data_dir, "aulas.json"))
+        for aula_id in (1, 2):
+            pasta = os.path.join(data_dir, "arquivos", str(aula_id))
+            os.makedirs(pasta)
+            with open(os.path.join(pasta, "kivy-icon-128.png"), "wb") as f:
+                f.write(b"mesmo conteudo")
+            # Aulas gravadas no Windows usam "\\" e as edições antigas repetiam o anexo
+            anexo = {"nome": "kivy-icon-128.png", "caminho": f"arquivos\\{aula_id}\\kivy-icon-128.png"}
+            catalogo.gravar({"id": aula_id, "titulo": str(aula_id), "professor": "Prof", "arquivos": [anexo, dict(anexo)]})
+        with open(os.path.join(data_dir, "arquivos", "solto.dat"), "wb") as f:
+            f.write(b"sem aula")
+
+        migracao = MigracaoArquivos(data_dir=data_dir, db_path=os.path.join(data_dir, "teste.db"))
+        migracao.executar()
+        migracao.aulas_manager.catalogo.compactar(aguardar=True)
+
+        aulas = AulasJournal(os.path.join(data_dir, "aulas.json")).listar()
+        assert all(len(a["arquivos"]) == 1 for a in aulas)
+        caminhos = {a["arquivos"][0]["caminho"] for a in aulas}
+        assert len(caminhos) == 1
+        caminho = caminhos.pop()
+        with open(os.path.join(data_dir, caminho), "rb") as f:
+            assert f.read() == b"mesmo conteudo"
+        assert migracao.blobs.indice[BlobStore.digest_de(caminho)]["refs"] == 2
+        # Pastas antigas removidas; arquivo sem aula preservado
+        assert os.listdir(os.path.join(data_dir, "arquivos")) == ["solto.dat"]
+
+        # Segunda execução não altera nada
+        assert MigracaoArquivos(data_dir=data_dir, db_path=os.path.join(data_dir, "teste.db")).migrar_aulas_json() == 0
+
+    print("✅ Teste de migração de anexos concluído!")
+
+if __name__ == "__main__":
+    test_journal_aulas()
+    test_catalogo_aulas()
+    test_blob_store_anexos()
+    test_ingestao_anexos()
+    test_migracao_arquivos()
@@ -0,0 +1,89 @@
+# test_despachante_push.py
+import sys
+import os
+import json
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_fixtures import ServidorFCM
+from services.fcm_service import FCMService
+from services.despachante_push import DespachantePush
+from utils.notificacoes_manager import NotificacoesManager
+
+TOKENS = [f"token-{i:04d}" for i in range(2000)]
+
+
+def test_despachante_push():
+    print("🧪 Testando envio push em lotes...")
+
+    servidor = ServidorFCM().iniciar()
+    fcm = FCMService(server_key="chave-teste", api_url=servidor.url)
+    removidos = []
+    despachante = DespachantePush(fcm, ao_tokens_invalidos=removidos.extend, espera_base=0.01)
+
+    # Teste 1: Carga: 10 notificações x 2000 tokens em lotes de 500, sem bloquear quem enfileira
+    print("1. Testando carga em lotes multicast...")
+    inicio = time.perf_counter()
+    for i in range(10):
+        despachante.enfileirar(TOKENS, f"Notícia {i}", "Mensagem", {"recurso": "noticias"})
+    assert time.perf_counter() - inicio < 0.1
+    assert despachante.aguardar(30)
+    estatisticas = despachante.estatisticas()
+    print(f"   {servidor.estatisticas()['requisicoes']} requisições, {estatisticas['tokens_por_segundo']} tokens/s")
+    assert servidor.estatisticas() == {"requisicoes": 40, "tokens": 20000, "maior_lote": 500}
+    assert estatisticas["entregues"] == 20000 and estatisticas["mensagens"] == 10
+    assert estatisticas["na_fila"] == 0 and estatisticas["falhas"] == 0
+
+    # Teste 2: Tokens inválidos são informados para remoção
+    print("2. Testando remoção de tokens inválidos...")
+    servidor.zerar_estatisticas()
+    servidor.tokens_invalidos = set(TOKENS[:50])
+    despachante.enfileirar(TOKENS, "Calendário", "Mensagem")
+    assert despachante.aguardar(10)
+    assert sorted(removidos) == TOKENS[:50]
+    assert servidor.estatisticas()["tokens"] == 1950 and despachante.estatisticas()["invalidos"] == 50
+
+    # Teste 3: 503 com Retry-After e falhas temporárias por token são repetidas
+    print("3. Testando novas tentativas...")
+    servidor.zerar_estatisticas()
+    servidor.tokens_invalidos = set()
+    servidor.falhas = 2
+    servidor.indisponiveis = {token: 1 for token in TOKENS[:5]}
+    despachante.enfileirar(TOKENS[:500], "Revista", "Mensagem")
+    assert despachante.aguardar(10)
+    # 2 x 503, o lote inteiro, e depois só os 5 tokens indisponíveis
+    assert servidor.estatisticas()["requisicoes"] == 4
+    assert all(servidor.entregas[token] == 1 for token in TOKENS[:500])
+
+    # Teste 4: Remoção no registro de tokens do NotificacoesManager
+    print("4. Testando integração com o NotificacoesManager...")
+    servidor.tokens_invalidos = {"token-velho"}
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = NotificacoesManager(data_dir=diretorio)
+        manager._mostrar_notificacao_local = lambda titulo, mensagem: None
+        for token in ("token-a", "token-b", "token-velho"):
+            manager.registro_tokens.registrar(f"dispositivo-{token}", token)
+        manager.fcm_service = fcm
+        manager.despachante_push = DespachantePush(fcm, ao_tokens_invalidos=manager._remover_tokens)
+        manager.adicionar_notificacao("noticias", "Nova notícia", "Mensagem", {"url": "https://geologia.ufc.br"})
+        manager.encerrar(timeout=10)
+        with open(manager.tokens_file, encoding="utf-8") as f:
+            assert sorted(info["token"] for info in json.load(f).values()) == ["token-a", "token-b"]
+    servidor.encerrar()
+
+    # Teste 5: Tentativas esgotadas contam como falha
+    print("5. Testando tentativas esgotadas...")
+    fora = ServidorFCM().iniciar()
+    fora.falhas = 10
+    despachante = DespachantePush(FCMService(server_key="chave-teste", api_url=fora.url),
+                                  tentativas=3, espera_base=0.01)
+    despachante.enfileirar(TOKENS[:10], "Normas", "Mensagem")
+    assert despachante.aguardar(10)
+    assert despachante.estatisticas()["falhas"] == 10 and fora.estatisticas()["requisicoes"] == 3
+    fora.encerrar()
+
+    print("✅ Teste do envio push em lotes concluído!")
+
+if __name__ == "__main__":
+    test_despachante_push()
@@ -0,0 +1,187 @@
+# test_http_cliente.py
+import sys
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import socket
+import requests
+from utils.http_cliente import ClienteHTTP, RespostaMuitoGrande
+from utils.disjuntor import DisjuntoresPorHost, CircuitoAberto
+from services.fcm_service import FCMService
+
+
+class _Servidor(BaseHTTPRequestHandler):
+    """Respostas programadas por caminho; registra a porta de origem de cada requisição"""
+    protocol_version = "HTTP/1.1"
+    falhas = {}      # caminho -> quantas 503 ainda responder
+    atrasos = {}     # caminho -> quantas respostas ainda atrasar
+    portas = []
+    corpos = []
+
+    def do_GET(self):
+        self.portas.append(self.client_address[1])
+        if self.atrasos.get(self.path, 0) > 0:
+            self.atrasos[self.path] -= 1
+            time.sleep(0.3)
+        if self.falhas.get(self.path, 0) > 0:
+            self.falhas[self.path] -= 1
+            self._responder(503, b"indisponivel")
+        elif self.path == "/grande":
+            self._responder(200, b"x" * (256 * 1024))
+        elif self.path == "/sem-tamanho":
+            # Corpo sem Content-Length: o limite só pode ser checado durante a leitura
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(b"y" * (256 * 1024))
+            self.close_connection = True
+        else:
+            self._responder(200, json.dumps({"caminho": self.path}).encode())
+
+    def do_POST(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        self.corpos.append((self.headers.get("Authorization"), json.loads(self.rfile.read(tamanho))))
+        self._responder(200, b"{}")
+
+    def _responder(self, status, corpo):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_cliente_http():
+    print("🧪 Testando cliente HTTP compartilhado...")
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    cliente = ClienteHTTP(espera_base=0.01, max_bytes=100 * 1024)
+
+    # Teste 1: Conexão reaproveitada entre requisições
+    print("1. Testando keep-alive...")
+    for i in range(5):
+        assert cliente.get(f"{base}/pagina/{i}", timeout=2).json() == {"caminho": f"/pagina/{i}"}
+    assert len(set(_Servidor.portas)) == 1, _Servidor.portas
+
+    # Teste 2: 5xx é repetido com backoff até dar certo (ou acabar as tentativas)
+    print("2. Testando novas tentativas em 5xx...")
+    _Servidor.falhas["/instavel"] = 2
+    assert cliente.get(f"{base}/instavel", timeout=2).status_code == 200
+    _Servidor.falhas["/fora"] = 5
+    assert cliente.get(f"{base}/fora", timeout=2, tentativas=2).status_code == 503
+    assert _Servidor.falhas["/fora"] == 3
+
+    # Teste 3: Timeout também é repetido
+    print("3. Testando novas tentativas em timeout...")
+    _Servidor.atrasos["/lento"] = 1
+    assert cliente.get(f"{base}/lento", timeout=0.1).status_code == 200
+    _Servidor.atrasos["/lento"] = 1
+    try:
+        cliente.get(f"{base}/lento", timeout=0.1, tentativas=1)
+        assert False, "Deveria ter estourado o timeout"
+    except requests.Timeout:
+        pass
+
+    # Teste 4: Limite de bytes, pelo Content-Length e durante a leitura
+    print("4. Testando limite de tamanho da resposta...")
+    for caminho in ("/grande", "/sem-tamanho"):
+        try:
+            cliente.get(f"{base}{caminho}", timeout=2)
+            assert False, f"{caminho} deveria ter sido recusado"
+        except RespostaMuitoGrande:
+            pass
+    assert len(cliente.get(f"{base}/grande", timeout=2, max_bytes=512 * 1024).content) == 256 * 1024
+
+    # Teste 5: FCM com chave real envia pelo cliente compartilhado
+    print("5. Testando envio FCM...")
+    fcm = FCMService(server_key="chave-teste", api_url=f"{base}/fcm/send")
+    assert fcm.enviar_notificacao_push("token-1", "Título", "Mensagem", {"recurso": "noticias"})
+    assert _Servidor.corpos[-1][0] == "key=chave-teste"
+    assert _Servidor.corpos[-1][1]["to"] == "token-1"
+    assert FCMService().enviar_notificacao_push("token-1", "Título", "Mensagem")
+
+    cliente.fechar()
+    servidor.shutdown()
+    print("✅ Teste do cliente HTTP concluído!")
+
+def test_disjuntor_por_host():
+    print("🧪 Testando disjuntor por host...")
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    # Porta sem ninguém escutando: host "fora do ar"
+    with socket.socket() as livre:
+        livre.bind(("127.0.0.1", 0))
+        morto = f"http://127.0.0.1:{livre.getsockname()[1]}"
+
+    agora = [0.0]
+    cliente = ClienteHTTP(espera_base=0.01, tentativas=2,
+                          disjuntores=DisjuntoresPorHost(limite_falhas=2, espera=60, relogio=lambda: agora[0]))
+
+    # Teste 1: Falhas seguidas abrem o circuito e as próximas são recusadas na hora
+    print("1. Testando abertura do circuito...")
+    for _ in range(2):
+        try:
+            cliente.get(f"{morto}/pagina", timeout=1)
+            assert False, "Deveria ter falhado a conexão"
+        except requests.ConnectionError:
+            pass
+    inicio = time.perf_counter()
+    for _ in range(20):
+        try:
+            cliente.get(f"{morto}/pagina", timeout=1)
+            assert False, "Deveria ter sido recusado pelo disjuntor"
+        except CircuitoAberto:
+            pass
+    assert time.perf_counter() - inicio < 0.05
+    estado = cliente.diagnostico()[morto.split("//")[1]]
+    assert estado == {"estado": "aberto", "falhas_seguidas": 2, "reabre_em": 60.0, "recusadas": 20}, estado
+
+    # Teste 2: Os outros hosts não são afetados
+    print("2. Testando isolamento entre hosts...")
+    assert cliente.get(f"{base}/pagina/ok", timeout=1).status_code == 200
+    assert cliente.diagnostico()[base.split("//")[1]]["estado"] == "fechado"
+
+    # Teste 3: Meio aberto libera uma única sonda; falhando, abre de novo
+    print("3. Testando sonda do circuito meio aberto...")
+    agora[0] = 61
+    disjuntor = cliente.disjuntores.obter(morto.split("//")[1])
+    assert disjuntor.permitir() and not disjuntor.permitir()
+    disjuntor.liberar_sonda()
+    try:
+        cliente.get(f"{morto}/pagina", timeout=1)
+        assert False, "A sonda deveria ter falhado"
+    except requests.ConnectionError:
+        pass
+    assert disjuntor.estado == "aberto" and disjuntor.diagnostico()["reabre_em"] == 60.0
+
+    # Teste 4: 5xx depois das tentativas conta como falha; sonda bem-sucedida fecha
+    print("4. Testando 5xx e fechamento pela sonda...")
+    _Servidor.falhas["/fora"] = 4
+    for _ in range(2):
+        assert cliente.get(f"{base}/fora", timeout=1).status_code == 503
+    try:
+        cliente.get(f"{base}/fora", timeout=1)
+        assert False, "Deveria ter sido recusado pelo disjuntor"
+    except CircuitoAberto:
+        pass
+    agora[0] = 200
+    assert cliente.get(f"{base}/fora", timeout=1).status_code == 200
+    assert cliente.diagnostico()[base.split("//")[1]]["estado"] == "fechado"
+
+    cliente.fechar()
+    servidor.shutdown()
+    print("✅ Teste do disjuntor por host concluído!")
+
+if __name__ == "__main__":
+    test_cliente_http()
+    test_disjuntor_por_host()
@@ -0,0 +1,45 @@
+# test_notificacao_repository.py
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from repositories.notificacao_repository import NotificacaoRepository
+
+def test_marcar_como_lida():
+    print("🧪 Testando marcação de notificações como lidas...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        repo = NotificacaoRepository(os.path.join(diretorio, "teste.db"))
+        engine = repo.db_manager.engine
+        for i in range(300):
+            repo.adicionar_notificacao("noticias", f"Notícia {i}", "Mensagem")
+        for recurso in ("avisos", "eventos", "editais"):
+            repo.adicionar_notificacao(recurso, "Título", "Mensagem")
+
+        # Teste 1: Um único UPDATE, com a quantidade de linhas alteradas
+        print("1. Testando UPDATE por recurso...")
+        consultas = []
+        registrar = lambda conn, cursor, statement, *args: consultas.append(statement)
+        event.listen(engine, "before_cursor_execute", registrar)
+        sucesso, quantidade = repo.marcar_como_lida(recurso="noticias")
+        event.remove(engine, "before_cursor_execute", registrar)
+        assert sucesso and quantidade == 300
+        assert [c.split()[0] for c in consultas] == ["UPDATE"]
+        assert repo.marcar_como_lida(recurso="noticias") == (True, 0)
+
+        # Teste 2: Variante em lote (ids e recursos na mesma transação)
+        print("2. Testando marcação em lote...")
+        id_avisos = repo.obter_notificacoes_nao_lidas("avisos")[0]["id"]
+        sucesso, quantidade = repo.marcar_varias_como_lidas(ids=[id_avisos], recursos=["eventos"])
+        assert sucesso and quantidade == 2
+        assert [n["recurso"] for n in repo.obter_notificacoes_nao_lidas()] == ["editais"]
+        assert repo.marcar_varias_como_lidas() == (True, 0)
+
+        engine.dispose()
+
+    print("✅ Teste de marcação como lida concluído!")
+
+if __name__ == "__main__":
+    test_marcar_como_lida()
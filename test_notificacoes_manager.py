@@ -0,0 +1,195 @@
+# test_notificacoes_manager.py
+import sys
+import os
+import json
+import time
+import random
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.notificacoes_manager import NotificacoesManager, obter_notificacoes_manager, contar_nao_lidas
+from utils.agrupador_notificacoes import RESUMO_GLOBAL
+from services.fcm_service import FCMService
+from services.despachante_push import DespachantePush
+
+RECURSOS = ["noticias", "calendario", "revista", "graduacao", "sobre_geologia",
+            "sobre_departamento", "coordenacao", "acessibilidade", "normas_ufc"]
+
+
+def _ler(manager):
+    with open(manager.notificacoes_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_gravacao_adiada():
+    print("🧪 Testando gravação adiada das notificações...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = NotificacoesManager(data_dir=diretorio)
+        manager._gravador.atraso = 0.2
+        # Sem plyer/badge no teste: só o estado local
+        manager._mostrar_notificacao_local = lambda titulo, mensagem: None
+        gravacoes = manager._gravador.gravacoes
+
+        # Teste 1: Rajada de 3 notificações x 9 fontes = uma gravação
+        print("1. Testando rajada de notificações...")
+        for recurso in RECURSOS:
+            for i in range(3):
+                manager.adicionar_notificacao(recurso, f"Atualização {i} em {recurso}", "Mensagem")
+        assert manager.obter_total_nao_lidas() == 27
+        assert _ler(manager) == {}, "Nada deveria ter sido gravado ainda"
+        time.sleep(0.5)
+        assert manager._gravador.gravacoes == gravacoes + 1
+        gravado = _ler(manager)
+        assert sum(len(lista) for lista in gravado.values()) == 27
+        ids = [n["id"] for lista in gravado.values() for n in lista]
+        assert len(set(ids)) == 27, "Ids repetidos na rajada"
+
+        # Teste 2: Leituras vêm da memória e marcar como lida também é adiado
+        print("2. Testando marcação como lida...")
+        id_alvo = manager.obter_notificacoes_nao_lidas("noticias")[0]["id"]
+        manager.marcar_como_lida("noticias", id_alvo)
+        manager.marcar_como_lida("revista")
+        assert manager.obter_notificacoes_nao_lidas()["noticias"] == 2
+        assert manager.obter_notificacoes_nao_lidas()["revista"] == 0
+        assert not any(n["lida"] for n in _ler(manager)["revista"])
+
+        # Teste 3: descarregar grava na hora (DegeoApp.on_stop) e um novo manager relê o arquivo
+        print("3. Testando descarga no encerramento...")
+        assert manager.descarregar() and not manager.descarregar()
+        assert all(n["lida"] for n in _ler(manager)["revista"])
+        time.sleep(0.3)
+        assert manager._gravador.gravacoes == gravacoes + 2
+        relido = NotificacoesManager(data_dir=diretorio)
+        assert relido.obter_notificacoes_nao_lidas() == manager.obter_notificacoes_nao_lidas()
+
+        # Teste 4: Limite de 50 notificações por recurso
+        print("4. Testando limite por recurso...")
+        for i in range(60):
+            manager.adicionar_notificacao("noticias", f"Notícia extra {i}", "Mensagem")
+        manager.descarregar()
+        assert len(_ler(manager)["noticias"]) == 50
+        assert _ler(manager)["noticias"][0]["titulo"] == "Notícia extra 59"
+
+        # Teste 5: Um manager por diretório no processo
+        print("5. Testando manager compartilhado...")
+        assert obter_notificacoes_manager(diretorio) is obter_notificacoes_manager(os.path.join(diretorio, "."))
+
+    print("✅ Teste da gravação adiada concluído!")
+
+def _verificar_contadores(manager):
+    """Recontagem completa do histórico tem que bater com os contadores mantidos"""
+    recontagem = contar_nao_lidas(manager.notificacoes)
+    mantidos = {recurso: n for recurso, n in manager.obter_notificacoes_nao_lidas().items()}
+    assert mantidos == recontagem, (mantidos, recontagem)
+    assert manager.obter_total_nao_lidas() == sum(recontagem.values())
+
+
+def test_contadores_nao_lidas():
+    print("🧪 Testando contadores de não lidas...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = NotificacoesManager(data_dir=diretorio)
+        manager._mostrar_notificacao_local = lambda titulo, mensagem: None
+
+        # Teste 1: Inserção, corte no limite de 50, marcação e remoção
+        print("1. Testando operações individuais...")
+        for i in range(55):
+            manager.adicionar_notificacao("noticias", f"Notícia {i}", "Mensagem")
+        assert manager.obter_total_nao_lidas() == 50
+        _verificar_contadores(manager)
+        ultima = manager.obter_notificacoes_nao_lidas("noticias")[0]["id"]
+        manager.marcar_como_lida("noticias", ultima)
+        manager.marcar_como_lida("noticias", ultima)
+        assert manager.obter_total_nao_lidas() == 49
+        assert manager.remover_notificacao("noticias", ultima)
+        assert manager.obter_total_nao_lidas() == 49
+        _verificar_contadores(manager)
+
+        # Teste 2: Sequência aleatória de operações
+        print("2. Testando sequência aleatória...")
+        sorteio = random.Random(22)
+        for _ in range(2000):
+            recurso = sorteio.choice(RECURSOS)
+            operacao = sorteio.random()
+            lista = manager.notificacoes.get(recurso, [])
+            if operacao < 0.6:
+                manager.adicionar_notificacao(recurso, f"Atualização em {recurso}", "Mensagem")
+            elif operacao < 0.8 and lista:
+                manager.marcar_como_lida(recurso, sorteio.choice(lista)["id"])
+            elif operacao < 0.9 and lista:
+                manager.remover_notificacao(recurso, sorteio.choice(lista)["id"])
+            elif operacao < 0.95:
+                manager.marcar_como_lida(recurso)
+            else:
+                manager.remover_notificacao(recurso)
+        _verificar_contadores(manager)
+
+        # Teste 3: Contadores reconstruídos a partir do arquivo
+        print("3. Testando recarga do arquivo...")
+        manager.descarregar()
+        _verificar_contadores(NotificacoesManager(data_dir=diretorio))
+
+    print("✅ Teste dos contadores de não lidas concluído!")
+
+def _manager_contado(diretorio, modo=None):
+    """Manager com FCM simulado e contadores de avisos e badges"""
+    manager = NotificacoesManager(data_dir=diretorio)
+    manager.agrupador.janela = 0.2
+    if modo:
+        manager.agrupador.modo = modo
+    manager.fcm_service = FCMService()
+    manager.despachante_push = DespachantePush(manager.fcm_service)
+    manager.registro_tokens.registrar("celular", "token-1")
+    avisos = []
+    badges = []
+    manager._mostrar_notificacao_local = lambda titulo, mensagem: avisos.append((titulo, mensagem))
+    manager._atualizar_badge_global = lambda: badges.append(manager.obter_total_nao_lidas())
+    return manager, avisos, badges
+
+
+def test_resumo_notificacoes():
+    print("🧪 Testando resumo de notificações...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Teste 1: 3 novidades x 9 fontes: um aviso e um push por fonte, um badge
+        print("1. Testando resumo por recurso...")
+        manager, avisos, badges = _manager_contado(diretorio)
+        for recurso in RECURSOS:
+            for i in range(3):
+                manager.adicionar_notificacao(recurso, f"Atualização {i} em {recurso}", "Mensagem",
+                                              {"url": f"https://geologia.ufc.br/{recurso}", "nome_recurso": recurso.title()})
+        assert manager.obter_total_nao_lidas() == 27 and avisos == []
+        time.sleep(0.5)
+        manager.despachante_push.aguardar(5)
+        assert len(avisos) == 9 and badges == [27]
+        assert manager.despachante_push.estatisticas()["mensagens"] == 9
+        assert avisos[0] == ("Noticias: 3 novidades",
+                             "Atualização 0 em noticias; Atualização 1 em noticias; Atualização 2 em noticias")
+        # As notificações continuam uma a uma na lista do app
+        assert len(manager.obter_notificacoes_nao_lidas("noticias")) == 3
+
+        # Teste 2: Aviso isolado sai como foi criado
+        print("2. Testando aviso isolado...")
+        manager.adicionar_notificacao("revista", "Revista: nova edição", "Nova atualização disponível")
+        manager.encerrar()
+        assert avisos[-1] == ("Revista: nova edição", "Nova atualização disponível")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Teste 3: Modo global: um único resumo para a rajada inteira
+        print("3. Testando resumo global...")
+        manager, avisos, badges = _manager_contado(diretorio, RESUMO_GLOBAL)
+        for recurso in RECURSOS:
+            for i in range(3):
+                manager.adicionar_notificacao(recurso, f"Atualização {i} em {recurso}", "Mensagem")
+        manager.encerrar()
+        assert len(avisos) == 1 and badges == [27]
+        assert avisos[0][0] == "27 novidades em 9 seções" and avisos[0][1].endswith("e mais 24")
+        assert manager.agrupador.recebidos == 27 and manager.agrupador.emitidos == 1
+
+    print("✅ Teste do resumo de notificações concluído!")
+
+if __name__ == "__main__":
+    test_gravacao_adiada()
+    test_contadores_nao_lidas()
+    test_resumo_notificacoes()
@@ -0,0 +1,120 @@
+# test_plano_consultas.py
+import sys
+import os
+import re
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from models.database_manager import DatabaseManager
+from models.database_models import Base
+from repositories.aula_repository import AulaRepository
+from repositories.usuario_repository import UsuarioRepository
+from repositories.notificacao_repository import NotificacaoRepository
+
+# "SCAN aulas" (ou "SCAN TABLE aulas" em SQLite antigo) sem "USING ... INDEX" = varredura completa
+VARREDURA_COMPLETA = re.compile(r"^SCAN (TABLE )?\w+( AS \w+)?$")
+
+def _capturar_consultas(engine, funcao):
+    """Executa a função e devolve as instruções SQL (com parâmetros) que ela enviou"""
+    consultas = []
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            consultas.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        funcao()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return consultas
+
+def _varreduras(engine, statement, parameters):
+    conexao = engine.raw_connection()
+    try:
+        cursor = conexao.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [linha[3] for linha in cursor.fetchall() if VARREDURA_COMPLETA.match(linha[3])]
+    finally:
+        conexao.close()
+
+def test_plano_consultas_repositorios():
+    print("🧪 Testando planos de consulta dos repositórios...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, "teste.db")
+        usuario_repo = UsuarioRepository(db_path)
+        aula_repo = AulaRepository(db_path)
+        aula_repo.data_dir = diretorio  # excluir_aula apaga data_dir/arquivos/<id>
+        notificacao_repo = NotificacaoRepository(db_path)
+        engine = usuario_repo.db_manager.engine
+
+        usuario_repo.criar_usuario("Prof Plano", "plano@ufc.br", "123456", "professor")
+        aula_repo.criar_aula("Aula 1", "Geologia", "", [], [], "Prof Plano")
+        notificacao_repo.adicionar_notificacao("noticias", "Notícia", "Mensagem")
+        _, cursor = aula_repo.obter_aulas_paginadas(tamanho_pagina=1)
+
+        operacoes = {
+            "criar_usuario": lambda: usuario_repo.criar_usuario("Outro", "outro@ufc.br", "123456", "aluno"),
+            "autenticar_usuario": lambda: usuario_repo.autenticar_usuario("plano@ufc.br", "123456"),
+            "obter_professores": usuario_repo.obter_professores,
+            "alterar_senha": lambda: usuario_repo.alterar_senha("plano@ufc.br", "654321"),
+            "criar_aula": lambda: aula_repo.criar_aula("Aula 2", "Geologia", "", [], [], "Prof Plano"),
+            "obter_todas_aulas": aula_repo.obter_todas_aulas,
+            "obter_aulas_por_professor": lambda: aula_repo.obter_aulas_por_professor("Prof Plano"),
+            "obter_aulas_paginadas": lambda: aula_repo.obter_aulas_paginadas("Prof Plano", cursor=cursor),
+            "atualizar_aula": lambda: aula_repo.atualizar_aula(1, "Aula 1", "Geologia", "", [], [], "Prof Plano"),
+            "adicionar_comentario": lambda: aula_repo.adicionar_comentario(1, "Aluno", "Comentário"),
+            "obter_aula": lambda: aula_repo.obter_aula(1),
+            "excluir_aula": lambda: aula_repo.excluir_aula(2),
+            "obter_notificacoes_nao_lidas": lambda: notificacao_repo.obter_notificacoes_nao_lidas("noticias"),
+            "obter_notificacoes_nao_lidas (todas)": notificacao_repo.obter_notificacoes_nao_lidas,
+            "marcar_como_lida (recurso)": lambda: notificacao_repo.marcar_como_lida(recurso="noticias"),
+            "marcar_como_lida (id)": lambda: notificacao_repo.marcar_como_lida(notificacao_id=1),
+            "marcar_varias_como_lidas": lambda: notificacao_repo.marcar_varias_como_lidas(ids=[1, 2], recursos=["avisos"]),
+        }
+
+        falhas = []
+        for nome, funcao in operacoes.items():
+            for statement, parameters in _capturar_consultas(engine, funcao):
+                for detalhe in _varreduras(engine, statement, parameters):
+                    falhas.append(f"{nome}: {detalhe}\n    {' '.join(statement.split())}")
+            print(f"   {nome}: ok" if not any(f.startswith(nome + ":") for f in falhas) else f"   {nome}: VARREDURA")
+
+        engine.dispose()
+        assert not falhas, "Consultas com varredura completa:\n" + "\n".join(falhas)
+
+    print("✅ Nenhuma consulta dos repositórios faz varredura completa!")
+
+def test_indices_em_banco_existente():
+    print("🧪 Testando criação de índices em banco já existente...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        db_path = os.path.join(diretorio, "antigo.db")
+
+        # Banco criado pela versão antiga: só as tabelas, sem os índices novos
+        conexao = sqlite3.connect(db_path)
+        conexao.execute("CREATE TABLE usuarios (id INTEGER PRIMARY KEY, nome VARCHAR(100) NOT NULL, "
+                        "email VARCHAR(100) NOT NULL UNIQUE, senha_hash VARCHAR(64) NOT NULL, "
+                        "tipo VARCHAR(20) NOT NULL, genero VARCHAR(20), disciplina VARCHAR(100), "
+                        "data_criacao DATETIME, ativo BOOLEAN)")
+        conexao.execute("INSERT INTO usuarios (nome, email, senha_hash, tipo) VALUES ('Prof', 'p@ufc.br', 'x', 'professor')")
+        conexao.commit()
+        conexao.close()
+
+        manager = DatabaseManager(db_path, compartilhado=False)
+        with manager.engine.connect() as conn:
+            existentes = {linha[0] for linha in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")}
+            total_usuarios = conn.exec_driver_sql("SELECT COUNT(*) FROM usuarios").scalar()
+        manager.engine.dispose()
+
+        esperados = {indice.name for tabela in Base.metadata.sorted_tables for indice in tabela.indexes}
+        assert esperados <= existentes, esperados - existentes
+        assert total_usuarios == 1
+
+    print("✅ Índices adicionados sem recriar as tabelas!")
+
+if __name__ == "__main__":
+    test_plano_consultas_repositorios()
+    test_indices_em_banco_existente()
@@ -0,0 +1,68 @@
+# test_registro_tokens.py
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.registro_tokens import RegistroTokens
+from utils.notificacoes_manager import NotificacoesManager
+
+AGORA = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def test_registro_tokens():
+    print("🧪 Testando registro de tokens FCM...")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, "fcm_tokens.json")
+
+        # Teste 1: Formato antigo (um token simulado por abertura do app): os
+        # simulados são descartados, um token real vira dispositivo legado
+        print("1. Testando migração do formato antigo...")
+        antigos = {f"fcm_token_simulado_{i}": {"data_registro": (AGORA - timedelta(days=13 - i)).isoformat(),
+                                               "plataforma": "android", "ativo": True} for i in range(13)}
+        antigos["token-real-antigo"] = {"data_registro": (AGORA - timedelta(days=55)).isoformat(),
+                                        "plataforma": "android", "ativo": True}
+        with open(arquivo, "w", encoding="utf-8") as f:
+            json.dump(antigos, f)
+        registro = RegistroTokens(arquivo)
+        assert list(registro.dispositivos) == ["legado:token-real-antigo"]
+        assert registro.tokens_ativos(AGORA) == ["token-real-antigo"]
+        # Expira pelo TTL como qualquer dispositivo
+        assert registro.tokens_ativos(AGORA + timedelta(days=10)) == []
+
+        # Teste 2: Upsert por dispositivo: várias aberturas, uma entrada
+        print("2. Testando upsert por dispositivo...")
+        for dia in range(10):
+            registro.registrar("celular-1", "token-atual", agora=AGORA + timedelta(days=dia))
+        registro.registrar("celular-2", "token-2", agora=AGORA)
+        entrada = registro.dispositivos["celular-1"]
+        assert entrada["data_registro"] == AGORA.isoformat()
+        assert entrada["ultimo_acesso"] == (AGORA + timedelta(days=9)).isoformat()
+        # Token novo do mesmo dispositivo substitui o anterior; token levado para outro sai do antigo
+        registro.registrar("celular-1", "token-renovado", agora=AGORA + timedelta(days=10))
+        registro.registrar("tablet", "token-2", agora=AGORA + timedelta(days=10))
+        assert "celular-2" not in registro.dispositivos
+
+        # Teste 3: Compactação mantém só os dispositivos vivos
+        print("3. Testando compactação...")
+        removidos = registro.compactar(AGORA + timedelta(days=10))
+        assert removidos == 1, removidos
+        assert sorted(registro.tokens_ativos(AGORA + timedelta(days=10))) == ["token-2", "token-renovado"]
+        assert sorted(json.load(open(arquivo, encoding="utf-8"))) == ["celular-1", "tablet"]
+        assert registro.compactar(AGORA + timedelta(days=80)) == 2
+
+        # Teste 4: O app registra o mesmo dispositivo a cada inicialização
+        print("4. Testando registro pelo NotificacoesManager...")
+        manager = NotificacoesManager(data_dir=diretorio)
+        for _ in range(5):
+            manager._registrar_dispositivo()
+        assert len(manager.registro_tokens.dispositivos) == 1
+        assert manager.registro_tokens.tokens_ativos() == [manager._obter_fcm_token()]
+
+    print("✅ Teste do registro de tokens concluído!")
+
+if __name__ == "__main__":
+    test_registro_tokens()
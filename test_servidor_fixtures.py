@@ -0,0 +1,77 @@
+# test_servidor_fixtures.py
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+from servidor_fixtures import ServidorFixtures, fixtures_sinteticas
+from benchmark_verificacoes import executar_cenario
+
+NOTICIAS = "https://geologia.ufc.br/wp-json/wp/v2/posts"
+GRADUACAO = "https://geologia.ufc.br/pt/graduacao/"
+CALENDARIO = "https://www.ufc.br/calendario-universitario/2025"
+
+
+def test_servidor_fixtures():
+    print("🧪 Testando servidor de fixtures...")
+
+    fixtures = fixtures_sinteticas()
+    servidor = ServidorFixtures(fixtures).iniciar()
+    sessao = requests.Session()
+
+    # Teste 1: Um endereço por host e 304 com o ETag da resposta anterior
+    print("1. Testando páginas gravadas e requisições condicionais...")
+    assert servidor.url_local(GRADUACAO).split(":")[1] != servidor.url_local(CALENDARIO).split(":")[1]
+    resposta = sessao.get(servidor.url_local(GRADUACAO))
+    assert resposta.status_code == 200 and "<main>" in resposta.text
+    condicional = sessao.get(servidor.url_local(GRADUACAO), headers={"If-None-Match": resposta.headers["ETag"]})
+    assert condicional.status_code == 304 and condicional.content == b""
+    assert servidor.estatisticas()["respostas_304"] == 1
+
+    # Teste 2: API do WordPress com filtro, campos e paginação
+    print("2. Testando API do WordPress...")
+    posts = sessao.get(servidor.url_local(NOTICIAS) + "?_fields=id,date&per_page=5").json()
+    assert len(posts) == 5 and set(posts[0]) == {"id", "date"} and posts[0]["id"] == 40
+    depois = sessao.get(servidor.url_local(NOTICIAS) + f"?after={posts[2]['date']}").json()
+    assert [p["id"] for p in depois] == [40, 39]
+    assert sessao.get(servidor.url_local(NOTICIAS) + "?page=9").status_code == 400
+
+    # Teste 3: Falhas injetadas
+    print("3. Testando latência, erros e host fora do ar...")
+    servidor.configurar(GRADUACAO, erro=503, erros=2)
+    assert [sessao.get(servidor.url_local(GRADUACAO)).status_code for _ in range(3)] == [503, 503, 200]
+    servidor.configurar(CALENDARIO, latencia=0.2)
+    inicio = time.perf_counter()
+    sessao.get(servidor.url_local(CALENDARIO))
+    assert time.perf_counter() - inicio >= 0.2
+    servidor.configurar(CALENDARIO, latencia=None, fora_do_ar=True)
+    try:
+        sessao.get(servidor.url_local(CALENDARIO))
+        assert False, "Deveria ter falhado a conexão"
+    except requests.ConnectionError:
+        pass
+
+    # Teste 4: Publicação nova muda o ETag; as fixtures originais não são alteradas
+    print("4. Testando publicação...")
+    etag = sessao.get(servidor.url_local(GRADUACAO)).headers["ETag"]
+    servidor.publicar(GRADUACAO, "Novo edital de monitoria")
+    resposta = sessao.get(servidor.url_local(GRADUACAO), headers={"If-None-Match": etag})
+    assert resposta.status_code == 200 and "Novo edital de monitoria" in resposta.text
+    assert "Novo edital" not in fixtures[GRADUACAO]["corpo"]
+    servidor.encerrar()
+
+    # Teste 5: Benchmark de ponta a ponta no cenário normal
+    print("5. Testando rodadas do benchmark...")
+    resultados = executar_cenario("normal", fixtures, exibir=False)
+    fria, sem_mudancas, publicacao = resultados["manager"]
+    assert fria["requisicoes"] == len(fixtures) and fria["respostas_304"] == 0
+    assert sem_mudancas["respostas_304"] == len(fixtures)
+    assert sem_mudancas["bytes"] * 50 < fria["bytes"]
+    assert publicacao["respostas_304"] == len(fixtures) - 2
+    assert resultados["recentes"][1]["respostas_304"] == len(fixtures)
+
+    print("✅ Teste do servidor de fixtures concluído!")
+
+if __name__ == "__main__":
+    test_servidor_fixtures()
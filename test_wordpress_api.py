@@ -0,0 +1,128 @@
+# test_wordpress_api.py
+import sys
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.wordpress_api import buscar_posts, data_ultimo_post, url_posts
+from utils.atualizacoes_manager import AtualizacoesManager
+
+INICIO = datetime(2025, 3, 1, 8, 0, 0)
+# 40 posts, um a cada 6 horas, cada um com o conteúdo completo renderizado
+POSTS = [{
+    "id": i,
+    "date": (INICIO + timedelta(hours=6 * i)).isoformat(),
+    "title": {"rendered": f"Notícia número {i} do departamento"},
+    "link": f"https://geologia.ufc.br/pt/noticia-{i}/",
+    "content": {"rendered": "<p>" + "Texto da notícia. " * 400 + "</p>"},
+    "excerpt": {"rendered": "<p>" + "Resumo. " * 40 + "</p>"},
+} for i in range(40)]
+
+
+class _WordPress(BaseHTTPRequestHandler):
+    """Imita /wp-json/wp/v2/posts: after, per_page, page, _fields, X-WP-TotalPages e ETag"""
+    consultas = []
+    condicionais = []
+
+    def do_GET(self):
+        consulta = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        self.consultas.append(consulta)
+        posts = sorted(POSTS, key=lambda p: p["date"], reverse=True)
+        if "after" in consulta:
+            posts = [p for p in posts if p["date"] > consulta["after"]]
+        por_pagina = int(consulta.get("per_page", 10))
+        pagina = int(consulta.get("page", 1))
+        total_paginas = max(1, -(-len(posts) // por_pagina))
+        if pagina > total_paginas:
+            self._responder(400, {"code": "rest_post_invalid_page_number"}, len(posts), total_paginas)
+            return
+        posts = posts[(pagina - 1) * por_pagina:pagina * por_pagina]
+        if "_fields" in consulta:
+            campos = consulta["_fields"].split(",")
+            posts = [{c: p[c] for c in campos} for p in posts]
+        self._responder(200, posts, len(posts), total_paginas)
+
+    def _responder(self, status, dados, total, total_paginas):
+        corpo = json.dumps(dados).encode()
+        etag = f'"{hashlib.md5(corpo).hexdigest()}"'
+        self.condicionais.append(self.headers.get("If-None-Match"))
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-WP-Total", str(total))
+        self.send_header("X-WP-TotalPages", str(total_paginas))
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_posts_wordpress():
+    print("🧪 Testando busca incremental na API do WordPress...")
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _WordPress)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/wp-json/wp/v2/posts"
+
+    # Teste 1: Sem data de referência, só a primeira página com os campos mínimos
+    print("1. Testando primeira página...")
+    _WordPress.consultas.clear()
+    status, resposta, itens = buscar_posts(url)
+    assert status == 200 and len(itens) == 10 and len(_WordPress.consultas) == 1
+    assert _WordPress.consultas[0]["_fields"] == "id,date,title,link"
+    assert itens[0]["titulo"] == "Notícia número 39 do departamento"
+    enxuto = len(resposta.content)
+    completo = len(json.dumps(sorted(POSTS, key=lambda p: p["date"], reverse=True)[:10]).encode())
+    print(f"   payload: {enxuto} bytes (padrão: {completo} bytes)")
+    assert enxuto * 10 < completo
+
+    # Teste 2: Poucos posts novos: uma requisição, filtrada pelo servidor
+    print("2. Testando filtro after...")
+    _WordPress.consultas.clear()
+    _, _, itens = buscar_posts(url, depois=INICIO + timedelta(hours=6 * 36, minutes=1))
+    assert [i["titulo"] for i in itens] == [f"Notícia número {n} do departamento" for n in (39, 38, 37)]
+    assert len(_WordPress.consultas) == 1 and _WordPress.consultas[0]["after"] == "2025-03-10T08:01:00"
+
+    # Teste 3: Muitos posts novos: segue a paginação até o fim
+    print("3. Testando paginação...")
+    _WordPress.consultas.clear()
+    _, _, itens = buscar_posts(url, depois=INICIO + timedelta(hours=6 * 16, minutes=1))
+    assert len(itens) == 23 and len({i["link"] for i in itens}) == 23
+    assert [c.get("page") for c in _WordPress.consultas] == [None, "2", "3"]
+
+    # Teste 4: Data do último post e verificador de atualizações
+    print("4. Testando integração...")
+    assert data_ultimo_post(url)[2] == datetime.fromisoformat(POSTS[-1]["date"])
+    with tempfile.TemporaryDirectory() as diretorio:
+        manager = AtualizacoesManager(data_dir=diretorio)
+        ultima_lida = (INICIO + timedelta(hours=6 * 38, minutes=1)).isoformat()
+        quantidade, novos, referencia = manager._verificar_quantidade_atualizacoes(url, ultima_lida)
+        assert quantidade == 1 and novos[0]["link"].endswith("noticia-39/") and referencia is None
+
+        # Validadores por consulta: o 304 só vale para o mesmo `after`
+        _WordPress.condicionais.clear()
+        assert manager._verificar_quantidade_atualizacoes(url, ultima_lida)[0] is None
+        assert _WordPress.condicionais[-1] is not None
+        outra_lida = (INICIO + timedelta(hours=6 * 37, minutes=1)).isoformat()
+        quantidade, novos, _ = manager._verificar_quantidade_atualizacoes(url, outra_lida)
+        assert quantidade == 2 and _WordPress.condicionais[-1] is None
+        assert [chave for chave in manager.validadores.entradas if chave.startswith(url)] == [
+            url_posts(url, datetime.fromisoformat(outra_lida))]
+
+    servidor.shutdown()
+    print("✅ Teste da API do WordPress concluído!")
+
+if __name__ == "__main__":
+    test_posts_wordpress()
@@ -0,0 +1,98 @@
+# utils/agrupador_notificacoes.py
+import logging
+import threading
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Tempo (s) em que os avisos de uma rodada de verificação são juntados
+JANELA_RESUMO = 3.0
+
+# Um resumo por recurso ou um único resumo para todos
+RESUMO_POR_RECURSO = "recurso"
+RESUMO_GLOBAL = "global"
+
+# Títulos citados na mensagem do resumo
+TITULOS_NO_RESUMO = 3
+
+
+class AgrupadorNotificacoes:
+    """
+    Junta os avisos de uma rajada de notificações em resumos.
+
+    O primeiro aviso abre uma janela de `janela` segundos; o que chegar
+    nela é agrupado e, ao final, `emitir(resumos)` recebe uma lista de
+    (recurso, titulo, mensagem, dados): um item por recurso no modo
+    "recurso", ou um só no modo "global" (recurso None). Um grupo com um
+    único aviso sai como foi criado. As notificações em si continuam
+    gravadas uma a uma por quem chama; só o aviso no sistema, o push e o
+    badge são agrupados.
+    """
+
+    def __init__(self, emitir, janela=JANELA_RESUMO, modo=RESUMO_POR_RECURSO):
+        self.emitir = emitir
+        self.janela = janela
+        self.modo = modo
+        self._lock = threading.Lock()
+        self._emissao_lock = threading.Lock()
+        self._pendentes = []
+        self._timer = None
+        self.recebidos = 0
+        self.emitidos = 0
+
+    def adicionar(self, recurso, titulo, mensagem, dados=None):
+        with self._lock:
+            self._pendentes.append((recurso, titulo, mensagem, dados or {}))
+            self.recebidos += 1
+            if self._timer is None:
+                self._timer = threading.Timer(self.janela, self.descarregar)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def descarregar(self):
+        """Emite agora os resumos pendentes"""
+        with self._emissao_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pendentes, self._pendentes = self._pendentes, []
+            if not pendentes:
+                return 0
+            resumos = self._resumir(pendentes)
+            self.emitidos += len(resumos)
+            try:
+                self.emitir(resumos)
+            except Exception as e:
+                logger.error(f"Erro ao emitir resumo de notificações: {e}")
+            return len(resumos)
+
+    def _resumir(self, pendentes):
+        if self.modo == RESUMO_GLOBAL:
+            recursos = {aviso[0] for aviso in pendentes}
+            return [_resumo(pendentes[0][0] if len(recursos) == 1 else None, pendentes)]
+        grupos = {}
+        for aviso in pendentes:
+            grupos.setdefault(aviso[0], []).append(aviso)
+        return [_resumo(recurso, avisos) for recurso, avisos in grupos.items()]
+
+
+def _resumo(recurso, avisos):
+    """(recurso, titulo, mensagem, dados) de um grupo de avisos"""
+    if len(avisos) == 1:
+        return avisos[0]
+
+    titulos = [titulo for _, titulo, _, _ in avisos]
+    citados = "; ".join(titulos[:TITULOS_NO_RESUMO])
+    if len(titulos) > TITULOS_NO_RESUMO:
+        citados += f" e mais {len(titulos) - TITULOS_NO_RESUMO}"
+
+    if recurso is None:
+        recursos = list(dict.fromkeys(aviso[0] for aviso in avisos))
+        titulo = f"{len(avisos)} novidades em {len(recursos)} seções"
+        dados = {"tipo": "resumo", "quantidade": len(avisos), "recursos": recursos}
+    else:
+        primeiro = avisos[0][3]
+        titulo = f"{primeiro.get('nome_recurso', recurso)}: {len(avisos)} novidades"
+        dados = {"tipo": "resumo", "quantidade": len(avisos), "url": primeiro.get("url", "")}
+    return recurso, titulo, citados, dados
@@ -1,24 +1,40 @@
 # utils/atualizacoes_manager.py
 import json
 import os
-import requests
+import hashlib
 from datetime import datetime
 import logging
 import time
 import threading
-from queue import Queue
+from utils.motor_verificacao import obter_motor_verificacao
+from utils.cache_validadores import obter_cache_validadores
+from utils.http_cliente import obter_cliente_http
+from utils.disjuntor import CircuitoAberto
+from utils.impressao_conteudo import impressao_conteudo
+from utils.wordpress_api import e_api_wordpress, buscar_posts, url_posts
+from utils.intervalos_adaptativos import (
+    intervalo_atual, registrar_resultado, INTERVALO_MINIMO, INTERVALO_MAXIMO
+)
 
 # Configurar logging
 logger = logging.getLogger('degeo_app')
 
+# Títulos da versão anterior de cada página guardados para achar os novos
+MAX_TITULOS_VISTOS = 50
+
 class AtualizacoesManager:
-    def __init__(self, data_dir="data"):
+    # atualizacoes.json e as notificações são lidos e regravados por inteiro;
+    # só a parte de rede das verificações roda em paralelo (lock comum a todas
+    # as instâncias, pois as telas gravam nos mesmos arquivos)
+    _estado_lock = threading.RLock()
+
+    def __init__(self, data_dir="data", motor=None):
         self.data_dir = data_dir
         self.atualizacoes_file = os.path.join(data_dir, "atualizacoes.json")
         
         # ✅ CORREÇÃO: Inicializar notificacoes_manager AQUI no __init__
-        from utils.notificacoes_manager import NotificacoesManager
-        self.notificacoes_manager = NotificacoesManager(data_dir=data_dir)
+        from utils.notificacoes_manager import obter_notificacoes_manager
+        self.notificacoes_manager = obter_notificacoes_manager(data_dir)
 
         # ✅ CONFIGURAÇÕES DE CONTROLE
         self.max_notificacoes_por_verificacao = 3  # Máximo de notificações por vez
@@ -35,29 +51,16 @@ class AtualizacoesManager:
         
         # Cache para evitar verificações excessivas
         self.cache_verificacao = {}
-        # Tempo mínimo entre verificações (5 minutos)
-        self.tempo_minimo_entre_verificacoes = 300
+        # Limites do intervalo entre verificações de cada fonte: o intervalo
+        # cresce enquanto a fonte não muda e volta ao mínimo quando ela muda
+        self.tempo_minimo_entre_verificacoes = INTERVALO_MINIMO
+        self.tempo_maximo_entre_verificacoes = INTERVALO_MAXIMO
         # Timeout reduzido para respostas
         self.timeout = 2.0
-        # Fila para operações assíncronas
-        self.verificacao_queue = Queue()
-        # Thread para processar a fila
-        self.verificacao_thread = threading.Thread(target=self._processar_fila, daemon=True)
-        self.verificacao_thread.start()
-    
-    def _processar_fila(self):
-        """Processa a fila de verificações em uma thread separada"""
-        while True:
-            try:
-                chave, url, callback = self.verificacao_queue.get()
-                resultado = self._verificar_atualizacao_real(chave, url)
-                if callback:
-                    # Executar callback na thread principal
-                    from kivy.clock import Clock
-                    Clock.schedule_once(lambda dt, r=resultado, c=callback: c(r), 0)
-                self.verificacao_queue.task_done()
-            except Exception as e:
-                logger.error(f"Erro ao processar fila de verificações: {e}")
+        # Verificações em paralelo (pool compartilhado, com limite por host)
+        self.motor = motor or obter_motor_verificacao()
+        # ETag / Last-Modified por URL, para requisições condicionais
+        self.validadores = obter_cache_validadores(os.path.join(data_dir, "validadores_atualizacoes.json"))
     
     def _carregar_atualizacoes(self):
         try:
@@ -76,8 +79,11 @@ class AtualizacoesManager:
     
     def verificar_atualizacao(self, chave, url, callback=None):
         """Verifica atualização de forma assíncrona"""
-        # Adiciona à fila para processamento em segundo plano
-        self.verificacao_queue.put((chave, url, callback))
+        # Executa em segundo plano, em paralelo com as verificações dos outros recursos;
+        # se (chave, url) já está sendo verificada (por esta ou outra tela), só
+        # aguarda o mesmo resultado
+        self.motor.enviar(url, lambda: self._verificar_atualizacao_real(chave, url), callback,
+                          chave=(chave, url))
         # Retorna o valor do cache se existir, para não deixar a interface sem resposta
         if chave in self.cache_verificacao:
             return self.cache_verificacao[chave][1]
@@ -92,7 +98,7 @@ class AtualizacoesManager:
         agora = time.time()
         if chave in self.cache_verificacao:
             ultima_verificacao, resultado = self.cache_verificacao[chave]
-            # Se verificamos há menos de 5 minutos, retorna o resultado cacheado
+            # Se verificamos há menos que o intervalo mínimo, retorna o resultado cacheado
             if agora - ultima_verificacao < self.tempo_minimo_entre_verificacoes:
                 logger.debug(f"Usando cache para {chave}")
                 return resultado
@@ -106,11 +112,11 @@ class AtualizacoesManager:
         ultima_atualizacao = info.get('ultima_atualizacao')
         ultima_lida = info.get('ultima_lida')
         
-        # Se já verificamos recentemente, não verificamos novamente
+        # Se já verificamos dentro do intervalo desta fonte, não verificamos novamente
         if ultima_verificacao:
             try:
                 tempo_passado = datetime.now() - datetime.fromisoformat(ultima_verificacao)
-                if tempo_passado.total_seconds() < self.tempo_minimo_entre_verificacoes:
+                if tempo_passado.total_seconds() < self._intervalo_verificacao(info):
                     logger.debug(f"Verificação recente para {chave}, não verificando novamente")
                     # Retorna a quantidade de atualizações não lidas
                     quantidade = info.get('quantidade_nao_lida', 0)
@@ -121,27 +127,44 @@ class AtualizacoesManager:
                 pass
         
         # Verifica a atualização no site
-        quantidade_novas, novos_itens = self._verificar_quantidade_atualizacoes(url, ultima_lida)
+        quantidade_novas, novos_itens, referencia = self._verificar_quantidade_atualizacoes(url, ultima_lida, info)
+        nao_modificado = quantidade_novas is None
+        if nao_modificado or novos_itens is None:
+            # 304, conteúdo com a mesma impressão ou site fora do ar: mantém a contagem anterior
+            quantidade_novas = info.get('quantidade_nao_lida', 0)
         
-        # ✅ CORREÇÃO: Filtrar apenas atualizações relevantes
-        if quantidade_novas > 0 and novos_itens:
-            itens_relevantes = self._filtrar_atualizacoes_relevantes(chave, novos_itens)
-            if itens_relevantes:
-                self._criar_notificacoes(chave, itens_relevantes)
-                quantidade_novas = len(itens_relevantes)  # Atualiza a quantidade com os itens filtrados
-            else:
-                quantidade_novas = 0  # Se não há itens relevantes, zera a quantidade
+        with self._estado_lock:
+            # ✅ CORREÇÃO: Filtrar apenas atualizações relevantes
+            if quantidade_novas > 0 and novos_itens:
+                itens_relevantes = self._filtrar_atualizacoes_relevantes(chave, novos_itens)
+                if itens_relevantes:
+                    self._criar_notificacoes(chave, itens_relevantes)
+                    quantidade_novas = len(itens_relevantes)  # Atualiza a quantidade com os itens filtrados
+                else:
+                    quantidade_novas = 0  # Se não há itens relevantes, zera a quantidade
 
-        # Atualiza o estado
-        agora_iso = datetime.now().isoformat()
-        if chave not in atualizacoes:
-            atualizacoes[chave] = {}
-        
-        atualizacoes[chave]['ultima_verificacao'] = agora_iso
-        atualizacoes[chave]['quantidade_nao_lida'] = quantidade_novas
-        
-        # Salva as atualizações
-        self._salvar_atualizacoes(atualizacoes)
+            # Recarrega: outras verificações podem ter gravado enquanto esta esperava a rede
+            atualizacoes = self._carregar_atualizacoes()
+            agora_iso = datetime.now().isoformat()
+            if chave not in atualizacoes:
+                atualizacoes[chave] = {}
+            
+            atualizacoes[chave]['ultima_verificacao'] = agora_iso
+            atualizacoes[chave]['quantidade_nao_lida'] = quantidade_novas
+            if referencia:
+                atualizacoes[chave].update(referencia)
+            
+            # Ajusta o intervalo da fonte (falhas de rede não contam como "sem mudança")
+            if novos_itens is not None:
+                mudou = False if nao_modificado else self._itens_mudaram(atualizacoes[chave], novos_itens)
+                if mudou is not None:
+                    intervalo = registrar_resultado(atualizacoes[chave], mudou,
+                                                    minimo=self.tempo_minimo_entre_verificacoes,
+                                                    maximo=self.tempo_maximo_entre_verificacoes)
+                    logger.debug(f"{chave}: {'mudou' if mudou else 'sem mudança'}; próxima verificação em {intervalo:.0f}s")
+            
+            # Salva as atualizações
+            self._salvar_atualizacoes(atualizacoes)
         
         # Armazena no cache
         self.cache_verificacao[chave] = (time.time(), quantidade_novas)
@@ -149,85 +172,141 @@ class AtualizacoesManager:
         # Retorna a quantidade de atualizações não lidas
         return quantidade_novas
     
-    def _verificar_quantidade_atualizacoes(self, url, ultima_lida):
-        """Verifica quantas atualizações existem desde a última leitura"""
+    def _intervalo_verificacao(self, info):
+        """Intervalo atual (s) entre verificações da fonte"""
+        return intervalo_atual(info, self.tempo_minimo_entre_verificacoes, self.tempo_maximo_entre_verificacoes)
+    
+    def _itens_mudaram(self, info, novos_itens):
+        """Compara os itens com os da resposta anterior (None na primeira verificação)"""
+        # A data dos itens raspados do HTML é a hora da verificação: só título e link contam
+        chaves = sorted((item.get('titulo', ''), item.get('link', '')) for item in novos_itens)
+        assinatura = hashlib.sha1(json.dumps(chaves, ensure_ascii=False).encode('utf-8')).hexdigest()
+        anterior = info.get('assinatura_itens')
+        info['assinatura_itens'] = assinatura
+        if anterior is None:
+            return None
+        return assinatura != anterior
+    
+    def _verificar_quantidade_atualizacoes(self, url, ultima_lida, estado=None):
+        """Verifica quantas atualizações existem desde a última leitura
+
+        `estado` é a entrada da fonte em atualizacoes.json. Retorna
+        (quantidade, itens, referência do conteúdo HTML a gravar ou None).
+        A quantidade é None quando nada mudou desde a última verificação (304
+        ou mesma impressão) e os itens são None quando a verificação falha.
+        """
         logger.debug(f"Verificando quantidade de atualizações para: {url}")
         
-        novos_itens = []  # ✅ INICIALIZAR lista para novos itens
-        
         try:
-            # Timeout reduzido para evitar travamentos
-            response = requests.get(url, timeout=self.timeout)
+            if e_api_wordpress(url):
+                return self._verificar_posts_wordpress(url, ultima_lida)
+            
+            # Timeout reduzido para evitar travamentos; conexão reaproveitada do
+            # cliente compartilhado e requisição condicional se já temos
+            # ETag/Last-Modified desta URL
+            response = obter_cliente_http().get(url, timeout=self.timeout, headers=self.validadores.cabecalhos(url))
             logger.debug(f"Resposta do site ({url}): {response.status_code}")
             
+            if response.status_code == 304:
+                logger.debug(f"Sem mudanças em {url} (304); análise dispensada")
+                return None, [], None
+            
             if response.status_code == 200:
-                # Verifica se é JSON (API WordPress)
-                try:
-                    data = response.json()
-                    if isinstance(data, list):
-                        # Converte a data da última leitura para datetime se existir
-                        data_ultima_lida = None
-                        if ultima_lida:
-                            try:
-                                data_ultima_lida = datetime.fromisoformat(ultima_lida)
-                            except:
-                                pass
-                        
-                        # Conta quantos itens são mais recentes que a última leitura
-                        count = 0
-                        for item in data:
-                            if 'date' in item:
-                                try:
-                                    item_date = datetime.strptime(item['date'], "%Y-%m-%dT%H:%M:%S")
-                                    if not data_ultima_lida or item_date > data_ultima_lida:
-                                        count += 1
-                                        # ✅ ADICIONAR: Coletar informações do item para notificação
-                                        novos_itens.append({
-                                            'titulo': item.get('title', {}).get('rendered', 'Nova atualização'),
-                                            'data': item_date.isoformat(),
-                                            'link': item.get('link', url)
-                                        })
-                                except:
-                                    continue
-                        return count, novos_itens  # ✅ RETORNAR count E novos_itens
-                except:
-                    # Se não for JSON, usa scraping básico
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    
-                    # Tenta encontrar elementos de conteúdo recente
-                    # Para WordPress: posts, articles, etc.
-                    elementos_recentes = soup.select("article, .post, .entry, .news-item")
-                    
-                    # Se encontrou elementos, retorna a quantidade
-                    if elementos_recentes:
-                        for elemento in elementos_recentes:
-                            titulo_element = elemento.find(['h1', 'h2', 'h3', 'h4'])
-                            titulo = titulo_element.get_text().strip() if titulo_element else "Nova atualização"
-                            
-                            novos_itens.append({
-                                'titulo': titulo,
-                                'data': datetime.now().isoformat(),
-                                'link': url
-                            })
-                        
-                        return len(elementos_recentes), novos_itens  # ✅ RETORNAR count E novos_itens
-                    
-                    # Fallback: conta headings como indicador de conteúdo
-                    headings = soup.find_all(["h1", "h2", "h3", "h4"])
-                    for heading in headings[:5]:  # Limita a 5
-                        novos_itens.append({
-                            'titulo': heading.get_text().strip(),
-                            'data': datetime.now().isoformat(),
-                            'link': url
-                        })
-                    
-                    return min(len(headings), 5), novos_itens  # ✅ RETORNAR count E novos_itens
+                resultado = self._contar_itens_html(response.text, url, estado or {})
+                # Validadores só depois da análise: um 304 futuro pressupõe que esta resposta foi processada
+                self.validadores.registrar(url, response)
+                return resultado
                     
+        except CircuitoAberto as e:
+            # Host com falhas seguidas: nem tenta, para não segurar as outras verificações
+            logger.debug(f"Verificação de {url} pulada: {e}")
         except Exception as e:
             logger.error(f"Erro ao verificar quantidade de atualizações: {e}")
         
-        return 0, []  # ✅ RETORNAR 0 E lista vazia em caso de erro
+        return 0, None, None  # ✅ RETORNAR 0 E None em caso de erro (não é "sem mudança")
+
+    def _verificar_posts_wordpress(self, url, ultima_lida):
+        """Posts publicados desde a última leitura, filtrados pela própria API"""
+        depois = None
+        if ultima_lida:
+            try:
+                depois = datetime.fromisoformat(ultima_lida)
+            except ValueError:
+                pass
+        
+        # Validadores pela consulta realmente enviada: cada `after` é outro recurso
+        endereco = url_posts(url, depois)
+        status, response, novos_itens = buscar_posts(url, depois=depois, timeout=self.timeout,
+                                                     cabecalhos=self.validadores.cabecalhos(endereco))
+        if status == 304:
+            logger.debug(f"Sem posts novos em {url} (304)")
+            return None, [], None
+        if status != 200:
+            return 0, None, None
+        self.validadores.registrar(endereco, response)
+        # Os de consultas anteriores (outro `after`) não servem mais
+        self.validadores.remover_consultas(url, exceto=endereco)
+        return len(novos_itens), novos_itens, None
+
+    def _contar_itens_html(self, pagina, url, estado):
+        """Itens novos de uma página HTML, comparados com a versão anterior
+
+        A impressão do conteúdo principal é comparada antes de montar a
+        árvore: uma página igual à anterior não é analisada. Na primeira
+        verificação só a referência é registrada (o que já está na página não
+        é novidade); depois, só contam os títulos que não estavam nela.
+        """
+        impressao = impressao_conteudo(pagina)
+        anterior = estado.get('impressao_conteudo')
+        if impressao == anterior:
+            logger.debug(f"Conteúdo de {url} inalterado; análise dispensada")
+            return None, [], None
+        
+        itens_pagina = self._extrair_itens_html(pagina, url)
+        referencia = {
+            'impressao_conteudo': impressao,
+            'titulos_vistos': [item['titulo'] for item in itens_pagina][:MAX_TITULOS_VISTOS]
+        }
+        if anterior is None:
+            logger.debug(f"Impressão de referência registrada para {url}")
+            return 0, [], referencia
+        
+        vistos = set(estado.get('titulos_vistos', []))
+        novos_itens = [item for item in itens_pagina if item['titulo'] not in vistos]
+        return len(novos_itens), novos_itens, referencia
+
+    def _extrair_itens_html(self, pagina, url):
+        """Títulos de artigos (ou, na falta deles, dos primeiros headings) da página"""
+        # Se não for JSON, usa scraping básico
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(pagina, "html.parser")
+        itens = []
+        
+        # Tenta encontrar elementos de conteúdo recente
+        # Para WordPress: posts, articles, etc.
+        elementos_recentes = soup.select("article, .post, .entry, .news-item")
+        
+        if elementos_recentes:
+            for elemento in elementos_recentes:
+                titulo_element = elemento.find(['h1', 'h2', 'h3', 'h4'])
+                titulo = titulo_element.get_text().strip() if titulo_element else "Nova atualização"
+                
+                itens.append({
+                    'titulo': titulo,
+                    'data': datetime.now().isoformat(),
+                    'link': url
+                })
+            return itens
+        
+        # Fallback: headings como indicador de conteúdo
+        headings = soup.find_all(["h1", "h2", "h3", "h4"])
+        for heading in headings[:5]:  # Limita a 5
+            itens.append({
+                'titulo': heading.get_text().strip(),
+                'data': datetime.now().isoformat(),
+                'link': url
+            })
+        return itens
 
     def _filtrar_atualizacoes_relevantes(self, chave, novos_itens):
         """Filtra apenas atualizações realmente relevantes"""
@@ -309,7 +388,8 @@ class AtualizacoesManager:
                         mensagem,
                         {
                             "url": item.get('link', ''),
-                            "tipo": "atualizacao_site"
+                            "tipo": "atualizacao_site",
+                            "nome_recurso": nome_recurso
                         }
                     )
                     
@@ -326,23 +406,24 @@ class AtualizacoesManager:
         if chave in self.cache_verificacao:
             del self.cache_verificacao[chave]
         
-        # ✅ CORREÇÃO: Marcar notificações como lidas também
-        if hasattr(self, 'notificacoes_manager') and self.notificacoes_manager:
-            self.notificacoes_manager.marcar_como_lida(chave)
+        with self._estado_lock:
+            # ✅ CORREÇÃO: Marcar notificações como lidas também
+            if hasattr(self, 'notificacoes_manager') and self.notificacoes_manager:
+                self.notificacoes_manager.marcar_como_lida(chave)
         
-        # Carrega o estado atual das atualizações
-        atualizacoes = self._carregar_atualizacoes()
+            # Carrega o estado atual das atualizações
+            atualizacoes = self._carregar_atualizacoes()
         
-        # Atualiza a última data lida e zera a quantidade não lida
-        agora = datetime.now().isoformat()
-        if chave not in atualizacoes:
-            atualizacoes[chave] = {}
+            # Atualiza a última data lida e zera a quantidade não lida
+            agora = datetime.now().isoformat()
+            if chave not in atualizacoes:
+                atualizacoes[chave] = {}
         
-        atualizacoes[chave]['ultima_lida'] = agora
-        atualizacoes[chave]['quantidade_nao_lida'] = 0
+            atualizacoes[chave]['ultima_lida'] = agora
+            atualizacoes[chave]['quantidade_nao_lida'] = 0
         
-        # Salva as atualizações
-        self._salvar_atualizacoes(atualizacoes)
+            # Salva as atualizações
+            self._salvar_atualizacoes(atualizacoes)
         
         return True
     
@@ -0,0 +1,267 @@
+# utils/aulas_journal.py
+import json
+import os
+import logging
+import tempfile
+import threading
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Tamanho do journal (em bytes) a partir do qual ele é compactado no snapshot
+LIMITE_JOURNAL_PADRAO = 512 * 1024
+
+
+class AulasJournal:
+    """
+    Armazena as aulas como snapshot (aulas.json) + journal append-only.
+
+    Cada mutação grava uma única linha JSON no journal ("aulas.json.journal"),
+    então o custo de escrita não depende do número de aulas. Quando o journal
+    passa de `limite_journal` bytes, ele é compactado no snapshot em uma thread
+    separada. O snapshot só é substituído via os.replace, portanto uma queda no
+    meio da escrita nunca corrompe o aulas.json.
+    """
+
+    def __init__(self, aulas_file, limite_journal=LIMITE_JOURNAL_PADRAO):
+        self.aulas_file = aulas_file
+        self.journal_file = aulas_file + ".journal"
+        # Journal "congelado" enquanto a compactação em segundo plano escreve o snapshot
+        self.journal_compactando = self.journal_file + ".compactando"
+        self.limite_journal = limite_journal
+
+        self._lock = threading.RLock()
+        self._compactacao_thread = None
+        # id -> aula, em ordem de criação (a mais recente por último)
+        self.aulas = {}
+        self._maior_id = 0
+
+        self.carregar()
+
+    # ------------------------------------------------------------------
+    # Leitura / replay
+    # ------------------------------------------------------------------
+    def carregar(self):
+        """Reconstrói o estado em memória a partir do snapshot + journal"""
+        with self._lock:
+            self.aulas = {}
+            self._maior_id = 0
+
+            # Snapshot: lista com a aula mais recente primeiro
+            for aula in reversed(self._ler_snapshot()):
+                if isinstance(aula, dict) and "id" in aula:
+                    self._aplicar({"op": "gravar", "aula": aula})
+
+            # Journal de uma compactação interrompida + journal atual
+            for caminho in (self.journal_compactando, self.journal_file):
+                for operacao in self._ler_journal(caminho):
+                    self._aplicar(operacao)
+
+            # Uma compactação anterior não terminou: conclui agora, de forma síncrona
+            if os.path.exists(self.journal_compactando) and not self._compactando():
+                logger.warning("Compactação interrompida do journal de aulas encontrada. Concluindo.")
+                self._escrever_snapshot(self._listar_referencias())
+                self._remover_arquivo(self.journal_compactando)
+                self._truncar_journal()
+
+            logger.debug(f"Journal de aulas carregado: {len(self.aulas)} aulas")
+
+    def _ler_snapshot(self):
+        try:
+            with open(self.aulas_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Garante que é um dicionário com chave "aulas"
+            if isinstance(data, dict) and "aulas" in data:
+                return data["aulas"]
+            # Se for uma lista direta, converte para o formato correto
+            elif isinstance(data, list):
+                return data
+            return []
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _ler_journal(self, caminho):
+        """Lê as operações de um journal, reparando uma última linha truncada"""
+        if not os.path.exists(caminho):
+            return []
+
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+
+        # Uma queda no meio do append deixa uma linha sem '\n' no final.
+        # Ela é descartada (e o arquivo truncado) para que o próximo append
+        # não seja concatenado a um registro pela metade.
+        if conteudo and not conteudo.endswith(b"\n"):
+            fim_valido = conteudo.rfind(b"\n") + 1
+            logger.warning(f"Descartando registro incompleto no journal: {caminho}")
+            with open(caminho, "r+b") as f:
+                f.truncate(fim_valido)
+            conteudo = conteudo[:fim_valido]
+
+        operacoes = []
+        for numero, linha in enumerate(conteudo.splitlines(), start=1):
+            if not linha.strip():
+                continue
+            try:
+                operacoes.append(json.loads(linha.decode("utf-8")))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                logger.warning(f"Linha {numero} inválida ignorada no journal: {caminho}")
+        return operacoes
+
+    def _aplicar(self, operacao):
+        """Aplica uma operação ao estado em memória (idempotente)"""
+        tipo = operacao.get("op")
+        if tipo == "gravar":
+            aula = operacao["aula"]
+            self.aulas[aula["id"]] = aula
+            try:
+                self._maior_id = max(self._maior_id, int(aula["id"]))
+            except (TypeError, ValueError):
+                pass
+        elif tipo == "excluir":
+            self.aulas.pop(operacao.get("id"), None)
+        else:
+            logger.warning(f"Operação desconhecida no journal: {tipo}")
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def _listar_referencias(self):
+        """Lista as aulas (mais recente primeiro) sem copiar os dicionários"""
+        return list(reversed(list(self.aulas.values())))
+
+    def listar(self):
+        """Retorna as aulas, da mais recente para a mais antiga"""
+        with self._lock:
+            return self._listar_referencias()
+
+    def obter(self, aula_id):
+        """Retorna a aula com o ID informado ou None"""
+        with self._lock:
+            return self.aulas.get(aula_id)
+
+    def proximo_id(self):
+        """Próximo ID inteiro livre"""
+        with self._lock:
+            return self._maior_id + 1
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+    def gravar(self, aula):
+        """Insere ou substitui uma aula inteira"""
+        self._registrar({"op": "gravar", "aula": aula})
+
+    def excluir(self, aula_id):
+        """Remove uma aula"""
+        self._registrar({"op": "excluir", "id": aula_id})
+
+    def substituir(self, aulas):
+        """Substitui todas as aulas de uma vez (reescreve o snapshot)"""
+        self._aguardar_compactacao()
+        with self._lock:
+            self.aulas = {}
+            self._maior_id = 0
+            for aula in reversed(aulas):
+                self._aplicar({"op": "gravar", "aula": aula})
+            self._escrever_snapshot(self._listar_referencias())
+            self._remover_arquivo(self.journal_compactando)
+            self._truncar_journal()
+
+    def _registrar(self, operacao):
+        linha = json.dumps(operacao, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            # Primeiro o disco, depois a memória: se o append falhar, o estado não muda
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+            self._aplicar(json.loads(linha))
+
+            if os.path.getsize(self.journal_file) >= self.limite_journal:
+                self.compactar()
+
+    # ------------------------------------------------------------------
+    # Compactação
+    # ------------------------------------------------------------------
+    def compactar(self, aguardar=False):
+        """Grava o estado atual no snapshot e descarta o journal já aplicado"""
+        with self._lock:
+            if self._compactando():
+                thread = self._compactacao_thread
+            else:
+                # Congela o journal atual; novas escritas vão para um journal vazio
+                if os.path.exists(self.journal_file):
+                    if os.path.exists(self.journal_compactando):
+                        # Sobra de uma compactação que falhou: junta os dois
+                        with open(self.journal_file, "rb") as origem, open(self.journal_compactando, "ab") as destino:
+                            destino.write(origem.read())
+                        self._remover_arquivo(self.journal_file)
+                    else:
+                        os.replace(self.journal_file, self.journal_compactando)
+
+                aulas = self._listar_referencias()
+                thread = threading.Thread(target=self._executar_compactacao, args=(aulas,), daemon=True)
+                self._compactacao_thread = thread
+                thread.start()
+
+        if aguardar:
+            thread.join()
+
+    def _executar_compactacao(self, aulas):
+        try:
+            # A serialização (parte cara) roda fora do lock...
+            caminho_temp = self._preparar_snapshot(aulas)
+            # ...mas a troca dos arquivos não, para que um replay concorrente
+            # nunca veja o snapshot antigo sem o journal congelado
+            with self._lock:
+                os.replace(caminho_temp, self.aulas_file)
+                self._remover_arquivo(self.journal_compactando)
+                self._apos_compactacao()
+            logger.info(f"Journal de aulas compactado ({len(aulas)} aulas)")
+        except Exception as e:
+            # O journal congelado continua no disco e será reaplicado
+            logger.error(f"Erro ao compactar journal de aulas: {e}", exc_info=True)
+
+    def _apos_compactacao(self):
+        """Chamado com o lock adquirido logo após a troca do snapshot"""
+        pass
+
+    def _compactando(self):
+        """Indica se há uma compactação em segundo plano em andamento"""
+        return self._compactacao_thread is not None and self._compactacao_thread.is_alive()
+
+    def _aguardar_compactacao(self):
+        thread = self._compactacao_thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join()
+
+    def _escrever_snapshot(self, aulas):
+        """Escreve o snapshot de forma atômica (arquivo temporário + os.replace)"""
+        os.replace(self._preparar_snapshot(aulas), self.aulas_file)
+
+    def _preparar_snapshot(self, aulas):
+        """Serializa as aulas em um arquivo temporário no mesmo diretório"""
+        diretorio = os.path.dirname(os.path.abspath(self.aulas_file))
+        fd, caminho_temp = tempfile.mkstemp(dir=diretorio, prefix=".aulas_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"aulas": aulas}, f, default=str, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            self._remover_arquivo(caminho_temp)
+            raise
+        return caminho_temp
+
+    def _truncar_journal(self):
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+
+    @staticmethod
+    def _remover_arquivo(caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
@@ -1,19 +1,24 @@
 # utils/aulas_manager.py
-import json
+import copy
 import os
 import uuid
 import shutil
-import tempfile
 from datetime import datetime
 import logging
-import time
+
+from utils.catalogo_aulas import obter_catalogo
+from utils.blob_store import obter_blob_store, calcular_sha256
 
 # Configurar logging
 logger = logging.getLogger('degeo_app')
 
+# Quantidade padrão de aulas por página nas telas de listagem
+TAMANHO_PAGINA_PADRAO = 20
+
 class AulasManager:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", tamanho_pagina=TAMANHO_PAGINA_PADRAO):
         self.data_dir = data_dir
+        self.tamanho_pagina = tamanho_pagina
         self.aulas_file = os.path.join(data_dir, "aulas.json")
         self.arquivos_dir = os.path.join(data_dir, "arquivos")
         
@@ -25,25 +30,18 @@ class AulasManager:
         if not os.path.exists(self.arquivos_dir):
             os.makedirs(self.arquivos_dir)
         
+        # Catálogo em memória (snapshot + journal) com índices, compartilhado no processo
+        self.catalogo = obter_catalogo(self.aulas_file)
+        # Anexos deduplicados por SHA-256 (data/blobs), com contagem de referências
+        self.blobs = obter_blob_store(data_dir)
+        
         # Inicializa arquivo de aulas se não existir
         if not os.path.exists(self.aulas_file):
-            self._salvar_aulas([])
+            self.catalogo.compactar(aguardar=True)
     
     def _carregar_aulas(self):
-        try:
-            with open(self.aulas_file, "r") as f:
-                data = json.load(f)
-                # Garante que é um dicionário com chave "aulas"
-                if isinstance(data, dict) and "aulas" in data:
-                    return data["aulas"]
-                # Se for uma lista direta, converte para o formato correto
-                elif isinstance(data, list):
-                    return data
-                # Se for outro formato, retorna lista vazia
-                else:
-                    return []
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+        """Retorna uma cópia das aulas (mais recente primeiro)"""
+        return copy.deepcopy(self.catalogo.listar())
     
     def _salvar_aulas(self, aulas):
         """Salva as aulas no arquivo, garantindo o formato correto."""
@@ -60,49 +58,34 @@ class AulasManager:
             # Já é uma lista, usa diretamente
             aulas_para_salvar = aulas
 
-        dados_para_salvar = {"aulas": aulas_para_salvar}
-
-        with open(self.aulas_file, "w") as f:
-            # Salva no formato correto com chave "aulas"
-            json.dump(dados_para_salvar, f, default=str, indent=2)
+        # Reescreve o snapshot de forma atômica e descarta o journal
+        self.catalogo.substituir(aulas_para_salvar)
     
-    def criar_aula(self, titulo, disciplina, observacoes="", arquivos=None, links=None, professor=""):
-        """Cria uma nova aula"""
+    def criar_aula(self, titulo, disciplina, observacoes="", arquivos=None, links=None, professor="", anexos=None):
+        """Cria uma nova aula
+        
+        `anexos` são arquivos já copiados para o blob store (ex.: por
+        IngestaoAnexos), no formato {"nome", "caminho"}; a referência deles
+        passa para a aula.
+        """
         if not titulo:
+            self._liberar_anexos(anexos)
             return False, "Título é obrigatório"
         
-        aulas = self._carregar_aulas()
-        
         # ✅ CORREÇÃO: Garantir que o ID seja um inteiro
-        aula_id = 1
-        if aulas:
-            # Converte os IDs para int antes de calcular o max
-            try:
-                aula_id = max(int(aula["id"]) for aula in aulas if "id" in aula and isinstance(aula["id"], (int, str)) and str(aula["id"]).isdigit()) + 1
-            except ValueError:
-                # Se houver algum problema na conversão, usa 1 como fallback
-                aula_id = 1
-                logger.warning("Erro ao calcular o próximo ID de aula. Usando ID 1.")
-        
-        # Cria diretório para a aula
-        aula_dir = os.path.join(self.arquivos_dir, str(aula_id))
-        os.makedirs(aula_dir, exist_ok=True)
+        # O catálogo mantém o maior ID já usado, sem percorrer todas as aulas
+        aula_id = self.catalogo.proximo_id()
         
-        # Processa arquivos (CORREÇÃO: indentação corrigida aqui)
-        arquivos_info = []
+        # Processa arquivos: cada conteúdo é guardado uma única vez no blob store
+        arquivos_info = [dict(anexo) for anexo in anexos or []]
         if arquivos:
             for arquivo in arquivos:
                 # Verifica se o arquivo existe
                 if os.path.exists(arquivo):
-                    nome_arquivo = os.path.basename(arquivo)
-                    destino = os.path.join(aula_dir, nome_arquivo)
-
-                    # Copia o arquivo para o diretório da aula
-                    shutil.copy2(arquivo, destino)
-
+                    digest = self.blobs.adicionar(arquivo)
                     arquivos_info.append({
-                        "nome": nome_arquivo,
-                        "caminho": os.path.join("arquivos", str(aula_id), nome_arquivo)
+                        "nome": os.path.basename(arquivo),
+                        "caminho": self.blobs.caminho_relativo(digest)
                     })
                 else:
                     logger.warning(f"Arquivo não encontrado: {arquivo}")
@@ -127,8 +110,8 @@ class AulasManager:
             "professor": professor
         }
         
-        aulas.insert(0, nova_aula)  # Insere no início (mais recente primeiro)
-        self._salvar_aulas(aulas)
+        # Uma linha no journal; a aula entra como a mais recente
+        self.catalogo.gravar(nova_aula)
         
         return True, nova_aula
     
@@ -136,73 +119,106 @@ class AulasManager:
         """Obtém todas as aulas"""
         return self._carregar_aulas()
     
-    def atualizar_aula(self, aula_id, titulo, disciplina, observacoes="", arquivos=None, links=None, professor=""):
-            """Atualiza uma aula existente"""
+    def obter_aula(self, aula_id):
+        """Obtém uma aula pelo ID (ou None)"""
+        return copy.deepcopy(self.catalogo.obter(aula_id))
+    
+    def obter_aulas_por_professor(self, professor):
+        """Obtém as aulas de um professor (mais recente primeiro)"""
+        return copy.deepcopy(self.catalogo.obter_por_professor(professor))
+    
+    def obter_aulas_paginadas(self, professor=None, cursor=None, tamanho_pagina=None):
+        """Obtém uma página de aulas (mais recente primeiro)
+        
+        Retorna (aulas, proximo_cursor). Passe o cursor recebido para obter a
+        página seguinte; ele é None quando não há mais aulas.
+        """
+        aulas, proximo_cursor = self.catalogo.obter_pagina(
+            professor=professor,
+            cursor=cursor,
+            limite=tamanho_pagina or self.tamanho_pagina
+        )
+        return copy.deepcopy(aulas), proximo_cursor
+    
+    def obter_aulas_por_disciplina(self, disciplina):
+        """Obtém as aulas de uma disciplina (mais recente primeiro)"""
+        return copy.deepcopy(self.catalogo.obter_por_disciplina(disciplina))
+    
+    def buscar_aulas(self, texto, limite=20, destaque=("[b]", "[/b]")):
+        """Busca textual nas aulas (mais relevante primeiro)
+        
+        Cada resultado traz id, titulo, disciplina, professor, data_criacao,
+        o `trecho` com os termos entre os marcadores de `destaque` e a
+        `relevancia`; o id é o mesmo de obter_aula.
+        """
+        return [
+            {
+                "id": aula["id"],
+                "titulo": aula.get("titulo", ""),
+                "disciplina": aula.get("disciplina", ""),
+                "professor": aula.get("professor", ""),
+                "data_criacao": aula.get("data_criacao"),
+                "trecho": trecho,
+                "relevancia": relevancia
+            } for relevancia, aula, trecho in self.catalogo.buscar(texto, limite=limite, destaque=destaque)
+        ]
+    
+    def atualizar_aula(self, aula_id, titulo, disciplina, observacoes="", arquivos=None, links=None, professor="", anexos=None):
+            """Atualiza uma aula existente (`anexos`: ver criar_aula)"""
             if not titulo:
+                self._liberar_anexos(anexos)
                 return False, "Título é obrigatório"
 
-            aulas = self._carregar_aulas()
-            aula_idx = next((i for i, aula in enumerate(aulas) if aula["id"] == aula_id), None)
+            aula_atual = self.catalogo.obter(aula_id)
 
-            if aula_idx is None:
+            if aula_atual is None:
+                self._liberar_anexos(anexos)
                 return False, "Aula não encontrada"
 
             # Processa novos arquivos
-            arquivos_info = aulas[aula_idx]["arquivos"] # Mantém os arquivos existentes
-            if arquivos:
-                aula_dir = os.path.join(self.arquivos_dir, str(aula_id))
-                os.makedirs(aula_dir, exist_ok=True)
-
-                for arquivo in arquivos:
-                    # Verifica se o arquivo existe
-                    if os.path.exists(arquivo):
-                        nome_arquivo = os.path.basename(arquivo)
-                        destino_original = os.path.join(aula_dir, nome_arquivo)
-                        # Cria um nome temporário para a cópia
-                        destino_temp = destino_original + f".tmp_{int(time.time() * 1000)}"
+            arquivos_info = list(aula_atual.get("arquivos", [])) # Mantém os arquivos existentes
+            blobs_substituidos = []
+            # (nome, sha256, arquivo de origem) de cada anexo novo; origem None = já está no store
+            novos = [(anexo["nome"], self.blobs.digest_de(anexo["caminho"]), None) for anexo in anexos or []]
+            for arquivo in arquivos or []:
+                # Verifica se o arquivo existe
+                if not os.path.exists(arquivo):
+                    logger.warning(f"Arquivo não encontrado para atualização: {arquivo}")
+                    continue
 
-                        try:
-                            # 1. Copia para o nome temporário
-                            logger.debug(f"Tentando copiar '{arquivo}' para '{destino_temp}'")
-                            shutil.copy2(arquivo, destino_temp)
-                            logger.debug(f"Cópia temporária bem-sucedida para '{destino_temp}'")
+                nome_arquivo = os.path.basename(arquivo)
+                try:
+                    novos.append((nome_arquivo, calcular_sha256(arquivo), arquivo))
+                except PermissionError as e:
+                    logger.error(f"Permissão negada ao ler o arquivo '{nome_arquivo}': {e}")
+                    self._liberar_anexos(anexos)
+                    return False, f"Erro de permissão ao atualizar o arquivo '{nome_arquivo}'. Verifique se ele está aberto em outro programa."
+                except Exception as e:
+                    logger.error(f"Erro ao ler o arquivo '{nome_arquivo}': {e}", exc_info=True)
+                    self._liberar_anexos(anexos)
+                    return False, f"Erro ao atualizar o arquivo '{nome_arquivo}': {str(e)}"
 
-                            # 2. Substitui o arquivo original pelo temporário (operação atômica em muitos sistemas)
-                            # os.replace é preferido em sistemas modernos por ser mais atômico
-                            logger.debug(f"Tentando substituir '{destino_original}' por '{destino_temp}'")
-                            os.replace(destino_temp, destino_original)
-                            logger.debug(f"Substituição bem-sucedida de '{destino_original}'")
+            for nome_arquivo, digest, origem in novos:
+                # Mesmo conteúdo já anexado (ex.: arquivo existente reenviado na edição)
+                if any(self.blobs.digest_de(a.get("caminho")) == digest for a in arquivos_info):
+                    logger.debug(f"Arquivo '{nome_arquivo}' já anexado à aula {aula_id}; ignorado")
+                    if origem is None:
+                        self.blobs.liberar(digest)
+                    continue
 
-                            # Adiciona o arquivo à lista de informações da aula
-                            caminho_relativo = os.path.relpath(destino_original, self.data_dir)
-                            arquivos_info.append({
-                                "nome": nome_arquivo,
-                                "caminho": caminho_relativo
-                            })
-                            logger.info(f"Arquivo '{nome_arquivo}' atualizado com sucesso.")
+                if origem is not None:
+                    self.blobs.adicionar(origem, digest=digest)
+                novo_arquivo = {"nome": nome_arquivo, "caminho": self.blobs.caminho_relativo(digest)}
 
-                        except PermissionError as e:
-                            # Se falhar, tenta remover o temp e reporta o erro
-                            logger.error(f"Permissão negada ao atualizar o arquivo '{nome_arquivo}': {e}")
-                            try:
-                                if os.path.exists(destino_temp):
-                                    os.remove(destino_temp)
-                                    logger.debug(f"Arquivo temporário '{destino_temp}' removido após falha.")
-                            except OSError:
-                                pass # Ignora erro ao remover temp
-                            return False, f"Erro de permissão ao atualizar o arquivo '{nome_arquivo}'. Verifique se ele está aberto em outro programa."
-                        except Exception as e:
-                            # Se falhar por outro motivo, tenta remover o temp e reporta o erro
-                            logger.error(f"Erro ao atualizar o arquivo '{nome_arquivo}': {e}", exc_info=True)
-                            try:
-                                if os.path.exists(destino_temp):
-                                    os.remove(destino_temp)
-                                    logger.debug(f"Arquivo temporário '{destino_temp}' removido após falha.")
-                            except OSError:
-                                pass # Ignora erro ao remover temp
-                            return False, f"Erro ao atualizar o arquivo '{nome_arquivo}': {str(e)}"
-                    else:
-                        logger.warning(f"Arquivo não encontrado para atualização: {arquivo}")
+                # Mesmo nome com conteúdo novo substitui o anexo anterior
+                for indice, existente in enumerate(arquivos_info):
+                    if existente.get("nome") == nome_arquivo:
+                        blobs_substituidos.append(self.blobs.digest_de(existente.get("caminho")))
+                        arquivos_info[indice] = novo_arquivo
+                        break
+                else:
+                    arquivos_info.append(novo_arquivo)
+                logger.info(f"Arquivo '{nome_arquivo}' atualizado com sucesso.")
 
             # Processa links (substitui completamente os links existentes, como no código original)
             # Se você quiser adicionar ao invés de substituir, precisa modificar esta lógica.
@@ -211,10 +227,11 @@ class AulasManager:
                 links_info = links
             else:
                 # Se links for None, mantém os links existentes
-                links_info = aulas[aula_idx]["links"]
+                links_info = aula_atual.get("links", [])
 
-            # Atualiza aula
-            aulas[aula_idx].update({
+            # Atualiza aula (novo dicionário; o estado do journal não é alterado no lugar)
+            aula_atualizada = copy.deepcopy(aula_atual)
+            aula_atualizada.update({
                 "titulo": titulo,
                 "disciplina": disciplina,
                 "observacoes": observacoes,
@@ -223,27 +240,36 @@ class AulasManager:
                 "professor": professor
             })
 
-            self._salvar_aulas(aulas)
+            self.catalogo.gravar(aula_atualizada)
+            # Só depois de gravar a aula os blobs substituídos perdem a referência
+            for digest in blobs_substituidos:
+                self.blobs.liberar(digest)
             logger.info(f"Aula ID {aula_id} atualizada com sucesso.")
-            return True, aulas[aula_idx]
+            return True, aula_atualizada
 
     
+    def _liberar_anexos(self, anexos):
+        """Devolve as referências de anexos pré-copiados que não serão usados"""
+        for anexo in anexos or []:
+            self.blobs.liberar(self.blobs.digest_de(anexo.get("caminho")))
+    
     def excluir_aula(self, aula_id):
         """Exclui uma aula"""
-        aulas = self._carregar_aulas()
-        aula_idx = next((i for i, aula in enumerate(aulas) if aula["id"] == aula_id), None)
-        
-        if aula_idx is None:
+        aula = self.catalogo.obter(aula_id)
+        if aula is None:
             return False, "Aula não encontrada"
         
-        # Remove diretório da aula
+        # Remove diretório da aula (layout antigo, anterior ao blob store)
         aula_dir = os.path.join(self.arquivos_dir, str(aula_id))
         if os.path.exists(aula_dir):
             shutil.rmtree(aula_dir)
         
-        # Remove aula da lista
-        aulas.pop(aula_idx)
-        self._salvar_aulas(aulas)
+        # Remove aula (uma linha no journal)
+        self.catalogo.excluir(aula_id)
+        
+        # Libera os anexos; blobs sem outras referências são apagados
+        for arquivo in aula.get("arquivos", []):
+            self.blobs.liberar(self.blobs.digest_de(arquivo.get("caminho")))
         
         return True, "Aula excluída com sucesso"
     
@@ -251,28 +277,27 @@ class AulasManager:
     def adicionar_comentario(self, aula_id, nome_aluno, comentario):
         """Adiciona um comentário a uma aula"""
         try:
-            # Carrega as aulas existentes
-            aulas = self._carregar_aulas()
-            
             # Encontra a aula
-            aula_idx = next((i for i, aula in enumerate(aulas) if aula["id"] == aula_id), None)
+            aula_atual = self.catalogo.obter(aula_id)
             
-            if aula_idx is None:
+            if aula_atual is None:
                 return False, "Aula não encontrada"
             
+            aula_atualizada = copy.deepcopy(aula_atual)
+            
             # Garante que comentarios seja uma lista
-            if "comentarios" not in aulas[aula_idx] or not isinstance(aulas[aula_idx]["comentarios"], list):
-                aulas[aula_idx]["comentarios"] = []
+            if not isinstance(aula_atualizada.get("comentarios"), list):
+                aula_atualizada["comentarios"] = []
             
             # Adiciona o comentário
-            aulas[aula_idx]["comentarios"].append({
+            aula_atualizada["comentarios"].append({
                 "nome_aluno": nome_aluno,
                 "comentario": comentario,
                 "data": datetime.now().isoformat()
             })
             
-            # Salva as aulas
-            self._salvar_aulas(aulas)
+            # Salva apenas a aula alterada no journal
+            self.catalogo.gravar(aula_atualizada)
             
             return True, "Comentário adicionado com sucesso"
         except Exception as e:
@@ -0,0 +1,237 @@
+# utils/blob_store.py
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Leitura em blocos para calcular o hash sem carregar o arquivo inteiro
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def calcular_sha256(caminho):
+    """SHA-256 (hex) do conteúdo de um arquivo"""
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+class IngestaoCancelada(Exception):
+    """A cópia de um anexo foi cancelada pelo usuário"""
+
+
+class ArquivoMuitoGrande(Exception):
+    """O anexo ultrapassou o tamanho máximo permitido"""
+
+
+class BlobStore:
+    """
+    Armazenamento de anexos endereçado por conteúdo.
+
+    Cada conteúdo distinto é gravado uma única vez em
+    <data_dir>/blobs/<2 primeiros hex>/<sha256><extensão>, e o índice
+    (blobs/indice.json) guarda quantas referências (arquivos de aulas)
+    apontam para ele. Um upload idêntico só incrementa o contador; o blob
+    é apagado quando a última referência é liberada.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.blobs_dir = os.path.join(data_dir, "blobs")
+        self.indice_file = os.path.join(self.blobs_dir, "indice.json")
+        self._lock = threading.RLock()
+        os.makedirs(self.blobs_dir, exist_ok=True)
+        # sha256 -> {"refs": int, "extensao": ".png"}
+        self.indice = self._carregar_indice()
+
+    def _carregar_indice(self):
+        if not os.path.exists(self.indice_file):
+            return {}
+        try:
+            with open(self.indice_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Índice de blobs ilegível ({e}); iniciando vazio")
+            return {}
+
+    def _salvar_indice(self):
+        """Grava o índice de forma atômica (arquivo temporário + os.replace)"""
+        fd, temporario = tempfile.mkstemp(dir=self.blobs_dir, prefix=".indice.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.indice, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.indice_file)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    # ------------------------------------------------------------------
+    # Caminhos
+    # ------------------------------------------------------------------
+    def caminho_relativo(self, digest):
+        """Caminho do blob relativo a data_dir (o formato gravado nas aulas)"""
+        extensao = self.indice.get(digest, {}).get("extensao", "")
+        # Sempre com "/", para o mesmo caminho valer no Windows e no Android/Linux
+        return "/".join(("blobs", digest[:2], digest + extensao))
+
+    def caminho_absoluto(self, digest):
+        return os.path.join(self.data_dir, self.caminho_relativo(digest))
+
+    @staticmethod
+    def digest_de(caminho_relativo):
+        """SHA-256 de um caminho de blob ("blobs/ab/<sha256>.ext"), ou None se for um caminho antigo"""
+        partes = (caminho_relativo or "").replace("\\", "/").split("/")
+        if len(partes) != 3 or partes[0] != "blobs":
+            return None
+        digest = os.path.splitext(partes[2])[0]
+        if len(digest) != 64 or not digest.startswith(partes[1]):
+            return None
+        return digest
+
+    # ------------------------------------------------------------------
+    # Referências
+    # ------------------------------------------------------------------
+    def adicionar(self, caminho_origem, digest=None):
+        """Guarda o conteúdo do arquivo (se ainda não existir) e soma uma referência
+
+        Retorna o sha256. Se o conteúdo já estiver no store, nada é copiado.
+        """
+        if digest is None:
+            digest = calcular_sha256(caminho_origem)
+
+        with self._lock:
+            entrada = self.indice.get(digest)
+            if entrada is None or not os.path.exists(self.caminho_absoluto(digest)):
+                extensao = os.path.splitext(caminho_origem)[1].lower()
+                entrada = {"refs": entrada["refs"] if entrada else 0, "extensao": extensao}
+                self.indice[digest] = entrada
+                self._copiar(caminho_origem, self.caminho_absoluto(digest))
+            else:
+                logger.debug(f"Blob {digest[:12]} já existe; nenhuma cópia necessária")
+
+            entrada["refs"] += 1
+            self._salvar_indice()
+        return digest
+
+    def ingerir(self, caminho_origem, ao_progredir=None, cancelado=None, tamanho_maximo=None):
+        """Copia o arquivo em blocos calculando o SHA-256 na mesma leitura
+
+        `ao_progredir(bytes_lidos)` é chamado a cada bloco; `cancelado()`
+        interrompe a cópia (IngestaoCancelada) e `tamanho_maximo` a aborta
+        assim que for ultrapassado (ArquivoMuitoGrande), mesmo que o arquivo
+        cresça durante a leitura. Se o conteúdo já estiver no store, a cópia
+        temporária é descartada e só a referência é somada. Retorna o sha256.
+        """
+        # Arquivo que já é um blob deste store (ex.: anexo existente na edição)
+        digest = self._digest_interno(caminho_origem)
+        if digest:
+            with self._lock:
+                self.indice[digest]["refs"] += 1
+                self._salvar_indice()
+            if ao_progredir:
+                ao_progredir(os.path.getsize(caminho_origem))
+            return digest
+
+        fd, temporario = tempfile.mkstemp(dir=self.blobs_dir, suffix=".tmp")
+        try:
+            resumo = hashlib.sha256()
+            lidos = 0
+            with os.fdopen(fd, "wb") as saida, open(caminho_origem, "rb") as entrada:
+                for bloco in iter(lambda: entrada.read(TAMANHO_BLOCO), b""):
+                    if cancelado and cancelado():
+                        raise IngestaoCancelada(caminho_origem)
+                    lidos += len(bloco)
+                    if tamanho_maximo is not None and lidos > tamanho_maximo:
+                        raise ArquivoMuitoGrande(caminho_origem)
+                    resumo.update(bloco)
+                    saida.write(bloco)
+                    if ao_progredir:
+                        ao_progredir(lidos)
+            digest = resumo.hexdigest()
+
+            with self._lock:
+                entrada = self.indice.get(digest)
+                if entrada is None or not os.path.exists(self.caminho_absoluto(digest)):
+                    extensao = os.path.splitext(caminho_origem)[1].lower()
+                    entrada = {"refs": entrada["refs"] if entrada else 0, "extensao": extensao}
+                    self.indice[digest] = entrada
+                    destino = self.caminho_absoluto(digest)
+                    os.makedirs(os.path.dirname(destino), exist_ok=True)
+                    os.replace(temporario, destino)
+                else:
+                    logger.debug(f"Blob {digest[:12]} já existe; cópia temporária descartada")
+                entrada["refs"] += 1
+                self._salvar_indice()
+            return digest
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def _digest_interno(self, caminho):
+        """sha256 se o caminho for um blob existente deste store, senão None"""
+        try:
+            relativo = os.path.relpath(os.path.abspath(caminho), os.path.abspath(self.data_dir))
+        except ValueError:
+            # Outra unidade no Windows
+            return None
+        digest = self.digest_de(relativo)
+        if digest and digest in self.indice and os.path.exists(self.caminho_absoluto(digest)):
+            return digest
+        return None
+
+    def liberar(self, digest):
+        """Remove uma referência; o blob é apagado quando não resta nenhuma"""
+        if not digest:
+            return
+        with self._lock:
+            entrada = self.indice.get(digest)
+            if entrada is None:
+                return
+            entrada["refs"] -= 1
+            if entrada["refs"] <= 0:
+                caminho = self.caminho_absoluto(digest)
+                del self.indice[digest]
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                logger.debug(f"Blob {digest[:12]} removido (sem referências)")
+            self._salvar_indice()
+
+    def _copiar(self, origem, destino):
+        """Copia para um temporário no mesmo diretório e renomeia (blob nunca fica pela metade)"""
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as saida, open(origem, "rb") as entrada:
+                for bloco in iter(lambda: entrada.read(TAMANHO_BLOCO), b""):
+                    saida.write(bloco)
+            os.replace(temporario, destino)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+
+# Um store por diretório de dados no processo (AulasManager e AulaRepository
+# são instanciados por tela, mas os contadores precisam ser os mesmos)
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def obter_blob_store(data_dir):
+    """Retorna o BlobStore compartilhado para o diretório de dados informado"""
+    chave = os.path.abspath(data_dir)
+    with _stores_lock:
+        if chave not in _stores:
+            _stores[chave] = BlobStore(chave)
+        return _stores[chave]
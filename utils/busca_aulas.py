@@ -0,0 +1,86 @@
+# utils/busca_aulas.py
+import re
+import unicodedata
+
+# Campos indexados de cada aula e o peso de um termo encontrado em cada um
+CAMPOS_BUSCA = ("titulo", "disciplina", "observacoes", "comentarios")
+PESOS_BUSCA = {"titulo": 10.0, "disciplina": 5.0, "observacoes": 2.0, "comentarios": 1.0}
+
+# Palavras exibidas no trecho de cada resultado
+PALAVRAS_NO_TRECHO = 12
+
+_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos ("Geológica" -> "geologica")"""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def termos_da_consulta(texto):
+    """Palavras digitadas, normalizadas e sem repetição"""
+    return list(dict.fromkeys(normalizar(p) for p in _PALAVRA.findall(texto or "")))
+
+
+def textos_da_aula(aula):
+    """Texto de cada campo indexado da aula (comentários concatenados)"""
+    comentarios = aula.get("comentarios")
+    if not isinstance(comentarios, list):
+        comentarios = []
+    return {
+        "titulo": str(aula.get("titulo") or ""),
+        "disciplina": str(aula.get("disciplina") or ""),
+        "observacoes": str(aula.get("observacoes") or ""),
+        "comentarios": " ".join(str(c.get("comentario") or "") for c in comentarios if isinstance(c, dict)),
+    }
+
+
+def indexar_aula(aula):
+    """Palavras normalizadas de cada campo da aula, guardadas no índice do catálogo"""
+    return {campo: [normalizar(p) for p in _PALAVRA.findall(texto)]
+            for campo, texto in textos_da_aula(aula).items()}
+
+
+def pontos_por_palavra(palavras_por_campo):
+    """Peso de cada palavra da aula: soma dos pesos dos campos em que aparece"""
+    pontos = {}
+    for campo, palavras in palavras_por_campo.items():
+        for palavra in palavras:
+            pontos[palavra] = pontos.get(palavra, 0.0) + PESOS_BUSCA[campo]
+    return pontos
+
+
+def montar_trecho(aula, palavras_por_campo, termos, destaque=("[b]", "[/b]")):
+    """Trecho do campo com mais termos encontrados, com os termos entre os marcadores"""
+    def acertos(campo):
+        return sum(1 for p in palavras_por_campo[campo] if any(p.startswith(t) for t in termos))
+
+    campo = max(CAMPOS_BUSCA, key=acertos)
+    texto = textos_da_aula(aula)[campo]
+    palavras = list(_PALAVRA.finditer(texto))
+    normalizadas = palavras_por_campo[campo]
+    if not palavras:
+        return ""
+
+    primeiro = next((i for i, p in enumerate(normalizadas) if any(p.startswith(t) for t in termos)), 0)
+    inicio = max(0, min(primeiro - PALAVRAS_NO_TRECHO // 4, len(palavras) - PALAVRAS_NO_TRECHO))
+    fim = min(len(palavras), inicio + PALAVRAS_NO_TRECHO)
+
+    partes = []
+    posicao = palavras[inicio].start()
+    for i in range(inicio, fim):
+        palavra = palavras[i]
+        partes.append(texto[posicao:palavra.start()])
+        if any(normalizadas[i].startswith(t) for t in termos):
+            partes.append(f"{destaque[0]}{palavra.group()}{destaque[1]}")
+        else:
+            partes.append(palavra.group())
+        posicao = palavra.end()
+
+    trecho = "".join(partes)
+    if inicio > 0:
+        trecho = "…" + trecho
+    if fim < len(palavras):
+        trecho += "…"
+    return trecho
@@ -0,0 +1,121 @@
+# utils/cache_validadores.py
+import os
+import json
+import logging
+import tempfile
+import threading
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+
+class CacheValidadores:
+    """
+    Guarda, por URL, os validadores HTTP (ETag e Last-Modified) da última
+    resposta processada, para que a próxima requisição seja condicional
+    (If-None-Match / If-Modified-Since). Um 304 significa que a página não
+    mudou: quem chamou reaproveita o resultado anterior sem baixar nem
+    analisar o conteúdo.
+
+    Junto com os validadores fica o `resultado` que o chamador extraiu da
+    página (qualquer valor serializável em JSON), devolvido em caso de 304.
+    Cada consumidor usa o seu próprio arquivo, pois o resultado só faz
+    sentido para quem o calculou.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+        # url -> {"etag": ..., "last_modified": ..., "resultado": ...}
+        self.entradas = self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.arquivo):
+            return {}
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Cache de validadores ilegível ({e}); iniciando vazio")
+            return {}
+
+    def _salvar(self):
+        """Grava o cache de forma atômica (arquivo temporário + os.replace)"""
+        diretorio = os.path.dirname(os.path.abspath(self.arquivo))
+        os.makedirs(diretorio, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".validadores.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, ensure_ascii=False, default=str, indent=2)
+            os.replace(temporario, self.arquivo)
+        except Exception as e:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            logger.error(f"Erro ao salvar cache de validadores: {e}")
+
+    def cabecalhos(self, url):
+        """Cabeçalhos condicionais para a próxima requisição de `url`"""
+        with self._lock:
+            entrada = self.entradas.get(url)
+        if not entrada:
+            return {}
+        cabecalhos = {}
+        if entrada.get("etag"):
+            cabecalhos["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = entrada["last_modified"]
+        return cabecalhos
+
+    def registrar(self, url, response, resultado=None):
+        """Guarda os validadores de uma resposta 200 já processada
+
+        Só deve ser chamado depois que o conteúdo foi analisado com sucesso;
+        sem ETag nem Last-Modified a entrada é removida.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            if not etag and not last_modified:
+                if self.entradas.pop(url, None) is None:
+                    return
+            else:
+                self.entradas[url] = {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "resultado": resultado
+                }
+            self._salvar()
+
+    def resultado(self, url):
+        """Resultado guardado da última resposta 200 de `url`"""
+        with self._lock:
+            return self.entradas.get(url, {}).get("resultado")
+
+    def remover(self, url):
+        with self._lock:
+            if self.entradas.pop(url, None) is not None:
+                self._salvar()
+
+    def remover_consultas(self, url, exceto=None):
+        """Remove as entradas de `url` e das suas consultas (url?...), menos `exceto`"""
+        with self._lock:
+            antigas = [chave for chave in self.entradas
+                       if chave != exceto and (chave == url or chave.startswith(url + "?"))]
+            for chave in antigas:
+                del self.entradas[chave]
+            if antigas:
+                self._salvar()
+
+
+# Um cache por arquivo no processo (os managers são instanciados por tela)
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def obter_cache_validadores(arquivo):
+    """Retorna o CacheValidadores compartilhado para o arquivo informado"""
+    chave = os.path.abspath(arquivo)
+    with _caches_lock:
+        if chave not in _caches:
+            _caches[chave] = CacheValidadores(chave)
+        return _caches[chave]
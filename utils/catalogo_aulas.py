@@ -0,0 +1,255 @@
+# utils/catalogo_aulas.py
+import os
+import bisect
+import heapq
+import logging
+import threading
+
+from utils.aulas_journal import AulasJournal, LIMITE_JOURNAL_PADRAO
+from utils.busca_aulas import indexar_aula, termos_da_consulta, pontos_por_palavra, montar_trecho
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+
+class CatalogoAulas(AulasJournal):
+    """
+    Catálogo de aulas em memória, compartilhado por todo o processo.
+
+    O arquivo é lido uma única vez; além do índice por ID (herdado do journal),
+    mantém índices por professor e por disciplina e um índice invertido de
+    palavras para a busca textual, todos atualizados a cada operação.
+    Antes de cada consulta compara mtime/tamanho do snapshot e do journal com
+    os da última leitura e só recarrega se outro processo alterou os arquivos.
+    """
+
+    def __init__(self, aulas_file, limite_journal=LIMITE_JOURNAL_PADRAO):
+        # nome/disciplina -> {aula_id: None}, em ordem de criação
+        self._por_professor = {}
+        self._por_disciplina = {}
+        # professor (ou None = todas) -> lista ordenada de (data_criacao, id), montada sob demanda
+        self._chaves_ordenadas = {}
+        # Busca: id -> {campo: [palavras normalizadas]} (para o trecho),
+        # palavra -> {aula_id: pontos} e as palavras em ordem (para prefixos),
+        # refeita sob demanda quando o vocabulário muda
+        self._palavras = {}
+        self._indice_palavras = {}
+        self._vocabulario = None
+        self._assinatura = None
+        super().__init__(aulas_file, limite_journal=limite_journal)
+
+    # ------------------------------------------------------------------
+    # Recarga por mtime/tamanho
+    # ------------------------------------------------------------------
+    def _assinatura_arquivos(self):
+        assinatura = []
+        for caminho in (self.aulas_file, self.journal_compactando, self.journal_file):
+            try:
+                info = os.stat(caminho)
+                assinatura.append((info.st_mtime_ns, info.st_size))
+            except FileNotFoundError:
+                assinatura.append(None)
+        return tuple(assinatura)
+
+    def _recarregar_se_alterado(self):
+        if self._assinatura_arquivos() != self._assinatura:
+            logger.debug("Arquivos de aulas alterados externamente. Recarregando catálogo.")
+            self.carregar()
+
+    def carregar(self):
+        with self._lock:
+            self._por_professor = {}
+            self._por_disciplina = {}
+            self._limpar_indices()
+            super().carregar()
+            self._assinatura = self._assinatura_arquivos()
+
+    def _registrar(self, operacao):
+        with self._lock:
+            self._recarregar_se_alterado()
+            super()._registrar(operacao)
+            self._assinatura = self._assinatura_arquivos()
+
+    def substituir(self, aulas):
+        super().substituir(aulas)
+        with self._lock:
+            # O journal zera as aulas sem passar por _aplicar: índices refeitos do zero
+            self._limpar_indices()
+            for aula_id, aula in self.aulas.items():
+                self._atualizar_indices(aula_id, None, aula)
+            self._assinatura = self._assinatura_arquivos()
+
+    def _apos_compactacao(self):
+        self._assinatura = self._assinatura_arquivos()
+
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+    def _aplicar(self, operacao):
+        aula_id = operacao["aula"]["id"] if operacao.get("op") == "gravar" else operacao.get("id")
+        anterior = self.aulas.get(aula_id)
+
+        super()._aplicar(operacao)
+
+        self._atualizar_indices(aula_id, anterior, self.aulas.get(aula_id))
+
+    def _limpar_indices(self):
+        self._por_professor = {}
+        self._por_disciplina = {}
+        self._chaves_ordenadas = {}
+        self._palavras = {}
+        self._indice_palavras = {}
+        self._vocabulario = None
+
+    def _atualizar_indices(self, aula_id, anterior, atual):
+        self._indexar_palavras(aula_id, atual)
+
+        # Invalida apenas as ordenações afetadas por esta aula
+        self._chaves_ordenadas.pop(None, None)
+        for aula in (anterior, atual):
+            if aula is not None:
+                self._chaves_ordenadas.pop(aula.get("professor", ""), None)
+
+        for indice, campo in ((self._por_professor, "professor"), (self._por_disciplina, "disciplina")):
+            chave_anterior = anterior.get(campo, "") if anterior else None
+            chave_atual = atual.get(campo, "") if atual else None
+            if chave_anterior == chave_atual:
+                # Mesma chave: a aula mantém a posição no índice
+                continue
+            if anterior is not None:
+                ids = indice.get(chave_anterior)
+                if ids is not None:
+                    ids.pop(aula_id, None)
+                    if not ids:
+                        del indice[chave_anterior]
+            if atual is not None:
+                indice.setdefault(chave_atual, {})[aula_id] = None
+
+    def _indexar_palavras(self, aula_id, atual):
+        """Tira as palavras antigas da aula do índice invertido e põe as atuais"""
+        antigas = self._palavras.pop(aula_id, None)
+        if antigas:
+            for palavra in {p for palavras in antigas.values() for p in palavras}:
+                aulas = self._indice_palavras[palavra]
+                aulas.pop(aula_id, None)
+                if not aulas:
+                    del self._indice_palavras[palavra]
+                    self._vocabulario = None
+        if atual is None:
+            return
+        palavras = indexar_aula(atual)
+        self._palavras[aula_id] = palavras
+        for palavra, pontos in pontos_por_palavra(palavras).items():
+            aulas = self._indice_palavras.get(palavra)
+            if aulas is None:
+                aulas = self._indice_palavras[palavra] = {}
+                self._vocabulario = None
+            aulas[aula_id] = pontos
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def listar(self):
+        with self._lock:
+            self._recarregar_se_alterado()
+            return self._listar_referencias()
+
+    def obter(self, aula_id):
+        with self._lock:
+            self._recarregar_se_alterado()
+            return self.aulas.get(aula_id)
+
+    def proximo_id(self):
+        with self._lock:
+            self._recarregar_se_alterado()
+            return self._maior_id + 1
+
+    def obter_por_professor(self, professor):
+        """Aulas do professor, da mais recente para a mais antiga"""
+        with self._lock:
+            self._recarregar_se_alterado()
+            return [self.aulas[i] for i in reversed(list(self._por_professor.get(professor, {})))]
+
+    def obter_por_disciplina(self, disciplina):
+        """Aulas da disciplina, da mais recente para a mais antiga"""
+        with self._lock:
+            self._recarregar_se_alterado()
+            return [self.aulas[i] for i in reversed(list(self._por_disciplina.get(disciplina, {})))]
+
+    def obter_pagina(self, professor=None, cursor=None, limite=20):
+        """Página de aulas ordenada por (data_criacao, id) decrescente
+
+        `cursor` é o par (data_criacao, id) da última aula já exibida.
+        Retorna (aulas, proximo_cursor); proximo_cursor é None na última página.
+        """
+        with self._lock:
+            self._recarregar_se_alterado()
+            chaves = self._chaves_ordenadas.get(professor)
+            if chaves is None:
+                ids = self.aulas if professor is None else self._por_professor.get(professor, {})
+                chaves = sorted((str(self.aulas[i].get("data_criacao", "")), i) for i in ids)
+                self._chaves_ordenadas[professor] = chaves
+
+            # Tudo o que vem antes do cursor na ordem crescente
+            fim = len(chaves) if cursor is None else bisect.bisect_left(chaves, tuple(cursor))
+            inicio = max(0, fim - limite)
+            pagina = [self.aulas[i] for _, i in reversed(chaves[inicio:fim])]
+            proximo_cursor = chaves[inicio] if inicio > 0 else None
+            return pagina, proximo_cursor
+
+    def buscar(self, texto, limite=20, destaque=("[b]", "[/b]")):
+        """Busca textual em títulos, disciplinas, observações e comentários
+
+        Cada palavra digitada é tratada como prefixo, sem acentos nem caixa,
+        e todas precisam aparecer na aula. Retorna (relevância, aula, trecho),
+        da mais relevante para a menos; o trecho traz os termos encontrados
+        entre os marcadores de `destaque`.
+        """
+        termos = termos_da_consulta(texto)
+        if not termos:
+            return []
+        with self._lock:
+            self._recarregar_se_alterado()
+            if self._vocabulario is None:
+                self._vocabulario = sorted(self._indice_palavras)
+
+            # Só as aulas com alguma palavra começando por cada termo são
+            # visitadas; o termo mais longo (mais seletivo) vem primeiro
+            relevancias = None
+            for termo in sorted(termos, key=len, reverse=True):
+                pontos = {}
+                i = bisect.bisect_left(self._vocabulario, termo)
+                while i < len(self._vocabulario) and self._vocabulario[i].startswith(termo):
+                    for aula_id, p in self._indice_palavras[self._vocabulario[i]].items():
+                        if relevancias is None or aula_id in relevancias:
+                            pontos[aula_id] = pontos.get(aula_id, 0.0) + p
+                    i += 1
+                if relevancias is not None:
+                    pontos = {aula_id: relevancias[aula_id] + p for aula_id, p in pontos.items()}
+                relevancias = pontos
+                if not relevancias:
+                    return []
+
+            # Empate: a aula mais recente primeiro
+            melhores = heapq.nlargest(limite, relevancias, key=lambda aula_id: (
+                relevancias[aula_id], str(self.aulas[aula_id].get("data_criacao") or "")))
+            return [
+                (relevancias[aula_id], self.aulas[aula_id],
+                 montar_trecho(self.aulas[aula_id], self._palavras[aula_id], termos, destaque))
+                for aula_id in melhores
+            ]
+
+
+# Um catálogo por arquivo de aulas no processo inteiro: todas as telas criam
+# o próprio AulasManager, mas precisam enxergar (e gravar) o mesmo estado.
+_catalogos = {}
+_catalogos_lock = threading.Lock()
+
+
+def obter_catalogo(aulas_file, limite_journal=LIMITE_JOURNAL_PADRAO):
+    """Retorna o catálogo compartilhado para o arquivo de aulas informado"""
+    chave = os.path.abspath(aulas_file)
+    with _catalogos_lock:
+        if chave not in _catalogos:
+            _catalogos[chave] = CatalogoAulas(chave, limite_journal=limite_journal)
+        return _catalogos[chave]
@@ -0,0 +1,114 @@
+# utils/disjuntor.py
+import time
+import logging
+import threading
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Falhas seguidas que abrem o circuito de um host e tempo até a próxima sonda
+LIMITE_FALHAS = 3
+ESPERA_ABERTO = 120
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+
+class CircuitoAberto(Exception):
+    """O host está com o circuito aberto; a requisição nem foi feita"""
+
+
+class Disjuntor:
+    """
+    Circuit breaker de um host.
+
+    Fechado, tudo passa. Depois de `limite_falhas` falhas seguidas ele abre
+    e as requisições são recusadas na hora durante `espera` segundos. Passado
+    esse tempo fica meio aberto: uma única requisição (a sonda) é liberada;
+    se der certo o circuito fecha, se falhar abre de novo.
+    """
+
+    def __init__(self, host, limite_falhas=LIMITE_FALHAS, espera=ESPERA_ABERTO, relogio=time.monotonic):
+        self.host = host
+        self.limite_falhas = limite_falhas
+        self.espera = espera
+        self.relogio = relogio
+        self._lock = threading.Lock()
+        self.estado = FECHADO
+        self.falhas_seguidas = 0
+        self.aberto_ate = None
+        self.recusadas = 0
+        self._sonda_em_andamento = False
+
+    def permitir(self):
+        """True se a requisição pode ser feita agora"""
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO and self.relogio() >= self.aberto_ate:
+                self.estado = MEIO_ABERTO
+                self._sonda_em_andamento = False
+                logger.info(f"Circuito de {self.host} meio aberto; liberando uma sonda")
+            if self.estado == MEIO_ABERTO and not self._sonda_em_andamento:
+                self._sonda_em_andamento = True
+                return True
+            self.recusadas += 1
+            return False
+
+    def registrar_sucesso(self):
+        with self._lock:
+            if self.estado != FECHADO:
+                logger.info(f"Circuito de {self.host} fechado de novo")
+            self.estado = FECHADO
+            self.falhas_seguidas = 0
+            self.aberto_ate = None
+            self._sonda_em_andamento = False
+
+    def registrar_falha(self):
+        with self._lock:
+            self.falhas_seguidas += 1
+            if self.estado == MEIO_ABERTO or self.falhas_seguidas >= self.limite_falhas:
+                if self.estado != ABERTO:
+                    logger.warning(f"Circuito de {self.host} aberto após {self.falhas_seguidas} "
+                                   f"falhas seguidas; nova tentativa em {self.espera}s")
+                self.estado = ABERTO
+                self.aberto_ate = self.relogio() + self.espera
+                self._sonda_em_andamento = False
+
+    def liberar_sonda(self):
+        """A requisição permitida terminou sem dizer nada sobre o host"""
+        with self._lock:
+            self._sonda_em_andamento = False
+
+    def diagnostico(self):
+        with self._lock:
+            restante = max(0.0, self.aberto_ate - self.relogio()) if self.estado == ABERTO else 0.0
+            return {
+                "estado": self.estado,
+                "falhas_seguidas": self.falhas_seguidas,
+                "reabre_em": round(restante, 1),
+                "recusadas": self.recusadas
+            }
+
+
+class DisjuntoresPorHost:
+    """Um Disjuntor por host, criado na primeira requisição a ele"""
+
+    def __init__(self, limite_falhas=LIMITE_FALHAS, espera=ESPERA_ABERTO, relogio=time.monotonic):
+        self.limite_falhas = limite_falhas
+        self.espera = espera
+        self.relogio = relogio
+        self._disjuntores = {}
+        self._lock = threading.Lock()
+
+    def obter(self, host):
+        with self._lock:
+            if host not in self._disjuntores:
+                self._disjuntores[host] = Disjuntor(host, self.limite_falhas, self.espera, self.relogio)
+            return self._disjuntores[host]
+
+    def diagnostico(self):
+        with self._lock:
+            disjuntores = dict(self._disjuntores)
+        return {host: disjuntor.diagnostico() for host, disjuntor in sorted(disjuntores.items())}
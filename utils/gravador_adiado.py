@@ -0,0 +1,88 @@
+# utils/gravador_adiado.py
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Espera após a última alteração antes de gravar, e espera máxima desde a
+# primeira alteração ainda não gravada (uma sequência contínua não adia para sempre)
+ATRASO_GRAVACAO = 1.0
+ATRASO_MAXIMO = 5.0
+
+
+class GravadorAdiado:
+    """
+    Grava um JSON em segundo plano, juntando várias alterações numa escrita.
+
+    O dono do estado chama `marcar_alterado()` a cada mudança; a gravação
+    acontece `atraso` segundos depois da última marcação (ou no máximo
+    `atraso_maximo` depois da primeira), com o conteúdo devolvido por
+    `obter_dados()` naquele momento. `descarregar()` grava na hora o que
+    estiver pendente (ao fechar o app). A escrita é atômica: arquivo
+    temporário + os.replace.
+    """
+
+    def __init__(self, arquivo, obter_dados, atraso=ATRASO_GRAVACAO, atraso_maximo=ATRASO_MAXIMO):
+        self.arquivo = arquivo
+        self.obter_dados = obter_dados
+        self.atraso = atraso
+        self.atraso_maximo = atraso_maximo
+        self._lock = threading.Lock()
+        self._gravacao_lock = threading.Lock()
+        self._timer = None
+        self._alterado_desde = None
+        self.gravacoes = 0
+
+    @property
+    def pendente(self):
+        with self._lock:
+            return self._alterado_desde is not None
+
+    def marcar_alterado(self):
+        """Agenda a gravação (reagenda se já havia uma pendente)"""
+        with self._lock:
+            agora = time.monotonic()
+            if self._alterado_desde is None:
+                self._alterado_desde = agora
+            espera = min(self.atraso, self._alterado_desde + self.atraso_maximo - agora)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(max(0.0, espera), self.descarregar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def descarregar(self):
+        """Grava agora, se houver alteração pendente"""
+        with self._gravacao_lock:
+            with self._lock:
+                if self._alterado_desde is None:
+                    return False
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._alterado_desde = None
+            # Alterações feitas durante a escrita marcam de novo e geram outra gravação
+            self.gravar(self.obter_dados())
+            return True
+
+    def gravar(self, dados):
+        """Escreve `dados` de forma atômica (arquivo temporário + os.replace)"""
+        diretorio = os.path.dirname(os.path.abspath(self.arquivo))
+        temporario = None
+        try:
+            fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".gravacao.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dados, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.arquivo)
+            self.gravacoes += 1
+        except Exception as e:
+            if temporario and os.path.exists(temporario):
+                os.remove(temporario)
+            logger.error(f"Erro ao gravar {self.arquivo}: {e}")
@@ -0,0 +1,172 @@
+# utils/http_cliente.py
+import time
+import random
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.disjuntor import DisjuntoresPorHost, CircuitoAberto
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Conexões mantidas abertas por host (e limite de conexões simultâneas a ele)
+MAX_CONEXOES_POR_HOST = 4
+# Hosts distintos com pool guardado (os sites do departamento, FCM...)
+MAX_HOSTS = 10
+
+# Tentativas e espera exponencial com jitter entre elas
+TENTATIVAS = 3
+ESPERA_BASE = 0.5
+ESPERA_MAXIMA = 4.0
+
+# Respostas maiores que isso são abandonadas sem serem lidas até o fim
+MAX_BYTES_RESPOSTA = 5 * 1024 * 1024
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+class RespostaMuitoGrande(Exception):
+    """A resposta ultrapassou o limite de bytes do cliente"""
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP compartilhado por todas as chamadas de saída do app.
+
+    Usa uma única requests.Session: as conexões (e o handshake TLS) com
+    cada host são reaproveitadas entre verificações. O pool de cada host
+    tem no máximo `max_conexoes_por_host` conexões e bloqueia quando todas
+    estão em uso, o que limita a concorrência por servidor.
+
+    Respostas 5xx, timeouts e falhas de conexão são repetidas com espera
+    exponencial e jitter; o corpo é lido em blocos e abortado ao passar de
+    `max_bytes` (RespostaMuitoGrande). A resposta devolvida já tem o
+    conteúdo carregado, então .text, .json() e .headers funcionam como de
+    costume.
+
+    Cada host tem um disjuntor: depois de algumas requisições seguidas
+    terminando em falha (já contadas as novas tentativas), as próximas são
+    recusadas na hora com CircuitoAberto até passar o tempo de espera, em
+    vez de cada uma esperar o timeout de um site fora do ar.
+    """
+
+    def __init__(self, max_conexoes_por_host=MAX_CONEXOES_POR_HOST, tentativas=TENTATIVAS,
+                 espera_base=ESPERA_BASE, espera_maxima=ESPERA_MAXIMA, max_bytes=MAX_BYTES_RESPOSTA,
+                 disjuntores=None):
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.max_bytes = max_bytes
+        self.disjuntores = disjuntores or DisjuntoresPorHost()
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "DEGEO-App"
+        # max_retries=0: as novas tentativas são feitas aqui, com backoff
+        adaptador = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=max_conexoes_por_host,
+                                pool_block=True, max_retries=0)
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+
+    def get(self, url, **kwargs):
+        return self.requisitar("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.requisitar("POST", url, **kwargs)
+
+    def requisitar(self, metodo, url, tentativas=None, max_bytes=None, **kwargs):
+        """Executa a requisição com novas tentativas e limite de tamanho"""
+        tentativas = tentativas or self.tentativas
+        max_bytes = max_bytes or self.max_bytes
+
+        host = urlsplit(url).netloc
+        disjuntor = self.disjuntores.obter(host)
+        if not disjuntor.permitir():
+            raise CircuitoAberto(f"{host} indisponível; {metodo} {url} não foi feito")
+
+        try:
+            response = self._requisitar_com_tentativas(metodo, url, tentativas, **kwargs)
+        except (requests.Timeout, requests.ConnectionError):
+            disjuntor.registrar_falha()
+            raise
+        except Exception:
+            # Erro que não diz nada sobre o host (URL inválida...)
+            disjuntor.liberar_sonda()
+            raise
+
+        if response.status_code >= 500:
+            disjuntor.registrar_falha()
+        else:
+            disjuntor.registrar_sucesso()
+        self._ler_corpo(response, max_bytes)
+        return response
+
+    def _requisitar_com_tentativas(self, metodo, url, tentativas, **kwargs):
+        """Repete timeouts, falhas de conexão e 5xx; devolve a resposta sem ler o corpo"""
+        for tentativa in range(1, tentativas + 1):
+            try:
+                response = self.session.request(metodo, url, stream=True, **kwargs)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if tentativa == tentativas:
+                    raise
+                logger.debug(f"{metodo} {url} falhou ({e.__class__.__name__}); tentativa {tentativa}/{tentativas}")
+                self._esperar(tentativa)
+                continue
+
+            if response.status_code >= 500 and tentativa < tentativas:
+                response.close()
+                logger.debug(f"{metodo} {url} respondeu {response.status_code}; tentativa {tentativa}/{tentativas}")
+                self._esperar(tentativa)
+                continue
+
+            return response
+
+    def _esperar(self, tentativa):
+        """Backoff exponencial com jitter completo: entre 0 e base * 2^(tentativa-1)"""
+        limite = min(self.espera_maxima, self.espera_base * (2 ** (tentativa - 1)))
+        time.sleep(random.uniform(0, limite))
+
+    def _ler_corpo(self, response, max_bytes):
+        """Carrega o corpo em blocos, abortando ao passar de max_bytes"""
+        declarado = response.headers.get("Content-Length")
+        if declarado and declarado.isdigit() and int(declarado) > max_bytes:
+            response.close()
+            raise RespostaMuitoGrande(f"{response.url}: {declarado} bytes (limite {max_bytes})")
+
+        blocos = []
+        lidos = 0
+        try:
+            for bloco in response.iter_content(TAMANHO_BLOCO):
+                lidos += len(bloco)
+                if lidos > max_bytes:
+                    raise RespostaMuitoGrande(f"{response.url}: mais de {max_bytes} bytes")
+                blocos.append(bloco)
+        except RespostaMuitoGrande:
+            response.close()
+            raise
+        # Corpo inteiro lido: a conexão volta ao pool e .text/.json() usam este conteúdo
+        response._content = b"".join(blocos)
+
+    def diagnostico(self):
+        """Estado do disjuntor de cada host já contactado"""
+        return self.disjuntores.diagnostico()
+
+    def fechar(self):
+        self.session.close()
+
+
+# Um cliente (e um pool de conexões) para o processo inteiro
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def obter_cliente_http():
+    """Retorna o ClienteHTTP compartilhado pelo processo"""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            _cliente = ClienteHTTP()
+        return _cliente
@@ -0,0 +1,40 @@
+# utils/impressao_conteudo.py
+import re
+import html
+import hashlib
+
+# Região principal da página, em ordem de preferência. Cabeçalho, menus e
+# rodapé (que mudam sem que o conteúdo mude) ficam de fora sempre que a
+# página tem <main> ou <article>.
+_MAIN = re.compile(r"<main\b[^>]*>(.*?)</main>", re.S | re.I)
+_ARTIGOS = re.compile(r"<article\b[^>]*>(.*?)</article>", re.S | re.I)
+_BODY = re.compile(r"<body\b[^>]*>(.*)</body>", re.S | re.I)
+
+# Trechos que não são conteúdo (scripts com nonces, estilos, comentários)
+_RUIDO = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->", re.S | re.I)
+_TAG = re.compile(r"<[^>]+>")
+_ESPACOS = re.compile(r"\s+")
+
+
+def regiao_principal(pagina):
+    """Trecho do HTML com o conteúdo principal (sem analisar o DOM)"""
+    encontrado = _MAIN.search(pagina)
+    if encontrado:
+        return encontrado.group(1)
+    artigos = _ARTIGOS.findall(pagina)
+    if artigos:
+        return "\n".join(artigos)
+    encontrado = _BODY.search(pagina)
+    return encontrado.group(1) if encontrado else pagina
+
+
+def normalizar(pagina):
+    """Texto visível da região principal, com espaços colapsados"""
+    texto = _RUIDO.sub(" ", regiao_principal(pagina))
+    texto = html.unescape(_TAG.sub(" ", texto))
+    return _ESPACOS.sub(" ", texto).strip()
+
+
+def impressao_conteudo(pagina):
+    """SHA-256 do conteúdo normalizado: muda só quando o texto principal muda"""
+    return hashlib.sha256(normalizar(pagina).encode("utf-8")).hexdigest()
@@ -0,0 +1,145 @@
+# utils/ingestao_anexos.py
+import os
+import time
+import logging
+import threading
+
+from utils.blob_store import IngestaoCancelada, ArquivoMuitoGrande
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Limites verificados antes de ler qualquer byte (e de novo durante a cópia)
+TAMANHO_MAXIMO_ARQUIVO = 1024 * 1024 * 1024       # 1 GiB por anexo
+TAMANHO_MAXIMO_TOTAL = 2 * 1024 * 1024 * 1024     # 2 GiB por aula
+
+# Intervalo mínimo entre avisos de progresso enviados à interface
+INTERVALO_PROGRESSO = 0.1
+
+
+def _agendar_no_clock(funcao, *args):
+    """Executa a função na thread principal do Kivy"""
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: funcao(*args), 0)
+
+
+def _formatar_tamanho(tamanho):
+    return f"{tamanho / (1024 * 1024):.0f} MB"
+
+
+class IngestaoAnexos:
+    """
+    Copia os anexos de uma aula para o blob store numa thread de fundo.
+
+    Cada arquivo é lido uma única vez em blocos: o SHA-256 é calculado e o
+    blob é gravado na mesma passada. O progresso (bytes copiados, total e
+    nome do arquivo atual) e o resultado final são entregues à interface via
+    Clock. `cancelar()` interrompe a cópia no próximo bloco e devolve as
+    referências já tomadas.
+
+    `ao_concluir(sucesso, resultado)` recebe a lista de anexos
+    ({"nome", "caminho"}) ou a mensagem de erro.
+    """
+
+    def __init__(self, blobs, arquivos, ao_progredir=None, ao_concluir=None,
+                 tamanho_maximo_arquivo=TAMANHO_MAXIMO_ARQUIVO,
+                 tamanho_maximo_total=TAMANHO_MAXIMO_TOTAL,
+                 agendar=_agendar_no_clock):
+        self.blobs = blobs
+        self.arquivos = list(arquivos or [])
+        self.ao_progredir = ao_progredir
+        self.ao_concluir = ao_concluir
+        self.tamanho_maximo_arquivo = tamanho_maximo_arquivo
+        self.tamanho_maximo_total = tamanho_maximo_total
+        self.agendar = agendar
+        self._cancelado = threading.Event()
+        self._thread = None
+        self._ultimo_aviso = 0
+        self._tamanhos = {}
+        self.total_bytes = 0
+
+    def iniciar(self):
+        """Valida os tamanhos e inicia a cópia em segundo plano"""
+        tamanhos = {}
+        for arquivo in self.arquivos:
+            if not os.path.exists(arquivo):
+                logger.warning(f"Arquivo não encontrado: {arquivo}")
+                continue
+            tamanho = os.path.getsize(arquivo)
+            if tamanho > self.tamanho_maximo_arquivo:
+                self._concluir(False, f"'{os.path.basename(arquivo)}' tem {_formatar_tamanho(tamanho)}; "
+                                      f"o limite por arquivo é {_formatar_tamanho(self.tamanho_maximo_arquivo)}")
+                return False
+            tamanhos[arquivo] = tamanho
+
+        self.total_bytes = sum(tamanhos.values())
+        if self.total_bytes > self.tamanho_maximo_total:
+            self._concluir(False, f"Os anexos somam {_formatar_tamanho(self.total_bytes)}; "
+                                  f"o limite por aula é {_formatar_tamanho(self.tamanho_maximo_total)}")
+            return False
+
+        self.arquivos = list(tamanhos)
+        self._tamanhos = tamanhos
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        return True
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def aguardar(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        anexos = []
+        copiados = 0
+        try:
+            for arquivo in self.arquivos:
+                nome = os.path.basename(arquivo)
+
+                def progresso(lidos, base=copiados, nome=nome):
+                    self._avisar_progresso(base + lidos, nome)
+
+                digest = self.blobs.ingerir(
+                    arquivo,
+                    ao_progredir=progresso,
+                    cancelado=self._cancelado.is_set,
+                    tamanho_maximo=self.tamanho_maximo_arquivo
+                )
+                anexos.append({"nome": nome, "caminho": self.blobs.caminho_relativo(digest)})
+                copiados += self._tamanhos[arquivo]
+
+            self._avisar_progresso(self.total_bytes, "", forcar=True)
+            self._concluir(True, anexos)
+
+        except IngestaoCancelada:
+            logger.info("Envio de anexos cancelado")
+            self._devolver(anexos)
+            self._concluir(False, "Envio de anexos cancelado")
+        except ArquivoMuitoGrande as e:
+            self._devolver(anexos)
+            self._concluir(False, f"'{os.path.basename(str(e))}' ultrapassou o limite de "
+                                  f"{_formatar_tamanho(self.tamanho_maximo_arquivo)}")
+        except Exception as e:
+            logger.error(f"Erro ao copiar anexos: {e}", exc_info=True)
+            self._devolver(anexos)
+            self._concluir(False, f"Erro ao copiar anexos: {str(e)}")
+
+    def _devolver(self, anexos):
+        """Libera os blobs já copiados de uma ingestão que não será usada"""
+        for anexo in anexos:
+            self.blobs.liberar(self.blobs.digest_de(anexo["caminho"]))
+
+    def _avisar_progresso(self, copiados, nome, forcar=False):
+        if not self.ao_progredir:
+            return
+        agora = time.monotonic()
+        if not forcar and agora - self._ultimo_aviso < INTERVALO_PROGRESSO:
+            return
+        self._ultimo_aviso = agora
+        self.agendar(self.ao_progredir, copiados, self.total_bytes, nome)
+
+    def _concluir(self, sucesso, resultado):
+        if self.ao_concluir:
+            self.agendar(self.ao_concluir, sucesso, resultado)
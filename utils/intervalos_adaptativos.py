@@ -0,0 +1,51 @@
+# utils/intervalos_adaptativos.py
+from datetime import datetime
+
+# Limites padrão do intervalo entre verificações de uma fonte (segundos)
+INTERVALO_MINIMO = 300            # 5 minutos
+INTERVALO_MAXIMO = 24 * 3600      # 1 dia
+
+# A cada verificação sem mudança o intervalo cresce por este fator
+FATOR_RECUO = 1.5
+# Uma fonte é verificada ~N vezes no intervalo médio entre as suas mudanças
+VERIFICACOES_ENTRE_MUDANCAS = 24
+# Quantas datas de mudança são guardadas por fonte
+HISTORICO_MAXIMO = 10
+
+
+def intervalo_atual(info, minimo=INTERVALO_MINIMO, maximo=INTERVALO_MAXIMO):
+    """Intervalo (s) entre verificações guardado para a fonte, dentro dos limites"""
+    return min(maximo, max(minimo, info.get('intervalo', minimo)))
+
+
+def registrar_resultado(info, mudou, agora=None, minimo=INTERVALO_MINIMO, maximo=INTERVALO_MAXIMO):
+    """Atualiza o histórico e o intervalo da fonte após uma verificação
+
+    `info` é a entrada da fonte em atualizacoes.json (alterada no lugar).
+    Quando a fonte muda, o intervalo volta ao mínimo; a cada verificação sem
+    mudança ele cresce FATOR_RECUO vezes, até o máximo ou até uma fração do
+    intervalo médio observado entre mudanças (quem muda todo dia nunca fica
+    horas sem ser verificado). Retorna o novo intervalo.
+    """
+    agora = agora or datetime.now()
+    mudancas = info.get('mudancas', [])
+    if mudou:
+        mudancas = (mudancas + [agora.isoformat()])[-HISTORICO_MAXIMO:]
+        info['mudancas'] = mudancas
+        info['sem_mudanca'] = 0
+    else:
+        info['sem_mudanca'] = info.get('sem_mudanca', 0) + 1
+
+    teto = maximo
+    if len(mudancas) >= 2:
+        datas = [datetime.fromisoformat(d) for d in mudancas]
+        media = (datas[-1] - datas[0]).total_seconds() / (len(datas) - 1)
+        teto = min(maximo, max(minimo, media / VERIFICACOES_ENTRE_MUDANCAS))
+
+    if mudou:
+        intervalo = minimo
+    else:
+        intervalo = min(teto, intervalo_atual(info, minimo, maximo) * FATOR_RECUO)
+
+    info['intervalo'] = intervalo
+    return intervalo
@@ -0,0 +1,149 @@
+# utils/motor_verificacao.py
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Verificações simultâneas no total e por servidor. Quase todos os recursos
+# ficam em geologia.ufc.br, então o limite por host define o tempo de uma
+# atualização completa: com 4, os 7 endereços desse host levam 2 rodadas.
+MAX_VERIFICACOES_SIMULTANEAS = 8
+MAX_VERIFICACOES_POR_HOST = 4
+
+
+def _agendar_no_clock(funcao, *args):
+    """Executa a função na thread principal do Kivy"""
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: funcao(*args), 0)
+
+
+def _host(url):
+    return (urlsplit(url).hostname or "").lower()
+
+
+class MotorVerificacao:
+    """
+    Executa verificações de sites em paralelo num pool de threads limitado.
+
+    Cada tarefa é associada ao host da sua URL; quando o host já tem
+    `limite_por_host` tarefas em andamento, as demais esperam numa fila
+    daquele host (sem ocupar uma thread do pool) e são liberadas conforme as
+    anteriores terminam. O resultado é entregue ao callback pela função
+    `agendar` (Clock.schedule_once por padrão).
+
+    Tarefas enviadas com `chave` são deduplicadas (single-flight): se a
+    mesma chave já está na fila ou executando, o novo callback só é
+    acrescentado à tarefa pendente e recebe o mesmo resultado. `economizadas`
+    conta quantas execuções foram evitadas assim.
+    """
+
+    def __init__(self, max_threads=MAX_VERIFICACOES_SIMULTANEAS,
+                 limite_por_host=MAX_VERIFICACOES_POR_HOST, agendar=_agendar_no_clock):
+        self.limite_por_host = limite_por_host
+        self.agendar = agendar
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="verificacao")
+        self._lock = threading.Lock()
+        # host -> tarefas em andamento / tarefas aguardando vaga
+        self._em_andamento = {}
+        self._pendentes = {}
+        # chave -> callbacks aguardando a tarefa já enviada
+        self._em_voo = {}
+        self.executadas = 0
+        self.economizadas = 0
+
+    def enviar(self, url, funcao, callback=None, chave=None):
+        """Agenda `funcao()` respeitando o limite do host de `url`
+
+        Retorna False se a chave já estava em andamento e o callback foi
+        apenas associado à execução existente.
+        """
+        host = _host(url)
+        if chave is None:
+            # Sem deduplicação: chave única só desta tarefa
+            chave = object()
+        tarefa = (host, funcao, chave)
+        with self._lock:
+            if chave in self._em_voo:
+                if callback:
+                    self._em_voo[chave].append(callback)
+                self.economizadas += 1
+                logger.debug(f"Verificação de {chave} já em andamento; resultado compartilhado")
+                return False
+            self._em_voo[chave] = [callback] if callback else []
+            if self._em_andamento.get(host, 0) >= self.limite_por_host:
+                self._pendentes.setdefault(host, deque()).append(tarefa)
+                return True
+            self._em_andamento[host] = self._em_andamento.get(host, 0) + 1
+        self._executor.submit(self._executar, tarefa)
+        return True
+
+    def em_andamento(self, host=None):
+        """Quantidade de tarefas executando (no host informado ou no total)"""
+        with self._lock:
+            if host is not None:
+                return self._em_andamento.get(host.lower(), 0)
+            return sum(self._em_andamento.values())
+
+    def estatisticas(self):
+        with self._lock:
+            return {"executadas": self.executadas, "economizadas": self.economizadas}
+
+    def _executar(self, tarefa):
+        host, funcao, chave = tarefa
+        try:
+            with self._lock:
+                self.executadas += 1
+            resultado = funcao()
+            erro = None
+        except Exception as e:
+            logger.error(f"Erro ao processar verificação ({host}): {e}")
+            erro = e
+        finally:
+            # A chave deixa de estar em voo: o próximo envio executa de novo
+            with self._lock:
+                callbacks = self._em_voo.pop(chave, [])
+            self._liberar_vaga(host)
+        if erro is None:
+            for callback in callbacks:
+                self.agendar(callback, resultado)
+
+    def _liberar_vaga(self, host):
+        with self._lock:
+            fila = self._pendentes.get(host)
+            if fila:
+                proxima = fila.popleft()
+                if not fila:
+                    del self._pendentes[host]
+            else:
+                proxima = None
+                self._em_andamento[host] -= 1
+                if not self._em_andamento[host]:
+                    del self._em_andamento[host]
+        # A vaga passa direto para a próxima tarefa do mesmo host
+        if proxima:
+            self._executor.submit(self._executar, proxima)
+
+    def encerrar(self, aguardar=False):
+        with self._lock:
+            self._pendentes.clear()
+            self._em_voo.clear()
+        self._executor.shutdown(wait=aguardar)
+
+
+# As telas criam cada uma o seu AtualizacoesManager; o pool e os limites por
+# host precisam ser os mesmos para todas
+_motor = None
+_motor_lock = threading.Lock()
+
+
+def obter_motor_verificacao():
+    """Retorna o MotorVerificacao compartilhado pelo processo"""
+    global _motor
+    with _motor_lock:
+        if _motor is None:
+            _motor = MotorVerificacao()
+        return _motor
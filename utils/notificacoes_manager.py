@@ -7,18 +7,49 @@ from kivy.app import App
 from kivy.clock import Clock
 import threading
 import time
+import uuid
+from utils.gravador_adiado import GravadorAdiado
+from utils.registro_tokens import obter_registro_tokens, PREFIXO_TOKEN_SIMULADO
+from utils.agrupador_notificacoes import AgrupadorNotificacoes, RESUMO_POR_RECURSO
 
 logger = logging.getLogger('degeo_app')
 
+# Notificações guardadas por recurso
+MAX_NOTIFICACOES_POR_RECURSO = 50
+
 class NotificacoesManager:
+    """
+    Notificações do app, mantidas em memória.
+
+    O dicionário em memória é a fonte da verdade: leituras não abrem
+    notificacoes.json e cada alteração só marca o estado como alterado. O
+    GravadorAdiado junta as alterações de uma rajada (várias fontes
+    notificando na mesma rodada) numa única gravação atômica; `descarregar`
+    grava o que estiver pendente e é chamado em DegeoApp.on_stop.
+
+    As não lidas são contadas à parte (`_nao_lidas` por recurso e
+    `_total_nao_lidas`), ajustadas a cada inserção, corte no limite,
+    marcação e remoção: o badge não percorre o histórico.
+
+    Cada notificação é gravada na hora (lista do app), mas o aviso no
+    sistema, o push e o badge passam pelo AgrupadorNotificacoes: uma rodada
+    que encontra várias novidades gera um resumo por recurso (ou um só,
+    com "resumo_notificacoes": "global" em notificacoes_config.json).
+    """
+
     def __init__(self, data_dir="data"):
         self.data_dir = data_dir
         self.notificacoes_file = os.path.join(data_dir, "notificacoes.json")
         self.config_file = os.path.join(data_dir, "notificacoes_config.json")
         self.tokens_file = os.path.join(data_dir, "fcm_tokens.json")
         
+        self._lock = threading.RLock()
+        self._gravador = GravadorAdiado(self.notificacoes_file, self._copiar_notificacoes)
+        self._ultimo_id = 0
+        
         # Serviços
         self.fcm_service = None
+        self.despachante_push = None
         self.badge_manager = None
         self.notificacao_service = None
         
@@ -29,13 +60,19 @@ class NotificacoesManager:
         self.notificacoes_ativas = True
         self.verificacao_automatica = True
         
+        modo_resumo = self._carregar_config().get("resumo_notificacoes", RESUMO_POR_RECURSO)
+        self.agrupador = AgrupadorNotificacoes(self._emitir_resumos, modo=modo_resumo)
+        
     def _inicializar_arquivos(self):
         """Inicializa os arquivos necessários"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
         
+        self.notificacoes = self._ler_notificacoes()
+        self._nao_lidas = contar_nao_lidas(self.notificacoes)
+        self._total_nao_lidas = sum(self._nao_lidas.values())
         if not os.path.exists(self.notificacoes_file):
-            self._salvar_notificacoes({})
+            self._gravador.gravar({})
         
         if not os.path.exists(self.config_file):
             self._salvar_config({
@@ -45,8 +82,8 @@ class NotificacoesManager:
                 "badge_ativo": True
             })
             
-        if not os.path.exists(self.tokens_file):
-            self._salvar_tokens({})
+        # Tokens FCM por dispositivo (upsert a cada abertura do app, com TTL)
+        self.registro_tokens = obter_registro_tokens(self.tokens_file)
     
     def inicializar_servicos(self):
         """Inicializa todos os serviços de notificação"""
@@ -55,6 +92,10 @@ class NotificacoesManager:
             from services.fcm_service import FCMService
             self.fcm_service = FCMService()
             
+            # Envios push em lotes, numa thread própria
+            from services.despachante_push import DespachantePush
+            self.despachante_push = DespachantePush(self.fcm_service, ao_tokens_invalidos=self._remover_tokens)
+            
             # Inicializar Badge Manager
             from utils.badge_manager import BadgeManager
             self.badge_manager = BadgeManager()
@@ -74,83 +115,105 @@ class NotificacoesManager:
     def _registrar_dispositivo(self):
         """Registra o dispositivo no FCM"""
         try:
+            dispositivo = self._obter_id_dispositivo()
             # Obter token FCM (em uma app real, isso viria do Firebase)
             token = self._obter_fcm_token()
             
             if token:
-                tokens = self._carregar_tokens()
-                tokens[token] = {
-                    "data_registro": datetime.now().isoformat(),
-                    "plataforma": "android",
-                    "ativo": True
-                }
-                self._salvar_tokens(tokens)
+                # Mesmo dispositivo atualiza a própria entrada em vez de criar outra
+                self.registro_tokens.registrar(dispositivo, token)
+                self.registro_tokens.compactar()
                 logger.info("Dispositivo registrado no FCM")
                 
         except Exception as e:
             logger.error(f"Erro ao registrar dispositivo: {e}")
     
+    def _obter_id_dispositivo(self):
+        """Identidade estável do dispositivo, guardada em notificacoes_config.json"""
+        config = self._carregar_config()
+        if not config.get("dispositivo_id"):
+            try:
+                from plyer import uniqueid
+                config["dispositivo_id"] = uniqueid.id
+            except Exception:
+                config["dispositivo_id"] = None
+            if not config["dispositivo_id"]:
+                config["dispositivo_id"] = uuid.uuid4().hex
+            self._salvar_config(config)
+        return str(config["dispositivo_id"])
+    
     def _obter_fcm_token(self):
         """Obtém o token FCM do dispositivo (simulação)"""
         # Em uma implementação real, isso obteria o token real do Firebase
-        return "fcm_token_simulado_" + str(int(time.time()))
+        return PREFIXO_TOKEN_SIMULADO + self._obter_id_dispositivo()
     
     def adicionar_notificacao(self, recurso, titulo, mensagem, dados=None):
         """Adiciona uma nova notificação com todos os serviços"""
         # Salvar notificação localmente
         notificacao_salva = self._salvar_notificacao_local(recurso, titulo, mensagem, dados)
         
-        # Enviar notificação push via FCM
-        if self.fcm_service:
-            self._enviar_notificacao_fcm(recurso, titulo, mensagem, dados)
+        # Push, badge e aviso no sistema saem agrupados com os da mesma rajada
+        self.agrupador.adicionar(recurso, titulo, mensagem, dados)
+        
+        return notificacao_salva
+    
+    def _emitir_resumos(self, resumos):
+        """Envia os resumos de uma rajada: um push e um aviso por resumo, um badge"""
+        for recurso, titulo, mensagem, dados in resumos:
+            # Enviar notificação push via FCM
+            if self.fcm_service:
+                self._enviar_notificacao_fcm(recurso, titulo, mensagem, dados)
+            
+            # Mostrar notificação local
+            self._mostrar_notificacao_local(titulo, mensagem)
         
         # Atualizar badge
         self._atualizar_badge_global()
-        
-        # Mostrar notificação local
-        self._mostrar_notificacao_local(titulo, mensagem)
-        
-        return notificacao_salva
     
     def _salvar_notificacao_local(self, recurso, titulo, mensagem, dados):
         """Salva notificação localmente"""
-        notificacoes = self._carregar_notificacoes()
-        
-        if recurso not in notificacoes:
-            notificacoes[recurso] = []
-        
-        nova_notificacao = {
-            "id": int(time.time() * 1000),
-            "titulo": titulo,
-            "mensagem": mensagem,
-            "data": datetime.now().isoformat(),
-            "lida": False,
-            "dados": dados or {}
-        }
-        
-        notificacoes[recurso].insert(0, nova_notificacao)
-        notificacoes[recurso] = notificacoes[recurso][:50]  # Limite de 50
-        
-        self._salvar_notificacoes(notificacoes)
-        return nova_notificacao
+        with self._lock:
+            # Milissegundos do momento, mas sem repetir dentro de uma rajada
+            self._ultimo_id = max(int(time.time() * 1000), self._ultimo_id + 1)
+            nova_notificacao = {
+                "id": self._ultimo_id,
+                "titulo": titulo,
+                "mensagem": mensagem,
+                "data": datetime.now().isoformat(),
+                "lida": False,
+                "dados": dados or {}
+            }
+            
+            lista = self.notificacoes.setdefault(recurso, [])
+            lista.insert(0, nova_notificacao)
+            self._somar_nao_lidas(recurso, 1)
+            # Limite de 50: as descartadas ainda não lidas saem da contagem
+            descartadas = lista[MAX_NOTIFICACOES_POR_RECURSO:]
+            del lista[MAX_NOTIFICACOES_POR_RECURSO:]
+            self._somar_nao_lidas(recurso, -sum(1 for n in descartadas if not n.get("lida", False)))
+            
+            self._gravador.marcar_alterado()
+        return dict(nova_notificacao)
     
     def _enviar_notificacao_fcm(self, recurso, titulo, mensagem, dados):
         """Envia notificação via FCM para todos os dispositivos"""
         try:
-            tokens = self._carregar_tokens()
+            # Só dispositivos vistos dentro do TTL
+            tokens = self.registro_tokens.tokens_ativos()
+            dados_completos = {
+                "recurso": recurso,
+                "tipo": "atualizacao_site",
+                "url": dados.get("url", "") if dados else "",
+                "quantidade": dados.get("quantidade", 1) if dados else 1,
+                "timestamp": datetime.now().isoformat()
+            }
             
-            for token, info in tokens.items():
-                if info.get("ativo", True):
-                    dados_completos = {
-                        "recurso": recurso,
-                        "tipo": "atualizacao_site",
-                        "url": dados.get("url", "") if dados else "",
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    
-                    self.fcm_service.enviar_notificacao_push(
-                        token, titulo, mensagem, dados_completos
-                    )
+            # Só enfileira: o despachante manda em lotes multicast, fora desta thread
+            if self.despachante_push:
+                self.despachante_push.enfileirar(tokens, titulo, mensagem, dados_completos)
+            else:
+                for token in tokens:
+                    self.fcm_service.enviar_notificacao_push(token, titulo, mensagem, dados_completos)
                     
         except Exception as e:
             logger.error(f"Erro ao enviar notificação FCM: {e}")
@@ -183,71 +246,97 @@ class NotificacoesManager:
     
     def obter_total_nao_lidas(self):
         """Retorna o total de notificações não lidas"""
-        notificacoes = self._carregar_notificacoes()
-        total = 0
-        
-        for recurso, lista in notificacoes.items():
-            for notificacao in lista:
-                if not notificacao.get("lida", False):
-                    total += 1
-                    
-        return total
+        with self._lock:
+            return self._total_nao_lidas
     
     def obter_notificacoes_nao_lidas(self, recurso=None):
         """Obtém notificações não lidas para um recurso específico ou todos"""
-        notificacoes = self._carregar_notificacoes()
-        
-        if recurso:
-            if recurso not in notificacoes:
-                return []
-            return [n for n in notificacoes[recurso] if not n.get("lida", False)]
-        else:
-            # Retorna contagem total de não lidas por recurso
-            resultado = {}
-            for recurso, lista in notificacoes.items():
-                nao_lidas = [n for n in lista if not n.get("lida", False)]
-                resultado[recurso] = len(nao_lidas)
-            return resultado
+        with self._lock:
+            if recurso:
+                if recurso not in self.notificacoes:
+                    return []
+                return [dict(n) for n in self.notificacoes[recurso] if not n.get("lida", False)]
+            else:
+                # Retorna contagem total de não lidas por recurso
+                return dict(self._nao_lidas)
     
     def marcar_como_lida(self, recurso, notificacao_id=None):
         """Marca notificações como lidas e atualiza badge"""
-        notificacoes = self._carregar_notificacoes()
-        
-        if recurso not in notificacoes:
-            return False
-        
-        if notificacao_id:
-            # Marca uma notificação específica
-            for notificacao in notificacoes[recurso]:
-                if notificacao["id"] == notificacao_id:
+        with self._lock:
+            if recurso not in self.notificacoes:
+                return False
+            
+            if notificacao_id:
+                # Marca uma notificação específica
+                for notificacao in self.notificacoes[recurso]:
+                    if notificacao["id"] == notificacao_id:
+                        if not notificacao.get("lida", False):
+                            notificacao["lida"] = True
+                            self._somar_nao_lidas(recurso, -1)
+                        break
+            else:
+                # Marca todas as notificações do recurso
+                for notificacao in self.notificacoes[recurso]:
                     notificacao["lida"] = True
-                    break
-        else:
-            # Marca todas as notificações do recurso
-            for notificacao in notificacoes[recurso]:
-                notificacao["lida"] = True
-        
-        self._salvar_notificacoes(notificacoes)
+                self._somar_nao_lidas(recurso, -self._nao_lidas.get(recurso, 0))
+            
+            self._gravador.marcar_alterado()
         
         # Atualizar badge após marcar como lida
         self._atualizar_badge_global()
         
         return True
     
+    def remover_notificacao(self, recurso, notificacao_id=None):
+        """Remove uma notificação (ou todas as do recurso)"""
+        with self._lock:
+            lista = self.notificacoes.get(recurso)
+            if lista is None:
+                return False
+            
+            if notificacao_id:
+                removidas = [n for n in lista if n["id"] == notificacao_id]
+                lista[:] = [n for n in lista if n["id"] != notificacao_id]
+            else:
+                removidas = lista
+                self.notificacoes[recurso] = []
+            if not removidas:
+                return False
+            
+            self._somar_nao_lidas(recurso, -sum(1 for n in removidas if not n.get("lida", False)))
+            self._gravador.marcar_alterado()
+        
+        self._atualizar_badge_global()
+        return True
+    
+    def _somar_nao_lidas(self, recurso, variacao):
+        """Ajusta os contadores de não lidas (chamado sob o lock)"""
+        self._nao_lidas[recurso] = self._nao_lidas.get(recurso, 0) + variacao
+        self._total_nao_lidas += variacao
+    
+    def descarregar(self):
+        """Grava agora as alterações pendentes em notificacoes.json"""
+        return self._gravador.descarregar()
+    
+    def encerrar(self, timeout=2.0):
+        """Ao fechar o app: emite os resumos pendentes, dá um tempo para a fila de push e grava"""
+        self.agrupador.descarregar()
+        if self.despachante_push:
+            self.despachante_push.aguardar(timeout)
+        self.descarregar()
+    
     # Métodos de carregamento/salvamento
-    def _carregar_notificacoes(self):
+    def _ler_notificacoes(self):
         try:
             with open(self.notificacoes_file, "r", encoding='utf-8') as f:
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
     
-    def _salvar_notificacoes(self, notificacoes):
-        try:
-            with open(self.notificacoes_file, "w", encoding='utf-8') as f:
-                json.dump(notificacoes, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Erro ao salvar notificações: {e}")
+    def _copiar_notificacoes(self):
+        """Cópia do estado para gravação (tirada sob o lock)"""
+        with self._lock:
+            return {recurso: [dict(n) for n in lista] for recurso, lista in self.notificacoes.items()}
     
     def _carregar_config(self):
         try:
@@ -263,16 +352,27 @@ class NotificacoesManager:
         except Exception as e:
             logger.error(f"Erro ao salvar configurações: {e}")
     
-    def _carregar_tokens(self):
-        try:
-            with open(self.tokens_file, "r", encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-    
-    def _salvar_tokens(self, tokens):
-        try:
-            with open(self.tokens_file, "w", encoding='utf-8') as f:
-                json.dump(tokens, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Erro ao salvar tokens: {e}")
\ No newline at end of file
+    def _remover_tokens(self, invalidos):
+        """Remove tokens que o FCM informou não existirem mais"""
+        removidos = self.registro_tokens.remover_tokens(invalidos)
+        logger.info(f"{removidos} tokens FCM inválidos removidos")
+
+
+def contar_nao_lidas(notificacoes):
+    """Contagem de não lidas por recurso, percorrendo todas as notificações"""
+    return {recurso: sum(1 for n in lista if not n.get("lida", False))
+            for recurso, lista in notificacoes.items()}
+
+
+# Um manager por diretório de dados: o estado em memória não pode ser duplicado
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def obter_notificacoes_manager(data_dir="data"):
+    """Retorna o NotificacoesManager compartilhado do diretório de dados"""
+    chave = os.path.abspath(data_dir)
+    with _managers_lock:
+        if chave not in _managers:
+            _managers[chave] = NotificacoesManager(data_dir=data_dir)
+        return _managers[chave]
@@ -0,0 +1,155 @@
+# utils/registro_tokens.py
+import os
+import json
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Dispositivo sem abrir o app há mais que isso deixa de receber push
+# (o FCM considera obsoletos os tokens sem uso por ~2 meses)
+TTL_TOKEN = timedelta(days=60)
+
+# Prefixo dos dispositivos migrados do formato antigo (chaveado pelo token)
+PREFIXO_LEGADO = "legado:"
+
+# Tokens gerados pelo app enquanto o FCM é simulado
+PREFIXO_TOKEN_SIMULADO = "fcm_token_simulado_"
+
+
+class RegistroTokens:
+    """
+    Tokens FCM por dispositivo, em fcm_tokens.json.
+
+    A chave é a identidade do dispositivo, não o token: registrar de novo o
+    mesmo dispositivo só atualiza o token e o `ultimo_acesso` (upsert). Um
+    token que aparece em outro dispositivo sai do anterior. Só recebem push
+    os dispositivos vistos dentro do `ttl`; `compactar` apaga os expirados,
+    os inativos e os tokens repetidos.
+
+    Entradas do formato antigo ({token: {data_registro, ...}}) são lidas
+    como dispositivos "legado:<token>" vistos na data do registro, exceto
+    os tokens simulados: o formato antigo criava um a cada abertura do app,
+    todos do mesmo aparelho, que volta a se registrar com a sua identidade.
+    """
+
+    def __init__(self, arquivo, ttl=TTL_TOKEN):
+        self.arquivo = arquivo
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # dispositivo -> {"token", "plataforma", "data_registro", "ultimo_acesso", "ativo"}
+        self.dispositivos = self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.arquivo):
+            return {}
+        try:
+            with open(self.arquivo, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Registro de tokens ilegível ({e}); iniciando vazio")
+            return {}
+
+        dispositivos = {}
+        simulados = 0
+        for chave, info in dados.items():
+            if "token" in info:
+                dispositivos[chave] = info
+            elif chave.startswith(PREFIXO_TOKEN_SIMULADO):
+                simulados += 1
+            else:
+                dispositivos[PREFIXO_LEGADO + chave] = {
+                    "token": chave,
+                    "plataforma": info.get("plataforma"),
+                    "data_registro": info.get("data_registro"),
+                    "ultimo_acesso": info.get("data_registro"),
+                    "ativo": info.get("ativo", True)
+                }
+        if simulados:
+            logger.info(f"{simulados} tokens simulados do formato antigo descartados")
+        return dispositivos
+
+    def _salvar(self):
+        """Grava o registro de forma atômica (arquivo temporário + os.replace)"""
+        diretorio = os.path.dirname(os.path.abspath(self.arquivo))
+        fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tokens.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.dispositivos, f, indent=2, ensure_ascii=False)
+            os.replace(temporario, self.arquivo)
+        except Exception as e:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            logger.error(f"Erro ao salvar tokens: {e}")
+
+    def registrar(self, dispositivo, token, plataforma="android", agora=None):
+        """Cria ou atualiza o dispositivo com o token atual"""
+        agora = (agora or datetime.now()).isoformat()
+        with self._lock:
+            # O token passou para este dispositivo: sai de qualquer outro
+            for outro in [d for d, info in self.dispositivos.items()
+                          if info.get("token") == token and d != dispositivo]:
+                del self.dispositivos[outro]
+
+            info = self.dispositivos.setdefault(dispositivo, {"data_registro": agora})
+            info.update({"token": token, "plataforma": plataforma, "ultimo_acesso": agora, "ativo": True})
+            self._salvar()
+
+    def tokens_ativos(self, agora=None):
+        """Tokens dos dispositivos ativos vistos dentro do TTL (sem repetição)"""
+        limite = ((agora or datetime.now()) - self.ttl).isoformat()
+        with self._lock:
+            tokens = [info["token"] for info in self.dispositivos.values()
+                      if info.get("ativo", True) and (info.get("ultimo_acesso") or "") >= limite]
+        return list(dict.fromkeys(tokens))
+
+    def remover_tokens(self, tokens):
+        """Remove os dispositivos cujos tokens o FCM informou não existirem"""
+        tokens = set(tokens)
+        with self._lock:
+            removidos = [d for d, info in self.dispositivos.items() if info.get("token") in tokens]
+            for dispositivo in removidos:
+                del self.dispositivos[dispositivo]
+            if removidos:
+                self._salvar()
+        return len(removidos)
+
+    def compactar(self, agora=None):
+        """Apaga dispositivos expirados, inativos e tokens repetidos; retorna quantos saíram"""
+        limite = ((agora or datetime.now()) - self.ttl).isoformat()
+        with self._lock:
+            antes = len(self.dispositivos)
+            vivos = {}
+            vistos = set()
+            # Mais recente primeiro: num token repetido fica o último dispositivo visto
+            for dispositivo, info in sorted(self.dispositivos.items(),
+                                            key=lambda item: item[1].get("ultimo_acesso") or "", reverse=True):
+                if not info.get("ativo", True) or (info.get("ultimo_acesso") or "") < limite:
+                    continue
+                if info["token"] in vistos:
+                    continue
+                vistos.add(info["token"])
+                vivos[dispositivo] = info
+            self.dispositivos = vivos
+            removidos = antes - len(vivos)
+            self._salvar()
+        if removidos:
+            logger.info(f"Registro de tokens compactado: {removidos} dispositivos removidos")
+        return removidos
+
+
+# Um registro por arquivo no processo
+_registros = {}
+_registros_lock = threading.Lock()
+
+
+def obter_registro_tokens(arquivo):
+    """Retorna o RegistroTokens compartilhado para o arquivo informado"""
+    chave = os.path.abspath(arquivo)
+    with _registros_lock:
+        if chave not in _registros:
+            _registros[chave] = RegistroTokens(chave)
+        return _registros[chave]
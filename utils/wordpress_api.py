@@ -0,0 +1,95 @@
+# utils/wordpress_api.py
+import logging
+from datetime import datetime
+from urllib.parse import urlencode
+
+from utils.http_cliente import obter_cliente_http
+
+# Configurar logging
+logger = logging.getLogger('degeo_app')
+
+# Só os campos usados pelo app (o padrão traz o conteúdo renderizado de cada post)
+CAMPOS_POST = "id,date,title,link"
+POSTS_POR_PAGINA = 10
+# Páginas seguidas no máximo por verificação (o badge não precisa de mais)
+MAX_PAGINAS = 5
+
+
+def e_api_wordpress(url):
+    """True para endpoints de coleção da API REST do WordPress (wp-json/wp/v2/...)"""
+    return "/wp-json/wp/v2/" in url
+
+
+def montar_url(url, **parametros):
+    """URL da coleção com os parâmetros de consulta (sem os vazios)"""
+    consulta = urlencode({k: v for k, v in parametros.items() if v is not None})
+    return f"{url.strip()}{'&' if '?' in url else '?'}{consulta}"
+
+
+def url_posts(url, depois=None, por_pagina=POSTS_POR_PAGINA, pagina=1):
+    """Endereço de uma página da consulta de posts publicados depois de `depois`"""
+    depois_iso = depois.replace(microsecond=0).isoformat() if depois else None
+    return montar_url(url, _fields=CAMPOS_POST, per_page=por_pagina, after=depois_iso,
+                      orderby="date", order="desc", page=pagina if pagina > 1 else None)
+
+
+def _converter_post(post, url):
+    return {
+        'titulo': post.get('title', {}).get('rendered', 'Nova atualização'),
+        'data': datetime.strptime(post['date'], "%Y-%m-%dT%H:%M:%S").isoformat(),
+        'link': post.get('link', url)
+    }
+
+
+def buscar_posts(url, depois=None, por_pagina=POSTS_POR_PAGINA, max_paginas=MAX_PAGINAS,
+                 timeout=5, cabecalhos=None):
+    """Posts publicados depois de `depois` (datetime), do mais novo para o mais antigo
+
+    O filtro de data é feito pelo servidor (`after`) e só id, data, título e
+    link são pedidos. A próxima página só é buscada quando a atual veio
+    cheia e o servidor indica que há mais (X-WP-TotalPages). Sem `depois`,
+    só a primeira página é lida.
+
+    Retorna (status da primeira página, resposta da primeira página, itens).
+    Com 304 na primeira página, os itens são None.
+    """
+    itens = []
+    primeira = None
+
+    for pagina in range(1, max_paginas + 1):
+        endereco = url_posts(url, depois, por_pagina, pagina)
+        response = obter_cliente_http().get(endereco, timeout=timeout,
+                                            headers=cabecalhos if pagina == 1 else None)
+        if pagina == 1:
+            primeira = response
+            if response.status_code != 200:
+                return response.status_code, response, None
+        elif response.status_code != 200:
+            # Página além da última (WordPress responde 400) ou erro: fica com o que já veio
+            break
+
+        posts = response.json()
+        for post in posts:
+            try:
+                itens.append(_converter_post(post, url))
+            except (KeyError, ValueError, TypeError):
+                continue
+
+        total_paginas = int(response.headers.get("X-WP-TotalPages", pagina) or pagina)
+        if depois is None or len(posts) < por_pagina or pagina >= total_paginas:
+            break
+
+    logger.debug(f"{len(itens)} posts novos em {url}")
+    return primeira.status_code, primeira, itens
+
+
+def data_ultimo_post(url, timeout=5, cabecalhos=None):
+    """(status, resposta, datetime do post mais recente ou None)"""
+    endereco = montar_url(url, _fields="date", per_page=1, orderby="date", order="desc")
+    response = obter_cliente_http().get(endereco, timeout=timeout, headers=cabecalhos)
+    if response.status_code != 200:
+        return response.status_code, response, None
+    posts = response.json()
+    if not posts:
+        return 200, response, None
+    return 200, response, datetime.strptime(posts[0]['date'], "%Y-%m-%dT%H:%M:%S")